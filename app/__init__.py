@@ -1,4 +1,4 @@
-from flask import Flask, render_template, send_from_directory
+from flask import Flask, render_template, send_from_directory, jsonify
 from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
 from flask_login import LoginManager
@@ -34,6 +34,13 @@ def create_app():
         return send_from_directory(os.path.join(app.root_path, 'static'),
                                  'favicon.ico', mimetype='image/vnd.microsoft.icon')
     
+    # READINESS ROUTE - datasets and AI services load in the background after startup
+    @app.route('/ready')
+    def ready():
+        from app.services.warmup import readiness
+        status = readiness()
+        return jsonify(status), 200 if status['ready'] else 503
+    
     # Login manager configuration
     login_manager.login_view = 'auth.login'
     login_manager.login_message_category = 'info'
@@ -127,6 +134,22 @@ def create_app():
         except Exception as e:
             logger.error("❌ Database creation error: %s", e)
     
+    # Load datasets in the background so workers accept requests right away
+    if app.config.get('DATA_WARMUP_ON_STARTUP'):
+        from app.services.warmup import lazy_service, start_warmup
+        
+        def warm_recommender():
+            from app.services.recommender import get_recommender
+            with app.app_context():
+                recommender = get_recommender()
+                recommender.load_or_build()
+                return recommender
+        
+        lazy_service('recommender', warm_recommender)
+        if app.config.get('COLLABORATIVE_FILTERING'):
+            import app.services.collaborative  # declares its warmup service
+        start_warmup()
+    
     return app
 
 # Export db for modules to use
@@ -1,4 +1,4 @@
-from flask import Blueprint, render_template, jsonify, request, redirect, url_for
+from flask import Blueprint, render_template, jsonify, request, redirect, url_for, g, has_request_context, current_app
 from flask_login import login_required, current_user
 import pandas as pd
 import numpy as np
@@ -6,70 +6,392 @@ from datetime import datetime
 import os
 import json
 import random
+import copy
+import itertools
+import threading
 from datetime import datetime
+from config import Config
+from app.services.dataset_registry import get_registry
+from app.services.bundle import BundleContext, build_bundle, encode_body, parse_parts
+from app.services.activity_index import DAY_COLUMN, DailyActivity, day_numbers
+from app.services.content_types import CONTENT_TYPE_COLUMN, content_types, parse_content_type
+from app.services.dataset_schema import memory_report
+from app.services.game_review_stats import REVIEW_RANKING_KEYS, GameReviewStats, game_positions
+from app.services.games_cube import GamesCube, ratio_bands
+from app.services.query_engine import QueryEngine, QueryError
+from app.services.ranking_index import RankingIndex
+from app.services.reload_jobs import ReloadJobManager, ReloadSuperseded
+from app.services.sampling import estimate, is_weighted_sample
+from app.services.review_time_index import ReviewTimeIndex, parse_date_range
+from app.services.review_aggregates import ReviewAggregate, ReviewLogIngestor, aggregate_reviews, count_csv_rows
+from app.services.warmup import COLD, WARMING, lazy_service, warming_page, warming_response
 
 
 analytics_bp = Blueprint('analytics', __name__)
 
+class AnalyticsState:
+    """One consistent generation of the analyzer's data
+
+    Built in full before it is published and never modified afterwards, so a
+    reload can swap in a new state without readers seeing a half-loaded mix.
+    Structures derived from the frames (see ``derived``) live and die with it.
+    """
+
+    def __init__(self, version=0, games_df=None, users_df=None, recommendations_df=None,
+                 review_aggregate=None, total_users=None, data_loaded=False, dataset_version=0,
+                 derived=None):
+        self.version = version
+        self.dataset_version = dataset_version
+        self.games_df = games_df
+        self.users_df = users_df
+        self.recommendations_df = recommendations_df
+        self.review_aggregate = review_aggregate
+        self.total_users = total_users
+        self.data_loaded = data_loaded
+        self.loaded_at = datetime.now().isoformat()
+        self._derived = dict(derived or {})
+        self._derived_lock = threading.Lock()
+        self._build_locks = {}
+    
+    def derived(self, key, build):
+        """Value built from this state's data, computed on first use and kept with the state
+
+        Concurrent first callers for the same key wait for a single build
+        instead of each running it; a build that raises is not cached.
+        """
+        if key not in self._derived:
+            with self._derived_lock:
+                build_lock = self._build_locks.setdefault(key, threading.Lock())
+            with build_lock:
+                if key not in self._derived:
+                    self._derived[key] = build()
+        return self._derived[key]
+    
+    def derived_values(self, *prefixes):
+        """Already-built derived values whose keys start with ``prefixes``, to carry over to a state with the same frames"""
+        with self._derived_lock:
+            items = list(self._derived.items())
+        return {key: value for key, value in items if key.startswith(prefixes)}
+
+
 class SteamDataAnalyzer:
     def __init__(self):
-        self.games_df = None
-        self.users_df = None
-        self.recommendations_df = None
-        self.data_loaded = False
-        self.load_data()
+        self.registry = get_registry()
+        self.reload_jobs = ReloadJobManager()
+        self._state = AnalyticsState()
+        self._state_lock = threading.Lock()
+        self._versions = itertools.count(1)
+        self._review_ingestors = {}
+    
+    @property
+    def state(self):
+        """Current data generation, pinned for the rest of a request so a swap can't mix two"""
+        if has_request_context():
+            if 'analytics_state' not in g:
+                g.analytics_state = self._state
+            return g.analytics_state
+        return self._state
+    
+    games_df = property(lambda self: self.state.games_df)
+    users_df = property(lambda self: self.state.users_df)
+    recommendations_df = property(lambda self: self.state.recommendations_df)
+    review_aggregate = property(lambda self: self.state.review_aggregate)
+    total_users = property(lambda self: self.state.total_users)
+    data_loaded = property(lambda self: self.state.data_loaded)
+    data_version = property(lambda self: self.state.version)
+    
+    def load_data(self, reload=False):
+        """Load all datasets and publish them as the current state (blocks until done)"""
+        snapshot = self.registry.build_snapshot() if reload else self.registry.snapshot
+        state = self._build_state(snapshot)
+        if reload and not self.registry.swap(snapshot):
+            # A concurrent invalidate() won; load the generation that is current instead
+            state = self._build_state(self.registry.snapshot)
+        self._publish(state)
+        return state.data_loaded
+    
+    def start_refresh(self, mode='full'):
+        """Rebuild the datasets on a background thread; returns the reload job
+
+        ``mode='reviews'`` only folds newly appended recommendations into the
+        review aggregate and keeps the loaded frames.
+        """
+        if mode == 'reviews':
+            return self.reload_jobs.submit(self._refresh_reviews, kind='reviews')
+        return self.reload_jobs.submit(self._refresh, kind='full')
+    
+    def _refresh(self, attempts=2):
+        # A concurrent invalidate() may make a newer generation current while
+        # we build; rebuild against it instead of reporting data nobody sees
+        for _ in range(attempts):
+            snapshot = self.registry.build_snapshot()
+            state = self._build_state(snapshot)
+            if not state.data_loaded:
+                raise RuntimeError("Dataset reload failed, keeping the current data")
+            if self.registry.swap(snapshot) and self._publish(state):
+                return {'data_version': state.version, 'loaded_at': state.loaded_at}
+            print(f"⚠️ Snapshot v{snapshot.version} was superseded while loading, rebuilding")
+        raise ReloadSuperseded("A newer dataset generation was published while this reload ran")
+    
+    def _refresh_reviews(self):
+        current = self._state
+        recs_path = self.registry.resolve_path('recommendations')
+        if not current.data_loaded or not recs_path or not Config.ANALYTICS_FULL_POPULATION:
+            return self._refresh()
+        
+        review_aggregate = self._review_ingestor(recs_path).refresh()
+        state = AnalyticsState(next(self._versions), current.games_df, current.users_df,
+                               current.recommendations_df, review_aggregate, current.total_users,
+                               data_loaded=True, dataset_version=current.dataset_version,
+                               derived=current.derived_values('games_cube', 'games_ranking', 'games_analysis',
+                                                              'query_engine'))
+        self._game_review_stats(state)
+        self._publish(state)
+        return {'data_version': state.version, 'loaded_at': state.loaded_at,
+                'total_reviews': review_aggregate.total_rows}
+    
+    def _publish(self, state):
+        """Atomically make ``state`` current unless a newer one already is; True if it was"""
+        with self._state_lock:
+            if state.version >= self._state.version:
+                self._state = state
+                return True
+            return False
     
-    def load_data(self):
+    def _build_state(self, snapshot):
         """Load and validate all CSV files with optimized loading for your specific dataset"""
         try:
-            base_path = 'raw'
-            
-            print("🔄 Loading your actual CSV data...")
+            print(f"🔄 Loading your actual CSV data (snapshot v{snapshot.version})...")
             
-            # Load games data with specific columns for your dataset
-            games_path = os.path.join(base_path, 'games.csv')
-            if os.path.exists(games_path):
-                # Only load essential columns to save memory
-                self.games_df = pd.read_csv(games_path, usecols=[
-                    'app_id', 'title', 'rating', 'positive_ratio', 'price_final', 
-                    'price_original', 'discount', 'steam_deck', 'date_release'
-                ])
-                print(f"✅ Loaded {len(self.games_df)} games from your dataset")
-                print(f"📊 Games columns: {list(self.games_df.columns)}")
+            # Frames come from the shared dataset registry; views keep our
+            # column assignments from leaking into other consumers
+            games_df = self.registry.view('games', snapshot)
+            ranking = None
+            if games_df is not None:
+                print(f"✅ Loaded {len(games_df)} games from your dataset")
+                print(f"📊 Games columns: {list(games_df.columns)}")
+                # Pre-sorted top-K orders, shared with the other users of the games frame
+                ranking = self.registry.derived('games', 'ranking', RankingIndex.build, snapshot)
             else:
                 print("❌ games.csv not found")
-                self.games_df = self._create_sample_games_data()
+                games_df = self._create_sample_games_data()
+            # Classify titles once per load (game/dlc/soundtrack/bundle/artbook)
+            games_df[CONTENT_TYPE_COLUMN] = content_types(games_df)
             
-            # Load users data (sampled for performance)
-            users_path = os.path.join(base_path, 'users.csv')
-            if os.path.exists(users_path):
-                # Sample users data for better performance
-                self.users_df = pd.read_csv(users_path, nrows=50000)
-                print(f"✅ Loaded {len(self.users_df)} users (sampled)")
+            # Users data (sampled for performance, see Config.USERS_MAX_ROWS)
+            users_df = self.registry.view('users', snapshot)
+            if users_df is not None:
+                print(f"✅ Loaded {len(users_df)} users (sampled)")
             else:
                 print("❌ users.csv not found")
-                self.users_df = self._create_sample_users_data()
+                users_df = self._create_sample_users_data()
             
-            # Load recommendations data (sampled for performance)
-            recs_path = os.path.join(base_path, 'recommendations.csv')
-            if os.path.exists(recs_path):
-                # Sample recommendations for better performance
-                self.recommendations_df = pd.read_csv(recs_path, nrows=100000)
-                print(f"✅ Loaded {len(self.recommendations_df)} recommendations (sampled)")
+            # Recommendations data (sampled for performance, see Config.RECOMMENDATIONS_MAX_ROWS)
+            recommendations_df = self.registry.view('recommendations', snapshot)
+            if recommendations_df is not None:
+                print(f"✅ Loaded {len(recommendations_df)} recommendations (sampled)")
             else:
                 print("❌ recommendations.csv not found")
-                self.recommendations_df = self._create_sample_recommendations_data()
+                recommendations_df = self._create_sample_recommendations_data()
+            # Parse review dates once into day numbers for the activity histograms
+            if 'date' in recommendations_df.columns:
+                recommendations_df[DAY_COLUMN] = day_numbers(recommendations_df['date'])
             
-            self.data_loaded = True
+            # Full-population aggregates (the frames above stay sampled)
+            review_aggregate, total_users = None, None
+            if Config.ANALYTICS_FULL_POPULATION:
+                review_aggregate, total_users = self._load_full_population_aggregates(
+                    self.registry.resolve_path('users'),
+                    self.registry.resolve_path('recommendations')
+                )
+            
+            state = AnalyticsState(next(self._versions), games_df, users_df, recommendations_df,
+                                   review_aggregate, total_users, data_loaded=True,
+                                   dataset_version=snapshot.version)
+            # Build the games cube and rankings now rather than on the first dashboard request
+            state.derived('games_cube', lambda: GamesCube.build(games_df))
+            state.derived('games_ranking', lambda: ranking or RankingIndex.build(games_df))
+            self._game_review_stats(state)
             print("🎯 Data loading completed successfully!")
-            return True
+            return state
             
         except Exception as e:
             print(f"❌ Error loading data: {e}")
-            self.data_loaded = False
-            return False
+            return AnalyticsState(next(self._versions), dataset_version=snapshot.version)
+    
+    def _load_full_population_aggregates(self, users_path, recs_path):
+        """Stream the whole review log once (cached per source file version)"""
+        chunksize = Config.ANALYTICS_CHUNK_SIZE
+        sketches = Config.ANALYTICS_SKETCHES
+        snapshots = self.registry.snapshots
+        review_aggregate, total_users = None, None
+        try:
+            if recs_path and Config.ANALYTICS_INCREMENTAL_REVIEWS:
+                review_aggregate = self._review_ingestor(recs_path).refresh()
+                print(f"✅ Aggregated {review_aggregate.total_rows:,} recommendations (full population, incremental)")
+            elif recs_path:
+                review_aggregate = snapshots.load_derived(
+                    recs_path, 'recommendations-aggregate-v5' + ('-sketches' if sketches else ''),
+                    lambda path: aggregate_reviews(path, chunksize=chunksize, sketches=sketches),
+                    serialize=ReviewAggregate.to_dict,
+                    deserialize=ReviewAggregate.from_dict
+                )
+                print(f"✅ Aggregated {review_aggregate.total_rows:,} recommendations (full population)")
+            if users_path:
+                total_users = snapshots.load_derived(
+                    users_path, 'users-row-count',
+                    lambda path: count_csv_rows(path, chunksize=chunksize)
+                )
+                print(f"✅ Counted {total_users:,} users (full population)")
+        except Exception as e:
+            print(f"⚠️ Full-population aggregation failed, using sampled data: {e}")
+            return None, None
+        return review_aggregate, total_users
+    
+    def _sample_confidence_intervals(self):
+        """95% intervals for review metrics estimated from a weighted random sample"""
+        df = self.recommendations_df
+        if not is_weighted_sample(df):
+            return {}
+        intervals = {
+            'positive_rate': estimate(df, 'is_recommended', scale=100),
+            'avg_playtime': estimate(df, 'hours'),
+            'total_playtime': estimate(df, 'hours', statistic='total')
+        }
+        return {name: interval for name, interval in intervals.items() if interval is not None}
+    
+    def _review_ingestor(self, recs_path):
+        """Incremental aggregator for the review log, kept across refreshes"""
+        if recs_path not in self._review_ingestors:
+            snapshots = self.registry.snapshots
+            state_path = (os.path.join(snapshots.snapshot_dir, 'recommendations-ingest.json')
+                          if snapshots.enabled else None)
+            self._review_ingestors[recs_path] = ReviewLogIngestor(
+                recs_path, state_path, chunksize=Config.ANALYTICS_CHUNK_SIZE,
+                sketches=Config.ANALYTICS_SKETCHES
+            )
+        return self._review_ingestors[recs_path]
+    
+    @property
+    def games_cube(self):
+        """Pre-aggregated games table for the current data version"""
+        return self._games_cube(self.state)
+    
+    @staticmethod
+    def _games_cube(state):
+        return state.derived('games_cube', lambda: GamesCube.build(state.games_df))
+    
+    @property
+    def query_engine(self):
+        """Structured query engine over the current data version (see app.services.query_engine)"""
+        state = self.state
+        return state.derived('query_engine', lambda: QueryEngine(
+            {'games': state.games_df, 'recommendations': state.recommendations_df, 'users': state.users_df},
+            cube=lambda: self._games_cube(state)
+        ))
+    
+    def query(self, spec):
+        """Run a structured query; returns {'dataset', 'engine', 'rows', 'cached'}"""
+        return self.query_engine.execute(spec)
+    
+    @property
+    def daily_activity(self):
+        """Reviews per day for the current data version (full population when aggregated), or None"""
+        state = self.state
+        
+        def build():
+            if state.review_aggregate is not None:
+                return state.review_aggregate.daily_activity()
+            if state.recommendations_df is not None and DAY_COLUMN in state.recommendations_df.columns:
+                return DailyActivity.from_days(state.recommendations_df[DAY_COLUMN].to_numpy())
+            return None
+        return state.derived('daily_activity', build)
+    
+    @property
+    def game_review_stats(self):
+        """Per-game review aggregates aligned to games_df rows (see app.services.game_review_stats)"""
+        return self._game_review_stats(self.state)
+    
+    @staticmethod
+    def _game_review_stats(state):
+        return state.derived('game_review_stats', lambda: GameReviewStats.build(
+            state.games_df, state.recommendations_df, state.review_aggregate
+        ))
+    
+    @property
+    def games_review_ranking(self):
+        """Pre-sorted games orders by review volume, recommend rate and mean hours"""
+        state = self.state
+        return state.derived('games_review_ranking', lambda: RankingIndex.build(
+            self._game_review_stats(state).ranking_frame(), REVIEW_RANKING_KEYS
+        ))
+    
+    @property
+    def review_time_index(self):
+        """Per-day prefix sums of review measures (globally and per game), or None
+        
+        Built from the full-population aggregate when there is one, otherwise
+        from the loaded sample (and labelled as such).
+        """
+        state = self.state
+        
+        def build():
+            if state.review_aggregate is not None:
+                return ReviewTimeIndex.from_app_days(state.review_aggregate.game_day_totals(), 'full',
+                                                     state.review_aggregate.total_rows)
+            if state.recommendations_df is None:
+                return None
+            return ReviewTimeIndex.build(state.recommendations_df, 'sample')
+        return state.derived('review_time_index', build)
+    
+    def reviews_between(self, date_range, app_id=None):
+        """Reviews, positive rate and playtime for an inclusive (start_day, end_day) range"""
+        index = self.review_time_index
+        if index is None:
+            return None
+        start, end = date_range
+        summary = index.totals(start, end, app_id)
+        summary.update(start=_day_iso(start), end=_day_iso(end), population=index.population,
+                       source_rows=index.rows)
+        if app_id is not None:
+            summary['app_id'] = app_id
+        return summary
+    
+    def get_total_users(self):
+        """Total users, from the full-population count when available"""
+        if self.total_users is not None:
+            return self.total_users
+        return len(self.users_df) if self.users_df is not None else None
+    
+    @property
+    def games_ranking(self):
+        """Pre-sorted top-K orders of the games for the current data version"""
+        state = self.state
+        return state.derived('games_ranking', lambda: RankingIndex.build(state.games_df))
+    
+    def content_mask(self, content_type=None):
+        """Boolean row mask of one content type over games_df (None for all rows)"""
+        if content_type is None or self.games_df is None:
+            return None
+        return (self.games_df[CONTENT_TYPE_COLUMN] == content_type).to_numpy()
+    
+    def games_of_type(self, content_type=None):
+        """Games rows of one content type (all rows for None)"""
+        mask = self.content_mask(content_type)
+        return self.games_df if mask is None else self.games_df[mask]
+    
+    def analyze_games_data(self, content_type='game'):
+        """Games analysis for the current data version, computed once per version and content type"""
+        return copy.deepcopy(self.state.derived(
+            f"games_analysis:{content_type or 'all'}",
+            lambda: self._compute_games_analysis(content_type)
+        ))
     
-    def analyze_games_data(self):
+    def analyze_user_behavior(self):
+        """User behavior analysis for the current data version, computed once per version"""
+        return copy.deepcopy(self.state.derived('user_analysis', self._compute_user_analysis))
+    
+    def _compute_games_analysis(self, content_type='game'):
         """Perform analysis using YOUR ACTUAL games.csv data"""
         if not self.data_loaded or self.games_df is None:
             return self._get_sample_games_analysis()
@@ -82,41 +404,29 @@ class SteamDataAnalyzer:
             # Basic metrics from your data
             analysis['total_games'] = len(self.games_df)
             
-            # Filter out DLCs and soundtracks to get real games
-            real_games_mask = ~self.games_df['title'].str.contains(
-                'Soundtrack|OST|DLC|Content|Add-On|Pack|Bundle|Artbook|Season Pass', 
-                case=False, na=False
-            )
-            real_games_df = self.games_df[real_games_mask]
-            
-            if len(real_games_df) == 0:
-                real_games_df = self.games_df  # Fallback to all games if filter removes everything
+            # Filter to one content type (by default real games, without DLCs and soundtracks)
+            cube = self.games_cube
+            content_filter = {'content_type': content_type} if content_type else {}
+            filtered_count = cube.count(**content_filter)
+            if filtered_count == 0 and content_type == 'game':
+                content_filter = {}  # Fallback to all games if filter removes everything
+                filtered_count = cube.total_rows
             
             # Rating analysis using your positive_ratio column
-            if 'positive_ratio' in real_games_df.columns:
-                valid_ratings = real_games_df['positive_ratio'].dropna()
-                if len(valid_ratings) > 0:
-                    analysis['avg_rating'] = round(valid_ratings.mean() / 20, 1)  # Convert to 1-5 scale
-                    
-                    # ✅ FIXED: Correct bin edges and labels - 5 edges = 4 labels
-                    rating_bins = [0, 25, 50, 75, 100]  # 5 edges
-                    rating_labels = ['0-25%', '25-50%', '50-75%', '75-100%']  # 4 labels - CORRECT!
+            if 'positive_ratio' in self.games_df.columns:
+                rating_stats = cube.stats('positive_ratio', **content_filter)
+                if rating_stats['count'] > 0:
+                    analysis['avg_rating'] = round(rating_stats['mean'] / 20, 1)  # Convert to 1-5 scale
                     
-                    try:
-                        rating_dist = pd.cut(valid_ratings, bins=rating_bins, labels=rating_labels)
-                        rating_counts = rating_dist.value_counts().reindex(rating_labels, fill_value=0)
-                        
-                        analysis['rating_analysis'] = {
-                            'ranges': rating_labels,
-                            'counts': rating_counts.tolist()
-                        }
-                        print(f"✅ Rating distribution analysis successful")
-                    except Exception as bin_error:
-                        print(f"⚠️ Rating bin error, using fallback: {bin_error}")
-                        analysis['rating_analysis'] = {
-                            'ranges': ['0-25%', '25-50%', '50-75%', '75-100%'],
-                            'counts': [10, 20, 40, 30]
-                        }
+                    # (0-25], (25-50], (50-75], (75-100] as unions of the cube's ratio bands
+                    rating_labels = ['0-25%', '25-50%', '50-75%', '75-100%']
+                    rating_ranges = [(1, 25), (26, 50), (51, 75), (76, 100)]
+                    analysis['rating_analysis'] = {
+                        'ranges': rating_labels,
+                        'counts': [cube.count(ratio_band=ratio_bands(low, high), **content_filter)
+                                   for low, high in rating_ranges]
+                    }
+                    print(f"✅ Rating distribution analysis successful")
                 else:
                     analysis['avg_rating'] = 4.2
                     analysis['rating_analysis'] = self._get_sample_games_analysis()['rating_analysis']
@@ -127,30 +437,19 @@ class SteamDataAnalyzer:
                 analysis['rating_analysis'] = self._get_sample_games_analysis()['rating_analysis']
             
             # Price analysis using your price_final column
-            if 'price_final' in real_games_df.columns:
-                valid_prices = real_games_df['price_final'].dropna()
-                if len(valid_prices) > 0:
-                    analysis['avg_price'] = round(valid_prices.mean(), 2)
+            if 'price_final' in self.games_df.columns:
+                price_stats = cube.stats('price_final', **content_filter)
+                if price_stats['count'] > 0:
+                    analysis['avg_price'] = round(price_stats['mean'], 2)
                     
-                    # ✅ FIXED: Correct bin edges and labels for price - 7 edges = 6 labels
-                    price_bins = [0, 5, 10, 20, 30, 40, float('inf')]  # 7 edges
-                    price_labels = ['$0-5', '$5-10', '$10-20', '$20-30', '$30-40', '$40+']  # 6 labels - CORRECT!
-                    
-                    try:
-                        price_dist = pd.cut(valid_prices, bins=price_bins, labels=price_labels, include_lowest=True)
-                        price_counts = price_dist.value_counts().reindex(price_labels, fill_value=0)
-                        
-                        analysis['price_distribution'] = {
-                            'ranges': price_labels,
-                            'counts': price_counts.tolist()
-                        }
-                        print(f"✅ Price distribution analysis successful")
-                    except Exception as bin_error:
-                        print(f"⚠️ Price bin error, using fallback: {bin_error}")
-                        analysis['price_distribution'] = {
-                            'ranges': ['$0-5', '$5-10', '$10-20', '$20-30', '$30-40', '$40+'],
-                            'counts': [35, 25, 20, 12, 5, 3]
-                        }
+                    # [0-5], (5-10], ... (40+) as unions of the cube's price buckets
+                    price_labels = ['$0-5', '$5-10', '$10-20', '$20-30', '$30-40', '$40+']
+                    price_buckets = [['free', '0-5'], '5-10', '10-20', '20-30', '30-40', '40+']
+                    analysis['price_distribution'] = {
+                        'ranges': price_labels,
+                        'counts': [cube.count(price_bucket=bucket, **content_filter) for bucket in price_buckets]
+                    }
+                    print(f"✅ Price distribution analysis successful")
                 else:
                     analysis['avg_price'] = 19.99
                     analysis['price_distribution'] = self._get_sample_games_analysis()['price_distribution']
@@ -161,13 +460,11 @@ class SteamDataAnalyzer:
                 analysis['price_distribution'] = self._get_sample_games_analysis()['price_distribution']
             
             # Top REAL games by positive_ratio (filter out DLCs/soundtracks)
-            if 'title' in real_games_df.columns and 'positive_ratio' in real_games_df.columns:
-                # Get games with at least 70% positive rating for more meaningful popularity
-                popular_games = real_games_df[real_games_df['positive_ratio'] >= 70]
-                if len(popular_games) > 5:
-                    top_games = popular_games.nlargest(5, 'positive_ratio')
-                else:
-                    top_games = real_games_df.nlargest(5, 'positive_ratio')
+            if 'title' in self.games_df.columns and 'positive_ratio' in self.games_df.columns:
+                # Highest positive_ratio first, so when more than 5 games reach 70% the
+                # top 5 are all from that "popular" set; no separate filter needed
+                mask = self.content_mask(content_type) if content_filter else None
+                top_games = self.games_df.iloc[self.games_ranking.top('positive_ratio', 5, mask)]
                 
                 analysis['top_games'] = {
                     'labels': top_games['title'].head(5).tolist(),
@@ -178,22 +475,22 @@ class SteamDataAnalyzer:
                 analysis['top_games'] = self._get_sample_games_analysis()['top_games']
             
             # Genre analysis - using rating categories as "genres" since you don't have genre column
-            if 'rating' in real_games_df.columns:
-                rating_categories = real_games_df['rating'].value_counts().head(6)
+            if 'rating' in self.games_df.columns:
+                rating_categories = list(cube.counts_by('rating', **content_filter).items())[:6]
                 analysis['genre_distribution'] = {
-                    'labels': rating_categories.index.tolist(),
-                    'data': (rating_categories / len(real_games_df) * 100).round(1).tolist()
+                    'labels': [category for category, _ in rating_categories],
+                    'data': [round(count / filtered_count * 100, 1) for _, count in rating_categories]
                 }
-                analysis['top_genre'] = rating_categories.index[0] if len(rating_categories) > 0 else 'Unknown'
+                analysis['top_genre'] = rating_categories[0][0] if len(rating_categories) > 0 else 'Unknown'
                 print(f"🎯 Using rating categories as genres: {analysis['top_genre']}")
             else:
                 # Fallback to Steam Deck compatibility
-                deck_compatibility = real_games_df['steam_deck'].value_counts()
+                deck_compatibility = list(cube.counts_by('steam_deck', **content_filter).items())
                 analysis['genre_distribution'] = {
-                    'labels': [f"Steam Deck: {str(cat)}" for cat in deck_compatibility.index.tolist()],
-                    'data': (deck_compatibility / len(real_games_df) * 100).round(1).tolist()
+                    'labels': [f"Steam Deck: {_deck_label(status)}" for status, _ in deck_compatibility],
+                    'data': [round(count / filtered_count * 100, 1) for _, count in deck_compatibility]
                 }
-                analysis['top_genre'] = f"Steam Deck: {deck_compatibility.index[0]}"
+                analysis['top_genre'] = f"Steam Deck: {_deck_label(deck_compatibility[0][0])}"
             
             # Additional metrics
             analysis['growth_rate'] = 8.7
@@ -210,7 +507,7 @@ class SteamDataAnalyzer:
         
         return analysis
     
-    def analyze_user_behavior(self):
+    def _compute_user_analysis(self):
         """Perform user behavior analysis using YOUR ACTUAL data"""
         if not self.data_loaded or self.users_df is None or self.recommendations_df is None:
             return self._get_sample_user_analysis()
@@ -220,13 +517,15 @@ class SteamDataAnalyzer:
         try:
             print("🔍 Analyzing YOUR REAL user behavior data...")
             
+            aggregate = self.review_aggregate
+            
             # User activity trends from recommendations date
-            if 'date' in self.recommendations_df.columns:
-                self.recommendations_df['date'] = pd.to_datetime(self.recommendations_df['date'], errors='coerce')
-                monthly_activity = self.recommendations_df.set_index('date').resample('ME').size()
+            activity = self.daily_activity
+            if activity is not None:
+                monthly_activity = activity.monthly()
                 
                 months = monthly_activity.index.strftime('%b %Y').tolist()[-8:]
-                active_users = monthly_activity.tolist()[-8:]
+                active_users = [int(x) for x in monthly_activity.tolist()[-8:]]
                 
                 # Simulate new and returning users
                 new_users = [int(x * 0.3) for x in active_users]
@@ -238,13 +537,37 @@ class SteamDataAnalyzer:
                     'newUsers': new_users,
                     'returningUsers': returning_users
                 }
+                
+                weekly_activity = activity.weekly()
+                day_of_week = activity.day_of_week()
+                analysis['activity_patterns'] = {
+                    'weeks': weekly_activity.index.strftime('%d %b %Y').tolist()[-8:],
+                    'weeklyReviews': [int(x) for x in weekly_activity.tolist()[-8:]],
+                    'weekdays': day_of_week.index.tolist(),
+                    'weekdayReviews': [int(x) for x in day_of_week.tolist()]
+                }
                 print(f"📈 User activity trends analyzed: {len(months)} months")
             else:
                 analysis['activity_trends'] = self._get_sample_user_analysis()['activity_trends']
             
+            # Metrics from a weighted random sample carry confidence intervals
+            intervals = self._sample_confidence_intervals() if aggregate is None else {}
+            if intervals:
+                analysis['confidence_intervals'] = intervals
+            
             # User preferences based on recommendations
-            if 'is_recommended' in self.recommendations_df.columns:
+            if aggregate is not None and aggregate.positive_rate is not None:
+                positive_rate = aggregate.positive_rate
+                analysis['preferred_genres'] = {
+                    'labels': ['Recommended', 'Not Recommended'],
+                    'data': [round(positive_rate, 1), round(100 - positive_rate, 1)]
+                }
+                print(f"👍 Recommendation ratio: {positive_rate:.1f}% positive")
+            elif 'is_recommended' in self.recommendations_df.columns:
                 recommendation_ratio = self.recommendations_df['is_recommended'].value_counts(normalize=True) * 100
+                if 'positive_rate' in intervals:
+                    estimated = intervals['positive_rate']['estimate']
+                    recommendation_ratio = pd.Series({True: estimated, False: 100 - estimated})
                 analysis['preferred_genres'] = {
                     'labels': ['Recommended', 'Not Recommended'],
                     'data': [round(recommendation_ratio.get(True, 0), 1), 
@@ -255,9 +578,13 @@ class SteamDataAnalyzer:
                 analysis['preferred_genres'] = self._get_sample_user_analysis()['preferred_genres']
             
             # Playtime analysis
-            if 'hours' in self.recommendations_df.columns:
-                valid_hours = self.recommendations_df['hours'].dropna()
-                avg_playtime = valid_hours.mean()
+            if (aggregate is not None and aggregate.hours_mean is not None) or 'hours' in self.recommendations_df.columns:
+                if aggregate is not None and aggregate.hours_mean is not None:
+                    avg_playtime = aggregate.hours_mean
+                elif 'avg_playtime' in intervals:
+                    avg_playtime = intervals['avg_playtime']['estimate']
+                else:
+                    avg_playtime = self.recommendations_df['hours'].dropna().mean()
                 
                 analysis['user_metrics'] = {
                     'avg_playtime': f"{avg_playtime:.1f}",
@@ -268,6 +595,8 @@ class SteamDataAnalyzer:
                     'retention_growth': '8.1',
                     'peak_hours': '7-10 PM'
                 }
+                if aggregate is not None:
+                    analysis['playtime_buckets'] = dict(aggregate.playtime_buckets)
                 print(f"⏱️ Average playtime from your data: {avg_playtime:.1f} hours")
             else:
                 analysis['user_metrics'] = self._get_sample_user_analysis()['user_metrics']
@@ -390,9 +719,31 @@ class SteamDataAnalyzer:
             }
         }
 
-# Initialize the analyzer
+# Initialize the analyzer; its datasets load in the warmup phase, not at import
 analyzer = SteamDataAnalyzer()
 
+def _warm_analyzer():
+    if not analyzer.load_data():
+        raise RuntimeError("Analytics data failed to load, serving sample data")
+    return analyzer
+
+analytics_warmup = lazy_service('analytics', _warm_analyzer)
+
+# Endpoints that only inspect state and stay available while warming up
+WARMUP_EXEMPT_ENDPOINTS = {'analytics.api_datasets', 'analytics.api_refresh_status'}
+
+# HTML pages get a self-refreshing loading page instead of the JSON 503
+WARMUP_PAGE_ENDPOINTS = {'analytics.index', 'analytics.games', 'analytics.users'}
+
+@analytics_bp.before_request
+def require_warm_data():
+    """Answer fast while the datasets are still loading instead of hanging the request"""
+    if analytics_warmup.status in (COLD, WARMING) and request.endpoint not in WARMUP_EXEMPT_ENDPOINTS:
+        analytics_warmup.start()
+        if request.endpoint in WARMUP_PAGE_ENDPOINTS:
+            return warming_page(analytics_warmup)
+        return warming_response(analytics_warmup)
+
 @analytics_bp.route('/')
 @login_required
 def index():
@@ -420,33 +771,56 @@ def users():
     return render_template('analytics/analytics.html', 
                          active_tab='users',
                          user_metrics=user_analysis.get('user_metrics', {}),
-                         total_records=f"{analyzer.users_df.shape[0] if analyzer.users_df is not None else 1000}+",
+                         total_records=f"{analyzer.get_total_users() or 1000}+",
                          last_updated=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
 
 @analytics_bp.route('/api/games-analytics')
 @login_required
 def api_games_analytics():
-    """API endpoint for games analytics data"""
-    games_data = analyzer.analyze_games_data()
-    return jsonify(games_data)
+    """API endpoint for games analytics data (``?content_type=`` picks the kind of title, default game)"""
+    try:
+        context = _request_context()
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify(_games_analytics_section(context))
+
+def _games_analytics_section(context):
+    return _shared_games_analysis(context, _section_content_type(context, 'game'))
 
 @analytics_bp.route('/api/user-analytics')
 @login_required
 def api_user_analytics():
-    """API endpoint for user analytics data"""
-    user_data = analyzer.analyze_user_behavior()
-    return jsonify(user_data)
+    """API endpoint for user analytics data (``?start=&end=`` adds totals for that date range)"""
+    try:
+        context = _request_context()
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify(_user_analytics_section(context))
+
+def _user_analytics_section(context):
+    user_analysis = _shared_user_analysis(context)
+    date_range = context.params.get('date_range')
+    if date_range is None:
+        return user_analysis
+    return dict(user_analysis, date_range=analyzer.reviews_between(date_range))
 
 
 @analytics_bp.route('/api/metrics')
 @login_required
 def api_metrics():
-    """API endpoint for dashboard metrics"""
+    """API endpoint for dashboard metrics (``?content_type=`` for the games block, default game)"""
     try:
-        games_analysis = analyzer.analyze_games_data()
-        user_analysis = analyzer.analyze_user_behavior()
+        context = _request_context()
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify(_metrics_section(context))
+
+def _metrics_section(context):
+    try:
+        games_analysis = _shared_games_analysis(context, _section_content_type(context, 'game'))
+        user_analysis = _shared_user_analysis(context)
         
-        return jsonify({
+        return {
             'success': True,
             'games': {
                 'total': games_analysis.get('total_games', 0),
@@ -455,15 +829,15 @@ def api_metrics():
                 'top_genre': games_analysis.get('top_genre', 'Unknown')
             },
             'users': {
-                'total': len(analyzer.users_df) if analyzer.users_df is not None else 1000,
+                'total': analyzer.get_total_users() or 1000,
                 'avg_playtime': user_analysis.get('user_metrics', {}).get('avg_playtime', '45.2'),
                 'retention_rate': user_analysis.get('user_metrics', {}).get('retention_rate', '72')
             },
             'last_updated': datetime.now().isoformat()
-        })
+        }
     except Exception as e:
         print(f"❌ Error in metrics API: {e}")
-        return jsonify({
+        return {
             'success': True,
             'games': {
                 'total': 50872,
@@ -477,7 +851,7 @@ def api_metrics():
                 'retention_rate': '78'
             },
             'last_updated': datetime.now().isoformat()
-        })
+        }
 
 @analytics_bp.route('/debug-csv-structure')
 @login_required
@@ -485,29 +859,36 @@ def debug_csv_structure():
     """Debug your actual CSV structure"""
     debug_info = {}
     
-    if analyzer.games_df is not None:
-        debug_info['games'] = {
-            'columns': list(analyzer.games_df.columns),
-            'first_row': analyzer.games_df.iloc[0].to_dict() if len(analyzer.games_df) > 0 else 'No data',
-            'total_rows': len(analyzer.games_df)
-        }
-    
-    if analyzer.users_df is not None:
-        debug_info['users'] = {
-            'columns': list(analyzer.users_df.columns),
-            'first_row': analyzer.users_df.iloc[0].to_dict() if len(analyzer.users_df) > 0 else 'No data',
-            'total_rows': len(analyzer.users_df)
-        }
-        
-    if analyzer.recommendations_df is not None:
-        debug_info['recommendations'] = {
-            'columns': list(analyzer.recommendations_df.columns),
-            'first_row': analyzer.recommendations_df.iloc[0].to_dict() if len(analyzer.recommendations_df) > 0 else 'No data',
-            'total_rows': len(analyzer.recommendations_df)
+    frames = {
+        'games': analyzer.games_df,
+        'users': analyzer.users_df,
+        'recommendations': analyzer.recommendations_df
+    }
+    for name, df in frames.items():
+        if df is None:
+            continue
+        debug_info[name] = {
+            'columns': list(df.columns),
+            'first_row': json.loads(df.head(1).to_json(orient='records', date_format='iso'))[0] if len(df) > 0 else 'No data',
+            'total_rows': len(df),
+            # Bytes per column with the declared schema vs. pandas defaults
+            'memory': memory_report(df)
         }
     
     return jsonify(debug_info)
 
+@analytics_bp.route('/api/datasets')
+@login_required
+def api_datasets():
+    """What the shared dataset registry has loaded, from where and at what memory cost"""
+    datasets = analyzer.registry.describe()
+    return jsonify({
+        'success': True,
+        'datasets': datasets,
+        'data_version': analyzer.data_version,
+        'total_memory_bytes': sum(d.get('memory_bytes', 0) for d in datasets)
+    })
+
 
 
 # Add these routes to your existing analytics.py
@@ -668,19 +1049,22 @@ def generate_suggestions(query):
 @login_required
 def api_dashboard_metrics():
     """API endpoint for dashboard metrics"""
+    return jsonify(_dashboard_metrics_section(BundleContext()))
+
+def _dashboard_metrics_section(context):
     try:
-        metrics = analyzer.get_real_time_metrics()
-        top_games = analyzer.get_top_performing_games(4)
+        metrics = _shared_real_time_metrics(context)
+        top_games = _shared_top_games(context, 4)
         
-        return jsonify({
+        return {
             'success': True,
             'metrics': metrics,
             'top_games': top_games,
             'last_updated': datetime.now().isoformat()
-        })
+        }
     except Exception as e:
         print(f"Error in dashboard metrics: {e}")
-        return jsonify({
+        return {
             'success': True,
             'metrics': {
                 'total_games': 50872,
@@ -695,12 +1079,15 @@ def api_dashboard_metrics():
             },
             'top_games': [],
             'last_updated': datetime.now().isoformat()
-        })
+        }
 
 @analytics_bp.route('/api/csv-stats')
 @login_required
 def api_csv_stats():
     """API endpoint for CSV statistics"""
+    return jsonify(_csv_stats_section(BundleContext()))
+
+def _csv_stats_section(context):
     try:
         stats = {
             'total_games': len(analyzer.games_df) if analyzer.games_df is not None else 50872,
@@ -710,13 +1097,13 @@ def api_csv_stats():
             'data_loaded': analyzer.data_loaded
         }
         
-        return jsonify({
+        return {
             'success': True,
             'stats': stats
-        })
+        }
     except Exception as e:
         print(f"Error in CSV stats: {e}")
-        return jsonify({
+        return {
             'success': True,
             'stats': {
                 'total_games': 50872,
@@ -725,17 +1112,41 @@ def api_csv_stats():
                 'average_rating': 4.2,
                 'data_loaded': False
             }
-        })
+        }
 
 @analytics_bp.route('/api/refresh-data')
 @login_required
 def api_refresh_data():
-    """API endpoint to refresh data"""
-    success = analyzer.load_data()
+    """Start a background data refresh; poll the returned status URL for progress
+
+    ``?mode=reviews`` only ingests reviews appended to recommendations.csv.
+    """
+    mode = request.args.get('mode', 'full')
+    if mode not in ('full', 'reviews'):
+        return jsonify({'success': False, 'error': f"Unknown refresh mode: {mode}"}), 400
+    job = analyzer.start_refresh(mode)
     return jsonify({
-        'success': success,
-        'message': 'Data refreshed successfully' if success else 'Error refreshing data',
+        'success': True,
+        'job_id': job['job_id'],
+        'status': job['status'],
+        'status_url': url_for('analytics.api_refresh_status', job_id=job['job_id']),
+        'mode': mode,
+        'data_version': analyzer.data_version,
+        'message': 'Data refresh started',
         'timestamp': datetime.now().isoformat()
+    }), 202
+
+@analytics_bp.route('/api/refresh-data/<job_id>')
+@login_required
+def api_refresh_status(job_id):
+    """Status of a background data refresh"""
+    job = analyzer.reload_jobs.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Unknown refresh job'}), 404
+    return jsonify({
+        'success': True,
+        'job': job,
+        'data_version': analyzer.data_version
     })
 
 # Add these methods to your SteamDataAnalyzer class in analytics.py
@@ -748,10 +1159,10 @@ def get_games_summary(self):
     summary = {
         'total_games': len(self.games_df),
         'price_stats': {
-            'avg_price': round(self.games_df['price_final'].mean(), 2),
-            'max_price': round(self.games_df['price_final'].max(), 2),
-            'min_price': round(self.games_df['price_final'].min(), 2),
-            'median_price': round(self.games_df['price_final'].median(), 2)
+            'avg_price': round(float(self.games_df['price_final'].mean()), 2),
+            'max_price': round(float(self.games_df['price_final'].max()), 2),
+            'min_price': round(float(self.games_df['price_final'].min()), 2),
+            'median_price': round(float(self.games_df['price_final'].median()), 2)
         },
         'rating_stats': {
             'avg_rating': round(self.games_df['positive_ratio'].mean() / 20, 1),
@@ -769,28 +1180,51 @@ def get_user_summary(self):
     if not self.data_loaded or self.users_df is None or self.recommendations_df is None:
         return {}
     
+    aggregate = self.review_aggregate
+    if aggregate is not None:
+        summary = {
+            'total_users': self.get_total_users(),
+            'total_recommendations': aggregate.total_rows,
+            'recommendation_stats': {
+                'positive_rate': round(aggregate.positive_rate or 0, 1),
+                'avg_playtime': round(aggregate.hours_mean or 0, 1),
+                'total_playtime': round(aggregate.hours_sum, 1)
+            },
+            'activity_trends': self._get_activity_trends(),
+            'engagement_patterns': self._get_engagement_patterns()
+        }
+        return summary
+    
     summary = {
         'total_users': len(self.users_df),
         'total_recommendations': len(self.recommendations_df),
         'recommendation_stats': {
             'positive_rate': round((self.recommendations_df['is_recommended'].sum() / len(self.recommendations_df)) * 100, 1),
-            'avg_playtime': round(self.recommendations_df['hours'].mean(), 1),
-            'total_playtime': round(self.recommendations_df['hours'].sum(), 1)
+            'avg_playtime': round(float(self.recommendations_df['hours'].mean()), 1),
+            'total_playtime': round(float(self.recommendations_df['hours'].sum()), 1)
         },
         'activity_trends': self._get_activity_trends(),
         'engagement_patterns': self._get_engagement_patterns()
     }
+    
+    intervals = self._sample_confidence_intervals()
+    if intervals:
+        # Weighted estimates replace the raw sample figures
+        for name, interval in intervals.items():
+            summary['recommendation_stats'][name] = round(interval['estimate'], 1)
+            summary['total_recommendations'] = interval['population']
+        summary['confidence_intervals'] = intervals
     return summary
 
 def _get_price_distribution(self):
     """Get price distribution for insights"""
-    prices = self.games_df['price_final']
+    cube = self.games_cube
     return {
-        'free_games': len(prices[prices == 0]),
-        'under_10': len(prices[(prices > 0) & (prices <= 10)]),
-        'under_20': len(prices[(prices > 10) & (prices <= 20)]),
-        'under_30': len(prices[(prices > 20) & (prices <= 30)]),
-        'over_30': len(prices[prices > 30])
+        'free_games': cube.count(price_bucket='free'),
+        'under_10': cube.count(price_bucket=['0-5', '5-10']),
+        'under_20': cube.count(price_bucket='10-20'),
+        'under_30': cube.count(price_bucket='20-30'),
+        'over_30': cube.count(price_bucket=['30-40', '40+'])
     }
 
 def _get_recent_trends(self):
@@ -804,17 +1238,22 @@ def _get_recent_trends(self):
 
 def _get_activity_trends(self):
     """Get user activity trends"""
-    if 'date' in self.recommendations_df.columns:
-        self.recommendations_df['date'] = pd.to_datetime(self.recommendations_df['date'])
-        monthly = self.recommendations_df.set_index('date').resample('ME').size()
+    activity = self.daily_activity
+    if activity is not None:
+        monthly = activity.monthly()
+        day_of_week = activity.day_of_week()
         return {
-            'recent_activity': monthly.iloc[-1] if len(monthly) > 0 else 0,
-            'growth_rate': ((monthly.iloc[-1] - monthly.iloc[-2]) / monthly.iloc[-2] * 100) if len(monthly) > 1 else 0
+            'recent_activity': int(monthly.iloc[-1]) if len(monthly) > 0 else 0,
+            'growth_rate': float((monthly.iloc[-1] - monthly.iloc[-2]) / monthly.iloc[-2] * 100) if len(monthly) > 1 else 0,
+            'busiest_weekday': day_of_week.idxmax() if activity.total > 0 else None
         }
     return {}
 
 def _get_engagement_patterns(self):
     """Get user engagement patterns"""
+    if self.review_aggregate is not None:
+        return dict(self.review_aggregate.playtime_buckets)
+    
     playtime = self.recommendations_df['hours']
     return {
         'casual_players': len(playtime[playtime <= 10]),
@@ -828,11 +1267,14 @@ def _get_engagement_patterns(self):
 @login_required
 def api_data_summary():
     """API endpoint for comprehensive data summary"""
+    return _section_response(_data_summary_section(BundleContext()))
+
+def _data_summary_section(context):
     try:
         games_summary = analyzer.get_games_summary()
         user_summary = analyzer.get_user_summary()
         
-        return jsonify({
+        return {
             'success': True,
             'games': games_summary,
             'users': user_summary,
@@ -841,60 +1283,175 @@ def api_data_summary():
                 'users': len(analyzer.users_df) if analyzer.users_df is not None else 0,
                 'recommendations': len(analyzer.recommendations_df) if analyzer.recommendations_df is not None else 0
             }
-        })
+        }
     except Exception as e:
         print(f"❌ Error in data summary API: {e}")
-        return jsonify({
+        return {
             'success': False,
             'error': str(e)
-        }), 500
+        }
     
 # Add these routes to your EXISTING analytics.py file
 
 @analytics_bp.route('/api/real-time-metrics')
 @login_required
 def api_real_time_metrics():
-    """API endpoint for real-time dashboard metrics from actual data"""
+    """API endpoint for real-time dashboard metrics from actual data (``?content_type=`` filters games)"""
     try:
-        metrics = analyzer.get_real_time_metrics()
+        context = _request_context()
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return _section_response(_real_time_metrics_section(context))
+
+def _real_time_metrics_section(context):
+    try:
+        metrics = _shared_real_time_metrics(context, _section_content_type(context, None))
         
-        return jsonify({
+        return {
             'success': True,
             'metrics': metrics,
             'last_updated': datetime.now().isoformat()
-        })
+        }
     except Exception as e:
         print(f"❌ Error in real-time metrics API: {e}")
-        return jsonify({
+        return {
             'success': False,
             'error': str(e)
-        }), 500
+        }
 
 @analytics_bp.route('/api/top-games')
 @login_required
 def api_top_games():
-    """API endpoint for top performing games from actual data"""
+    """API endpoint for top performing games from actual data (``?content_type=``, default game)
+    
+    ``?rank_by=`` is positive_ratio (default), review_count, recommend_rate or mean_hours;
+    ``?start=&end=`` (dates, inclusive, either may be omitted) ranks by recommending reviews in that range.
+    """
+    try:
+        context = _request_context()
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return _section_response(_top_games_section(context))
+
+def _top_games_section(context):
     try:
-        top_games = analyzer.get_top_performing_games(6)
+        top_games = _shared_top_games(context, 6, _section_content_type(context, 'game'),
+                                      context.params.get('date_range'), context.params.get('rank_by'))
         
-        return jsonify({
+        return {
             'success': True,
             'games': top_games,
             'last_updated': datetime.now().isoformat()
-        })
+        }
     except Exception as e:
         print(f"❌ Error in top games API: {e}")
-        return jsonify({
+        return {
             'success': False,
             'error': str(e)
-        }), 500
+        }
+
+# Dashboard sections, servable one per endpoint or several at once through /api/bundle
+BUNDLE_SECTIONS = {
+    'metrics': _metrics_section,
+    'dashboard_metrics': _dashboard_metrics_section,
+    'real_time_metrics': _real_time_metrics_section,
+    'top_games': _top_games_section,
+    'data_summary': _data_summary_section,
+    'csv_stats': _csv_stats_section,
+    'games_analytics': _games_analytics_section,
+    'user_analytics': _user_analytics_section
+}
+
+@analytics_bp.route('/api/bundle')
+@login_required
+def api_bundle():
+    """Several dashboard sections in one response (``?parts=metrics,top_games,...``, default all)
+
+    Sections share intermediates (real-time metrics, top games, the games and
+    user analyses), so each is computed once per bundle, all from the same
+    data version. ``?content_type=`` and ``?start=&end=`` apply to every
+    section that takes them.
+    The body is gzipped when the client accepts it.
+    """
+    try:
+        parts = parse_parts(request.args.get('parts'), BUNDLE_SECTIONS)
+        context = _request_context()
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    payload = {
+        'success': True,
+        'parts': build_bundle(BUNDLE_SECTIONS, parts, context),
+        'last_updated': datetime.now().isoformat()
+    }
+    body, encoding = encode_body(current_app.json.dumps(payload).encode('utf-8'),
+                                 request.headers.get('Accept-Encoding', ''))
+    response = current_app.response_class(body, mimetype='application/json')
+    response.vary.add('Accept-Encoding')
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+def _request_context():
+    """Bundle context for this request; raises ValueError for an unknown ``?content_type=`` or a bad date"""
+    content_type = request.args.get('content_type')
+    if content_type is not None:
+        parse_content_type(content_type)
+    date_range = parse_date_range(request.args.get('start'), request.args.get('end'))
+    rank_by = request.args.get('rank_by', 'positive_ratio')
+    if rank_by not in ('positive_ratio',) + REVIEW_RANKING_KEYS:
+        raise ValueError(f"Unknown rank_by: {rank_by} (expected positive_ratio, {', '.join(REVIEW_RANKING_KEYS)})")
+    return BundleContext(content_type=content_type, date_range=date_range, rank_by=rank_by)
+
+def _section_content_type(context, default):
+    """The requested content type, else the section's own default"""
+    content_type = context.params.get('content_type')
+    return parse_content_type(content_type if content_type is not None else default)
+
+def _section_response(payload):
+    return jsonify(payload), (200 if payload.get('success', True) else 500)
+
+def _shared_real_time_metrics(context, content_type=None):
+    return context.get(('real_time_metrics', content_type), lambda: analyzer.get_real_time_metrics(content_type))
+
+def _shared_games_analysis(context, content_type):
+    return context.get(('games_analysis', content_type), lambda: analyzer.analyze_games_data(content_type))
+
+def _shared_user_analysis(context):
+    return context.get('user_analysis', analyzer.analyze_user_behavior)
+
+def _shared_top_games(context, limit, content_type='game', date_range=None, rank_by='positive_ratio'):
+    """Top ``limit`` games; shorter lists are prefixes of the longest one already computed"""
+    key = ('top_games', content_type, date_range, rank_by)
+    computed_limit, games = context.get(key, lambda: (0, []))
+    if limit > computed_limit:
+        games = analyzer.get_top_performing_games(limit, content_type, date_range, rank_by)
+        computed_limit, games = context.set(key, (limit, games))
+    return games[:limit]
 
 @analytics_bp.route('/api/query-analytics', methods=['POST'])
 @login_required
 def api_query_analytics():
-    """API endpoint for query-based analytics from actual data"""
+    """API endpoint for query-based analytics from actual data
+
+    Takes either a free-text ``question`` or a structured ``query`` (filters,
+    group_by, aggregations; see app.services.query_engine.Query).
+    """
     try:
-        data = request.get_json()
+        data = request.get_json() or {}
+        if 'query' in data:
+            try:
+                result = analyzer.query(data['query'])
+            except QueryError as e:
+                return jsonify({'success': False, 'error': str(e)}), 400
+            return jsonify({
+                'success': True,
+                'query': data['query'],
+                'result': result,
+                'data_version': analyzer.data_version,
+                'timestamp': datetime.now().isoformat()
+            })
+        
         question = data.get('question', '').strip()
         
         if not question:
@@ -1015,9 +1572,9 @@ def generate_ai_insights(games_data, users_data):
     
     return insights
 
-# Add these methods to your existing SteamDataAnalyzer class in analytics.py
+# Add these methods to your existing SteamDataAnalyzer class
 
-def get_real_time_metrics(self):
+def get_real_time_metrics(self, content_type=None):
     """Get real-time metrics from actual CSV data"""
     if not self.data_loaded:
         return self._get_sample_metrics()
@@ -1025,28 +1582,51 @@ def get_real_time_metrics(self):
     metrics = {}
     
     try:
-        # Games metrics from your actual data
+        # Games metrics from your actual data, optionally for one content type
         if self.games_df is not None:
-            metrics['total_games'] = len(self.games_df)
-            metrics['avg_price'] = round(self.games_df['price_final'].mean(), 2)
-            metrics['avg_rating'] = round(self.games_df['positive_ratio'].mean() / 20, 1)
-            
-            # Calculate free vs paid games
-            free_games = len(self.games_df[self.games_df['price_final'] == 0])
-            metrics['free_games_count'] = free_games
-            metrics['free_games_percentage'] = round((free_games / len(self.games_df)) * 100, 1)
+            cube = self.games_cube
+            content_filter = {'content_type': content_type} if content_type else {}
+            total_games = cube.count(**content_filter)
+            metrics['total_games'] = total_games
+            if total_games > 0:
+                metrics['avg_price'] = round(cube.stats('price_final', **content_filter)['mean'], 2)
+                metrics['avg_rating'] = round(cube.stats('positive_ratio', **content_filter)['mean'] / 20, 1)
+                # Exact: the games table is small enough to scan (and the query result is cached)
+                price_filters = [['content_type', '==', content_type]] if content_type else []
+                price_quantiles = self.query({
+                    'dataset': 'games', 'filters': price_filters,
+                    'aggregations': [['quantile', 'price_final', q, f"p{q * 100:g}"] for q in (0.5, 0.9, 0.99)]
+                })['rows'][0]
+                metrics['price_quantiles'] = {name: round(float(value), 2) if pd.notna(value) else None
+                                              for name, value in price_quantiles.items()}
+                
+                # Calculate free vs paid games
+                free_games = cube.count(price_bucket='free', **content_filter)
+                metrics['free_games_count'] = free_games
+                metrics['free_games_percentage'] = round((free_games / total_games) * 100, 1)
+            if content_type:
+                metrics['content_type'] = content_type
             
             # Steam Deck compatibility
             if 'steam_deck' in self.games_df.columns:
-                deck_compatible = self.games_df['steam_deck'].value_counts()
-                metrics['steam_deck_verified'] = deck_compatible.get('Verified', 0)
+                # steam_deck is boolean; the cube keys it by label
+                metrics['steam_deck_verified'] = cube.count(steam_deck=str(True), **content_filter)
         
         # Users metrics
-        if self.users_df is not None:
-            metrics['total_users'] = len(self.users_df)
+        if self.get_total_users() is not None:
+            metrics['total_users'] = self.get_total_users()
         
         # Recommendations metrics
-        if self.recommendations_df is not None:
+        aggregate = self.review_aggregate
+        if aggregate is not None:
+            metrics['total_recommendations'] = aggregate.total_rows
+            if aggregate.positive_rate is not None:
+                metrics['positive_recommendation_rate'] = round(aggregate.positive_rate, 1)
+            if aggregate.hours_mean is not None:
+                metrics['avg_playtime'] = round(aggregate.hours_mean, 1)
+            if aggregate.sketches is not None:
+                metrics['review_sketches'] = aggregate.sketches.summary()
+        elif self.recommendations_df is not None:
             metrics['total_recommendations'] = len(self.recommendations_df)
             
             if 'is_recommended' in self.recommendations_df.columns:
@@ -1056,7 +1636,15 @@ def get_real_time_metrics(self):
                 )
             
             if 'hours' in self.recommendations_df.columns:
-                metrics['avg_playtime'] = round(self.recommendations_df['hours'].mean(), 1)
+                metrics['avg_playtime'] = round(float(self.recommendations_df['hours'].mean()), 1)
+            
+            intervals = self._sample_confidence_intervals()
+            if 'positive_rate' in intervals:
+                metrics['positive_recommendation_rate'] = round(intervals['positive_rate']['estimate'], 1)
+            if 'avg_playtime' in intervals:
+                metrics['avg_playtime'] = round(intervals['avg_playtime']['estimate'], 1)
+            if intervals:
+                metrics['confidence_intervals'] = intervals
         
         return metrics
         
@@ -1064,407 +1652,65 @@ def get_real_time_metrics(self):
         print(f"Error getting real-time metrics: {e}")
         return self._get_sample_metrics()
 
-def get_top_performing_games(self, limit=6):
-    """Get top performing games based on actual data"""
-    if self.games_df is None:
-        return []
-    
-    try:
-        # Filter out DLCs and soundtracks
-        real_games_mask = ~self.games_df['title'].str.contains(
-            'Soundtrack|OST|DLC|Content|Add-On|Pack|Bundle|Artbook|Season Pass', 
-            case=False, na=False
-        )
-        real_games_df = self.games_df[real_games_mask]
-        
-        if len(real_games_df) == 0:
-            real_games_df = self.games_df
-        
-        # Get top games by positive ratio with reasonable review count
-        top_games = real_games_df.nlargest(limit, 'positive_ratio')
-        
-        games_list = []
-        for _, game in top_games.iterrows():
-            games_list.append({
-                'name': game['title'],
-                'rating': round(game['positive_ratio'] / 20, 1),
-                'positive_ratio': game['positive_ratio'],
-                'price': game['price_final'],
-                'discount': game['discount'],
-                'steam_deck': game.get('steam_deck', 'Unknown')
-            })
-        
-        return games_list
-        
-    except Exception as e:
-        print(f"Error getting top games: {e}")
-        return []
+def _python_scalar(value):
+    """numpy scalar -> plain Python value, so results serialize cleanly"""
+    return value.item() if isinstance(value, np.generic) else value
 
-def query_data_analytics(self, question):
-    """Generate AI insights based on user questions about the actual data"""
-    question_lower = question.lower()
-    
-    try:
-        # Price analysis queries
-        if any(word in question_lower for word in ['price', 'cost', 'expensive', 'cheap', 'pricing']):
-            return self._analyze_pricing_data(question)
-        
-        # Rating analysis queries
-        elif any(word in question_lower for word in ['rating', 'review', 'score', 'quality', 'positive']):
-            return self._analyze_rating_data(question)
-        
-        # Game analysis queries
-        elif any(word in question_lower for word in ['game', 'title', 'popular', 'top']):
-            return self._analyze_games_data(question)
-        
-        # User behavior queries
-        elif any(word in question_lower for word in ['user', 'player', 'behavior', 'playtime', 'hour']):
-            return self._analyze_user_behavior(question)
-        
-        # Market analysis queries
-        elif any(word in question_lower for word in ['market', 'trend', 'discount', 'sale']):
-            return self._analyze_market_trends(question)
-        
-        # Steam Deck queries
-        elif any(word in question_lower for word in ['steam deck', 'deck', 'compatible']):
-            return self._analyze_steam_deck(question)
-        
-        # General overview
-        else:
-            return self._get_general_overview(question)
-            
-    except Exception as e:
-        print(f"Error in query analytics: {e}")
-        return "I apologize, but I encountered an error analyzing the data. Please try again."
+def _deck_label(value):
+    """Boolean steam_deck value (or its cube label) -> display text"""
+    return {'True': 'Compatible', 'False': 'Not compatible'}.get(str(value), 'Unknown')
 
-def _analyze_pricing_data(self, question):
-    """Analyze pricing data based on user query"""
-    if self.games_df is None:
-        return "Pricing data is not available."
-    
-    price_stats = self.games_df['price_final'].describe()
-    free_games = len(self.games_df[self.games_df['price_final'] == 0])
-    premium_games = len(self.games_df[self.games_df['price_final'] > 30])
-    
-    response = f"""
-💰 **Pricing Analysis - Real Data**
+def _day_iso(day):
+    """Day number -> 'YYYY-MM-DD' (None stays None)"""
+    return None if day is None else str(np.datetime64(int(day), 'D'))
 
-• **Total Games**: {len(self.games_df):,}
-• **Average Price**: ${price_stats['mean']:.2f}
-• **Price Range**: ${price_stats['min']:.2f} - ${price_stats['max']:.2f}
-• **Free Games**: {free_games:,} ({free_games/len(self.games_df)*100:.1f}%)
-• **Premium Games** (>$30): {premium_games:,}
-
-**Market Insights:**
-"""
-    
-    if price_stats['mean'] < 10:
-        response += "• Market favors budget-friendly pricing\n"
-        response += "• Strong free-to-play ecosystem\n"
-        response += "• Opportunity for premium gaming experiences\n"
-    elif price_stats['mean'] > 25:
-        response += "• Premium pricing model established\n"
-        response += "• Users willing to pay for quality\n"
-        response += "• Value proposition is key\n"
-    else:
-        response += "• Balanced pricing strategy\n"
-        response += "• Mix of budget and premium options\n"
-    
-    # Discount analysis
-    discounted = self.games_df[self.games_df['discount'] > 0]
-    if len(discounted) > 0:
-        response += f"• **Discount Activity**: {len(discounted):,} games on sale (avg {discounted['discount'].mean():.1f}% off)\n"
+def get_top_performing_games(self, limit=6, content_type='game', date_range=None, rank_by='positive_ratio'):
+    """Get top performing games based on actual data
     
-    return response
-
-def _analyze_rating_data(self, question):
-    """Analyze rating data based on user query"""
-    if self.games_df is None or 'positive_ratio' not in self.games_df.columns:
-        return "Rating data is not available."
-    
-    rating_stats = self.games_df['positive_ratio'].describe()
-    high_rated = len(self.games_df[self.games_df['positive_ratio'] >= 80])
-    low_rated = len(self.games_df[self.games_df['positive_ratio'] <= 40])
-    
-    response = f"""
-⭐ **Rating Analysis - Real Data**
-
-• **Average Rating**: {rating_stats['mean']/20:.1f}/5 ({rating_stats['mean']:.1f}% positive)
-• **Rating Distribution**:
-  - Overwhelmingly Positive (≥90%): {len(self.games_df[self.games_df['positive_ratio'] >= 90]):,}
-  - Very Positive (80-89%): {len(self.games_df[(self.games_df['positive_ratio'] >= 80) & (self.games_df['positive_ratio'] < 90)]):,}
-  - Positive (70-79%): {len(self.games_df[(self.games_df['positive_ratio'] >= 70) & (self.games_df['positive_ratio'] < 80)]):,}
-  - Mixed (40-69%): {len(self.games_df[(self.games_df['positive_ratio'] >= 40) & (self.games_df['positive_ratio'] < 70)]):,}
-  - Negative (≤39%): {low_rated:,}
-
-**Quality Insights:**
-"""
-    
-    if rating_stats['mean'] >= 70:
-        response += "• Strong overall game quality across platform\n"
-        response += "• High user satisfaction levels\n"
-        response += "• Quality control appears effective\n"
-    else:
-        response += "• Mixed user reception\n"
-        response += "• Quality improvement opportunities\n"
-        response += "• User expectations vary widely\n"
-    
-    return response
-
-def _analyze_games_data(self, question):
-    """Analyze games data based on user query"""
-    if self.games_df is None:
-        return "Games data is not available."
-    
-    top_games = self.get_top_performing_games(5)
-    
-    response = """
-🎮 **Top Performing Games - Real Data**
-
-**Highest Rated Games:**
-"""
-    
-    for i, game in enumerate(top_games, 1):
-        price_info = "Free" if game['price'] == 0 else f"${game['price']}"
-        deck_status = f" | Steam Deck: {game['steam_deck']}" if game.get('steam_deck') else ""
-        response += f"{i}. **{game['name']}** - {game['rating']}/5 ({game['positive_ratio']}% positive) - {price_info}{deck_status}\n"
-    
-    response += f"\n**Platform Overview:**\n"
-    response += f"• **Total Games Analyzed**: {len(self.games_df):,}\n"
-    
-    return response
-
-def _analyze_user_behavior(self, question):
-    """Analyze user behavior data"""
-    insights = []
-    
-    if self.recommendations_df is not None:
-        if 'is_recommended' in self.recommendations_df.columns:
-            positive_rate = (self.recommendations_df['is_recommended'].sum() / len(self.recommendations_df)) * 100
-            insights.append(f"• **Recommendation Rate**: {positive_rate:.1f}% positive")
-        
-        if 'hours' in self.recommendations_df.columns:
-            playtime_stats = self.recommendations_df['hours'].describe()
-            insights.append(f"• **Average Playtime**: {playtime_stats['mean']:.1f} hours")
-            insights.append(f"• **Playtime Range**: {playtime_stats['min']:.1f} - {playtime_stats['max']:.1f} hours")
-            
-            # Engagement analysis
-            heavy_players = len(self.recommendations_df[self.recommendations_df['hours'] > 100])
-            insights.append(f"• **Heavy Players** (100+ hours): {heavy_players:,}")
-    
-    if self.users_df is not None:
-        insights.append(f"• **Total Users Analyzed**: {len(self.users_df):,}")
-    
-    response = "👥 **User Behavior Analysis - Real Data**\n\n" + "\n".join(insights)
-    
-    if len(insights) > 0:
-        response += "\n\n**Engagement Insights:**\n"
-        if 'hours' in self.recommendations_df.columns:
-            avg_playtime = self.recommendations_df['hours'].mean()
-            if avg_playtime > 50:
-                response += "• High user engagement levels\n"
-                response += "• Games provide long-term value\n"
-            elif avg_playtime < 10:
-                response += "• Casual gaming patterns\n"
-                response += "• Opportunity for deeper engagement\n"
-    
-    return response
-
-def _analyze_market_trends(self, question):
-    """Analyze market trends"""
-    if self.games_df is None:
-        return "Market data is not available."
-    
-    response = """
-📊 **Market Trends Analysis - Real Data**
-
-**Price Distribution:**
-"""
-    
-    # Price categories
-    price_categories = {
-        'Free': len(self.games_df[self.games_df['price_final'] == 0]),
-        'Under $10': len(self.games_df[(self.games_df['price_final'] > 0) & (self.games_df['price_final'] <= 10)]),
-        '$11-$20': len(self.games_df[(self.games_df['price_final'] > 10) & (self.games_df['price_final'] <= 20)]),
-        '$21-$30': len(self.games_df[(self.games_df['price_final'] > 20) & (self.games_df['price_final'] <= 30)]),
-        'Over $30': len(self.games_df[self.games_df['price_final'] > 30])
-    }
-    
-    for category, count in price_categories.items():
-        if count > 0:
-            percentage = (count / len(self.games_df)) * 100
-            response += f"• {category}: {count:,} games ({percentage:.1f}%)\n"
-    
-    response += f"\n**Discount Activity:**\n"
-    discounted = self.games_df[self.games_df['discount'] > 0]
-    if len(discounted) > 0:
-        response += f"• Games on Sale: {len(discounted):,}\n"
-        response += f"• Average Discount: {discounted['discount'].mean():.1f}%\n"
-    
-    response += f"\n**Market Opportunities:**\n"
-    response += "• Analyze under-served price points\n"
-    response += "• Monitor discount effectiveness\n"
-    response += "• Identify quality-price sweet spots\n"
-    
-    return response
-
-def _analyze_steam_deck(self, question):
-    """Analyze Steam Deck compatibility"""
-    if self.games_df is None or 'steam_deck' not in self.games_df.columns:
-        return "Steam Deck compatibility data is not available."
-    
-    deck_stats = self.games_df['steam_deck'].value_counts()
-    
-    response = """
-🎯 **Steam Deck Compatibility - Real Data**
-
-**Compatibility Status:**
-"""
-    
-    total_games = len(self.games_df)
-    for status, count in deck_stats.items():
-        percentage = (count / total_games) * 100
-        response += f"• {status}: {count:,} games ({percentage:.1f}%)\n"
-    
-    # Analyze verified games ratings and prices
-    verified_games = self.games_df[self.games_df['steam_deck'] == 'Verified']
-    if len(verified_games) > 0:
-        avg_rating_verified = verified_games['positive_ratio'].mean() / 20
-        avg_price_verified = verified_games['price_final'].mean()
-        
-        response += f"\n**Verified Games Analysis:**\n"
-        response += f"• Average Rating: {avg_rating_verified:.1f}/5\n"
-        response += f"• Average Price: ${avg_price_verified:.2f}\n"
-        response += f"• Quality: {'Above average' if avg_rating_verified > 3.5 else 'Standard'}\n"
-    
-    return response
-
-def _get_general_overview(self, question):
-    """Provide general data overview"""
-    response = "🔍 **Steam Analytics Overview - Real Data**\n\n"
-    
-    if self.games_df is not None:
-        response += f"• **Games Database**: {len(self.games_df):,} games\n"
-        response += f"• **Average Price**: ${self.games_df['price_final'].mean():.2f}\n"
-        response += f"• **Average Rating**: {self.games_df['positive_ratio'].mean()/20:.1f}/5\n"
-        
-        # Steam Deck info
-        if 'steam_deck' in self.games_df.columns:
-            verified = len(self.games_df[self.games_df['steam_deck'] == 'Verified'])
-            response += f"• **Steam Deck Verified**: {verified:,} games\n"
-    
-    if self.users_df is not None:
-        response += f"• **Users Analyzed**: {len(self.users_df):,}\n"
-    
-    if self.recommendations_df is not None:
-        response += f"• **Recommendations**: {len(self.recommendations_df):,}\n"
-        if 'is_recommended' in self.recommendations_df.columns:
-            positive_rate = (self.recommendations_df['is_recommended'].sum() / len(self.recommendations_df)) * 100
-            response += f"• **Positive Reviews**: {positive_rate:.1f}%\n"
-    
-    response += "\n**Ask me about:**\n"
-    response += "• Game pricing and market trends\n"
-    response += "• User ratings and quality analysis\n"
-    response += "• Top performing games\n"
-    response += "• User engagement and playtime patterns\n"
-    response += "• Steam Deck compatibility\n"
-    response += "• Discount strategies and sales data\n"
-    
-    return response
-
-def _get_sample_metrics(self):
-    """Fallback sample metrics"""
-    return {
-        'total_games': 50872,
-        'avg_price': 19.99,
-        'avg_rating': 4.2,
-        'free_games_count': 15261,
-        'free_games_percentage': 30.0,
-        'total_users': 50000,
-        'total_recommendations': 100000,
-        'positive_recommendation_rate': 75.5,
-        'avg_playtime': 45.2,
-        'steam_deck_verified': 12000
-    }
-
-# Add these methods to your existing SteamDataAnalyzer class
-
-def get_real_time_metrics(self):
-    """Get real-time metrics from actual CSV data"""
-    if not self.data_loaded:
-        return self._get_sample_metrics()
-    
-    metrics = {}
-    
-    try:
-        # Games metrics from your actual data
-        if self.games_df is not None:
-            metrics['total_games'] = len(self.games_df)
-            metrics['avg_price'] = round(self.games_df['price_final'].mean(), 2)
-            metrics['avg_rating'] = round(self.games_df['positive_ratio'].mean() / 20, 1)
-            
-            # Calculate free vs paid games
-            free_games = len(self.games_df[self.games_df['price_final'] == 0])
-            metrics['free_games_count'] = free_games
-            metrics['free_games_percentage'] = round((free_games / len(self.games_df)) * 100, 1)
-            
-            # Steam Deck compatibility
-            if 'steam_deck' in self.games_df.columns:
-                deck_compatible = self.games_df['steam_deck'].value_counts()
-                metrics['steam_deck_verified'] = deck_compatible.get('Verified', 0)
-        
-        # Users metrics
-        if self.users_df is not None:
-            metrics['total_users'] = len(self.users_df)
-        
-        # Recommendations metrics
-        if self.recommendations_df is not None:
-            metrics['total_recommendations'] = len(self.recommendations_df)
-            
-            if 'is_recommended' in self.recommendations_df.columns:
-                positive_recommendations = self.recommendations_df['is_recommended'].sum()
-                metrics['positive_recommendation_rate'] = round(
-                    (positive_recommendations / len(self.recommendations_df)) * 100, 1
-                )
-            
-            if 'hours' in self.recommendations_df.columns:
-                metrics['avg_playtime'] = round(self.recommendations_df['hours'].mean(), 1)
-        
-        return metrics
-        
-    except Exception as e:
-        print(f"Error getting real-time metrics: {e}")
-        return self._get_sample_metrics()
-
-def get_top_performing_games(self, limit=6):
-    """Get top performing games based on actual data"""
+    ``rank_by`` is positive_ratio (games.csv) or one of the review-log keys
+    review_count, recommend_rate and mean_hours, which also add each game's
+    review stats. With ``date_range`` (inclusive start/end day numbers) games
+    are ranked by recommending reviews inside the range instead, from the
+    review time index.
+    """
     if self.games_df is None:
         return []
     
     try:
-        # Filter out DLCs and soundtracks
-        real_games_mask = ~self.games_df['title'].str.contains(
-            'Soundtrack|OST|DLC|Content|Add-On|Pack|Bundle|Artbook|Season Pass', 
-            case=False, na=False
-        )
-        real_games_df = self.games_df[real_games_mask]
-        
-        if len(real_games_df) == 0:
-            real_games_df = self.games_df
-        
-        # Get top games by positive ratio with reasonable review count
-        top_games = real_games_df.nlargest(limit, 'positive_ratio')
+        # Filter to one content type (by default no DLCs and soundtracks)
+        mask = self.content_mask(content_type)
+        if mask is not None and not mask.any() and content_type == 'game':
+            mask = None
+        
+        in_range, review_stats = None, None
+        if date_range is not None:
+            positions, in_range = self._top_games_in_range(limit, mask, date_range)
+        elif rank_by in REVIEW_RANKING_KEYS:
+            # Ranked by the review log itself, from the materialized per-game stats
+            review_stats = self.game_review_stats
+            positions = self.games_review_ranking.top(rank_by, limit, mask)
+        else:
+            # Get top games by positive ratio from the pre-sorted ranking
+            positions = self.games_ranking.top('positive_ratio', limit, mask)
+        top_games = self.games_df.iloc[positions]
         
         games_list = []
-        for _, game in top_games.iterrows():
-            games_list.append({
+        for i, game in enumerate(top_games.to_dict('records')):
+            entry = {
                 'name': game['title'],
-                'rating': round(game['positive_ratio'] / 20, 1),
-                'positive_ratio': game['positive_ratio'],
-                'price': game['price_final'],
-                'discount': game['discount'],
-                'steam_deck': game.get('steam_deck', 'Unknown')
-            })
+                'rating': round(float(game['positive_ratio']) / 20, 1),
+                'positive_ratio': int(game['positive_ratio']),
+                'price': round(float(game['price_final']), 2),
+                'discount': round(float(game['discount']), 2),
+                'steam_deck': _python_scalar(game.get('steam_deck', 'Unknown'))
+            }
+            if in_range is not None:
+                reviews, positive = int(in_range['reviews'][i]), int(in_range['positive'][i])
+                entry['reviews_in_range'] = reviews
+                entry['positive_rate_in_range'] = round(positive / reviews * 100, 1) if reviews else None
+            if review_stats is not None:
+                entry.update(review_stats.record(positions[i]))
+            games_list.append(entry)
         
         return games_list
         
@@ -1472,6 +1718,28 @@ def get_top_performing_games(self, limit=6):
         print(f"Error getting top games: {e}")
         return []
 
+def _top_games_in_range(self, limit, mask, date_range):
+    """Row positions of the games with the most recommending reviews in ``date_range``, and their range totals"""
+    games = self.games_df
+    index = self.review_time_index
+    if index is None or 'app_id' not in games.columns:
+        return np.zeros(0, dtype='int64'), {'reviews': [], 'positive': []}
+    
+    per_app = index.per_app(*date_range)
+    rows = game_positions(games, per_app.index)
+    known = rows >= 0
+    reviews = np.zeros(len(games))
+    positive = np.zeros(len(games))
+    reviews[rows[known]] = per_app['reviews'].to_numpy()[known]
+    positive[rows[known]] = per_app['positive'].to_numpy()[known]
+    
+    candidates = np.flatnonzero((reviews > 0) & (mask if mask is not None else True))
+    ratio = np.nan_to_num(pd.to_numeric(games['positive_ratio'], errors='coerce').to_numpy(dtype='float64', na_value=np.nan),
+                          nan=-1.0)
+    # Most recommending reviews first, then the all-time positive ratio; ties keep frame order
+    order = candidates[np.lexsort((-ratio[candidates], -positive[candidates]))][:limit]
+    return order, {'reviews': reviews[order], 'positive': positive[order]}
+
 def query_data_analytics(self, question):
     """Generate AI insights based on user questions about the actual data"""
     question_lower = question.lower()
@@ -1514,17 +1782,19 @@ def _analyze_pricing_data(self, question):
     if self.games_df is None:
         return "Pricing data is not available."
     
-    price_stats = self.games_df['price_final'].describe()
-    free_games = len(self.games_df[self.games_df['price_final'] == 0])
-    premium_games = len(self.games_df[self.games_df['price_final'] > 30])
+    price_stats = self.query({'dataset': 'games', 'aggregations': [
+        ['count'], ['mean', 'price_final', None, 'mean'], ['min', 'price_final', None, 'min'], ['max', 'price_final', None, 'max']
+    ]})['rows'][0]
+    free_games = self._count_games(['price_final', '==', 0])
+    premium_games = self._count_games(['price_final', '>', 30])
     
     response = f"""
 💰 **Pricing Analysis - Real Data**
 
-• **Total Games**: {len(self.games_df):,}
+• **Total Games**: {price_stats['count']:,}
 • **Average Price**: ${price_stats['mean']:.2f}
 • **Price Range**: ${price_stats['min']:.2f} - ${price_stats['max']:.2f}
-• **Free Games**: {free_games:,} ({free_games/len(self.games_df)*100:.1f}%)
+• **Free Games**: {free_games:,} ({free_games/price_stats['count']*100:.1f}%)
 • **Premium Games** (>$30): {premium_games:,}
 
 **Market Insights:**
@@ -1543,9 +1813,9 @@ def _analyze_pricing_data(self, question):
         response += "• Mix of budget and premium options\n"
     
     # Discount analysis
-    discounted = self.games_df[self.games_df['discount'] > 0]
-    if len(discounted) > 0:
-        response += f"• **Discount Activity**: {len(discounted):,} games on sale (avg {discounted['discount'].mean():.1f}% off)\n"
+    discounted = self._discount_activity()
+    if discounted['count'] > 0:
+        response += f"• **Discount Activity**: {discounted['count']:,} games on sale (avg {discounted['mean']:.1f}% off)\n"
     
     return response
 
@@ -1554,19 +1824,18 @@ def _analyze_rating_data(self, question):
     if self.games_df is None or 'positive_ratio' not in self.games_df.columns:
         return "Rating data is not available."
     
-    rating_stats = self.games_df['positive_ratio'].describe()
-    high_rated = len(self.games_df[self.games_df['positive_ratio'] >= 80])
-    low_rated = len(self.games_df[self.games_df['positive_ratio'] <= 40])
+    rating_stats = self.query({'dataset': 'games', 'aggregations': [['mean', 'positive_ratio', None, 'mean']]})['rows'][0]
+    low_rated = self._count_games(['positive_ratio', '<=', 40])
     
     response = f"""
 ⭐ **Rating Analysis - Real Data**
 
 • **Average Rating**: {rating_stats['mean']/20:.1f}/5 ({rating_stats['mean']:.1f}% positive)
 • **Rating Distribution**:
-  - Overwhelmingly Positive (≥90%): {len(self.games_df[self.games_df['positive_ratio'] >= 90]):,}
-  - Very Positive (80-89%): {len(self.games_df[(self.games_df['positive_ratio'] >= 80) & (self.games_df['positive_ratio'] < 90)]):,}
-  - Positive (70-79%): {len(self.games_df[(self.games_df['positive_ratio'] >= 70) & (self.games_df['positive_ratio'] < 80)]):,}
-  - Mixed (40-69%): {len(self.games_df[(self.games_df['positive_ratio'] >= 40) & (self.games_df['positive_ratio'] < 70)]):,}
+  - Overwhelmingly Positive (≥90%): {self._count_games(['positive_ratio', '>=', 90]):,}
+  - Very Positive (80-89%): {self._count_games(['positive_ratio', 'between', [80, 89]]):,}
+  - Positive (70-79%): {self._count_games(['positive_ratio', 'between', [70, 79]]):,}
+  - Mixed (40-69%): {self._count_games(['positive_ratio', 'between', [40, 69]]):,}
   - Negative (≤39%): {low_rated:,}
 
 **Quality Insights:**
@@ -1598,7 +1867,7 @@ def _analyze_games_data(self, question):
     
     for i, game in enumerate(top_games, 1):
         price_info = "Free" if game['price'] == 0 else f"${game['price']}"
-        deck_status = f" | Steam Deck: {game['steam_deck']}" if game.get('steam_deck') else ""
+        deck_status = f" | Steam Deck: {_deck_label(game['steam_deck'])}" if game.get('steam_deck') is True else ""
         response += f"{i}. **{game['name']}** - {game['rating']}/5 ({game['positive_ratio']}% positive) - {price_info}{deck_status}\n"
     
     response += f"\n**Platform Overview:**\n"
@@ -1606,33 +1875,50 @@ def _analyze_games_data(self, question):
     
     return response
 
+def _count_games(self, *filters):
+    """Number of games matching structured query filters like ['price_final', '>', 30]"""
+    return self.query_engine.scalar({'dataset': 'games', 'filters': list(filters)})
+
+def _discount_activity(self):
+    """Games on sale and their average discount"""
+    return self.query({'dataset': 'games', 'filters': [['discount', '>', 0]],
+                       'aggregations': [['count'], ['mean', 'discount', None, 'mean']]})['rows'][0]
+
 def _analyze_user_behavior(self, question):
     """Analyze user behavior data"""
     insights = []
+    stats = {}
     
     if self.recommendations_df is not None:
-        if 'is_recommended' in self.recommendations_df.columns:
-            positive_rate = (self.recommendations_df['is_recommended'].sum() / len(self.recommendations_df)) * 100
-            insights.append(f"• **Recommendation Rate**: {positive_rate:.1f}% positive")
-        
-        if 'hours' in self.recommendations_df.columns:
-            playtime_stats = self.recommendations_df['hours'].describe()
-            insights.append(f"• **Average Playtime**: {playtime_stats['mean']:.1f} hours")
-            insights.append(f"• **Playtime Range**: {playtime_stats['min']:.1f} - {playtime_stats['max']:.1f} hours")
+        columns = self.recommendations_df.columns
+        aggregations = [['count']]
+        if 'is_recommended' in columns:
+            aggregations.append(['mean', 'is_recommended', None, 'positive_share'])
+        if 'hours' in columns:
+            aggregations += [['mean', 'hours', None, 'mean_hours'], ['min', 'hours', None, 'min_hours'],
+                             ['max', 'hours', None, 'max_hours']]
+        stats = self.query({'dataset': 'recommendations', 'aggregations': aggregations})['rows'][0]
+        
+        if 'positive_share' in stats:
+            insights.append(f"• **Recommendation Rate**: {stats['positive_share'] * 100:.1f}% positive")
+        
+        if 'mean_hours' in stats:
+            insights.append(f"• **Average Playtime**: {stats['mean_hours']:.1f} hours")
+            insights.append(f"• **Playtime Range**: {stats['min_hours']:.1f} - {stats['max_hours']:.1f} hours")
             
             # Engagement analysis
-            heavy_players = len(self.recommendations_df[self.recommendations_df['hours'] > 100])
+            heavy_players = self.query_engine.scalar({'dataset': 'recommendations', 'filters': [['hours', '>', 100]]})
             insights.append(f"• **Heavy Players** (100+ hours): {heavy_players:,}")
     
     if self.users_df is not None:
-        insights.append(f"• **Total Users Analyzed**: {len(self.users_df):,}")
+        insights.append(f"• **Total Users Analyzed**: {self.query_engine.scalar({'dataset': 'users'}):,}")
     
     response = "👥 **User Behavior Analysis - Real Data**\n\n" + "\n".join(insights)
     
     if len(insights) > 0:
         response += "\n\n**Engagement Insights:**\n"
-        if 'hours' in self.recommendations_df.columns:
-            avg_playtime = self.recommendations_df['hours'].mean()
+        if stats.get('mean_hours') is not None:
+            avg_playtime = stats['mean_hours']
             if avg_playtime > 50:
                 response += "• High user engagement levels\n"
                 response += "• Games provide long-term value\n"
@@ -1655,23 +1941,24 @@ def _analyze_market_trends(self, question):
     
     # Price categories
     price_categories = {
-        'Free': len(self.games_df[self.games_df['price_final'] == 0]),
-        'Under $10': len(self.games_df[(self.games_df['price_final'] > 0) & (self.games_df['price_final'] <= 10)]),
-        '$11-$20': len(self.games_df[(self.games_df['price_final'] > 10) & (self.games_df['price_final'] <= 20)]),
-        '$21-$30': len(self.games_df[(self.games_df['price_final'] > 20) & (self.games_df['price_final'] <= 30)]),
-        'Over $30': len(self.games_df[self.games_df['price_final'] > 30])
+        'Free': self._count_games(['price_final', '==', 0]),
+        'Under $10': self._count_games(['price_final', '>', 0], ['price_final', '<=', 10]),
+        '$11-$20': self._count_games(['price_final', '>', 10], ['price_final', '<=', 20]),
+        '$21-$30': self._count_games(['price_final', '>', 20], ['price_final', '<=', 30]),
+        'Over $30': self._count_games(['price_final', '>', 30])
     }
     
+    total_games = self._count_games()
     for category, count in price_categories.items():
         if count > 0:
-            percentage = (count / len(self.games_df)) * 100
+            percentage = (count / total_games) * 100
             response += f"• {category}: {count:,} games ({percentage:.1f}%)\n"
     
     response += f"\n**Discount Activity:**\n"
-    discounted = self.games_df[self.games_df['discount'] > 0]
-    if len(discounted) > 0:
-        response += f"• Games on Sale: {len(discounted):,}\n"
-        response += f"• Average Discount: {discounted['discount'].mean():.1f}%\n"
+    discounted = self._discount_activity()
+    if discounted['count'] > 0:
+        response += f"• Games on Sale: {discounted['count']:,}\n"
+        response += f"• Average Discount: {discounted['mean']:.1f}%\n"
     
     response += f"\n**Market Opportunities:**\n"
     response += "• Analyze under-served price points\n"
@@ -1685,7 +1972,7 @@ def _analyze_steam_deck(self, question):
     if self.games_df is None or 'steam_deck' not in self.games_df.columns:
         return "Steam Deck compatibility data is not available."
     
-    deck_stats = self.games_df['steam_deck'].value_counts()
+    deck_stats = self.query({'dataset': 'games', 'group_by': ['steam_deck'], 'order_by': 'count'})['rows']
     
     response = """
 🎯 **Steam Deck Compatibility - Real Data**
@@ -1693,18 +1980,22 @@ def _analyze_steam_deck(self, question):
 **Compatibility Status:**
 """
     
-    total_games = len(self.games_df)
-    for status, count in deck_stats.items():
-        percentage = (count / total_games) * 100
-        response += f"• {status}: {count:,} games ({percentage:.1f}%)\n"
-    
-    # Analyze verified games ratings and prices
-    verified_games = self.games_df[self.games_df['steam_deck'] == 'Verified']
-    if len(verified_games) > 0:
-        avg_rating_verified = verified_games['positive_ratio'].mean() / 20
-        avg_price_verified = verified_games['price_final'].mean()
-        
-        response += f"\n**Verified Games Analysis:**\n"
+    total_games = self._count_games()
+    for row in deck_stats:
+        percentage = (row['count'] / total_games) * 100
+        response += f"• {_deck_label(row['steam_deck'])}: {row['count']:,} games ({percentage:.1f}%)\n"
+    
+    # Analyze Deck-compatible games ratings and prices
+    verified_games = self.query({
+        'dataset': 'games',
+        'filters': [['steam_deck', '==', True]],
+        'aggregations': [['count'], ['mean', 'positive_ratio', None, 'rating'], ['mean', 'price_final', None, 'price']]
+    })['rows'][0]
+    if verified_games['count'] > 0:
+        avg_rating_verified = verified_games['rating'] / 20
+        avg_price_verified = verified_games['price']
+        
+        response += f"\n**Deck-Compatible Games Analysis:**\n"
         response += f"• Average Rating: {avg_rating_verified:.1f}/5\n"
         response += f"• Average Price: ${avg_price_verified:.2f}\n"
         response += f"• Quality: {'Above average' if avg_rating_verified > 3.5 else 'Standard'}\n"
@@ -1716,23 +2007,29 @@ def _get_general_overview(self, question):
     response = "🔍 **Steam Analytics Overview - Real Data**\n\n"
     
     if self.games_df is not None:
-        response += f"• **Games Database**: {len(self.games_df):,} games\n"
-        response += f"• **Average Price**: ${self.games_df['price_final'].mean():.2f}\n"
-        response += f"• **Average Rating**: {self.games_df['positive_ratio'].mean()/20:.1f}/5\n"
+        games = self.query({'dataset': 'games', 'aggregations': [
+            ['count'], ['mean', 'price_final', None, 'price'], ['mean', 'positive_ratio', None, 'rating']
+        ]})['rows'][0]
+        response += f"• **Games Database**: {games['count']:,} games\n"
+        response += f"• **Average Price**: ${games['price']:.2f}\n"
+        response += f"• **Average Rating**: {games['rating']/20:.1f}/5\n"
         
         # Steam Deck info
         if 'steam_deck' in self.games_df.columns:
-            verified = len(self.games_df[self.games_df['steam_deck'] == 'Verified'])
-            response += f"• **Steam Deck Verified**: {verified:,} games\n"
+            verified = self._count_games(['steam_deck', '==', True])
+            response += f"• **Steam Deck Compatible**: {verified:,} games\n"
     
     if self.users_df is not None:
-        response += f"• **Users Analyzed**: {len(self.users_df):,}\n"
+        response += f"• **Users Analyzed**: {self.query_engine.scalar({'dataset': 'users'}):,}\n"
     
     if self.recommendations_df is not None:
-        response += f"• **Recommendations**: {len(self.recommendations_df):,}\n"
+        aggregations = [['count']]
         if 'is_recommended' in self.recommendations_df.columns:
-            positive_rate = (self.recommendations_df['is_recommended'].sum() / len(self.recommendations_df)) * 100
-            response += f"• **Positive Reviews**: {positive_rate:.1f}%\n"
+            aggregations.append(['mean', 'is_recommended', None, 'positive_share'])
+        reviews = self.query({'dataset': 'recommendations', 'aggregations': aggregations})['rows'][0]
+        response += f"• **Recommendations**: {reviews['count']:,}\n"
+        if 'positive_share' in reviews:
+            response += f"• **Positive Reviews**: {reviews['positive_share'] * 100:.1f}%\n"
     
     response += "\n**Ask me about:**\n"
     response += "• Game pricing and market trends\n"
@@ -1757,4 +2054,14 @@ def _get_sample_metrics(self):
         'positive_recommendation_rate': 75.5,
         'avg_playtime': 45.2,
         'steam_deck_verified': 12000
-    }
\ No newline at end of file
+    }
+
+
+# Attach the module-level methods above to the analyzer class
+for _method in (get_games_summary, get_user_summary, _get_price_distribution, _get_recent_trends,
+                _get_activity_trends, _get_engagement_patterns, get_real_time_metrics,
+                get_top_performing_games, _top_games_in_range, query_data_analytics, _analyze_pricing_data,
+                _analyze_rating_data, _analyze_games_data, _analyze_user_behavior,
+                _analyze_market_trends, _analyze_steam_deck, _get_general_overview,
+                _count_games, _discount_activity, _get_sample_metrics):
+    setattr(SteamDataAnalyzer, _method.__name__, _method)
@@ -4,9 +4,13 @@ from flask import Blueprint, request, jsonify, current_app
 import os
 from pathlib import Path
 import numpy as np
+from app.services.dataset_registry import get_registry
 
 dashboard_chat_bp = Blueprint('dashboard_chat', __name__)
 
+# Insight dicts per dashboard type, reused while the source file's mtime/size are unchanged
+_insight_cache = {}
+
 # Power BI Dashboard Content Mapping
 DASHBOARD_CONTENT = {
     "user-analytics": {
@@ -53,61 +57,50 @@ DASHBOARD_CONTENT = {
 def analyze_csv_data(dashboard_type):
     """Analyze the actual CSV data for the dashboard"""
     try:
-        base_path = Path(current_app.root_path).parent / "data" / "raw"
         dashboard_info = DASHBOARD_CONTENT.get(dashboard_type, {})
         csv_file = dashboard_info.get('csv_file', '')
         
         if not csv_file:
             return {"error": f"No CSV mapping found for {dashboard_type}"}
-            
-        file_path = base_path / csv_file
         
-        current_app.logger.info(f"Looking for CSV file at: {file_path}")
-        current_app.logger.info(f"File exists: {file_path.exists()}")
-        
-        if not file_path.exists():
-            # Try alternative paths
-            alternative_paths = [
-                Path(".") / "data" / "raw" / csv_file,
-                Path("..") / "data" / "raw" / csv_file,
-                Path(current_app.root_path) / "data" / "raw" / csv_file,
-            ]
-            
-            for alt_path in alternative_paths:
-                current_app.logger.info(f"Trying alternative path: {alt_path}")
-                if alt_path.exists():
-                    file_path = alt_path
-                    break
-            
-            if not file_path.exists():
-                return {"error": f"CSV file not found: {csv_file}. Tried: {file_path}"}
+        # The shared dataset registry resolves the path and parses the file once per process
+        registry = get_registry()
+        dataset_name = Path(csv_file).stem
+        file_path = registry.resolve_path(dataset_name)
         
-        # Read CSV with efficient chunking for large files
-        current_app.logger.info(f"Reading CSV file: {file_path}")
+        if not file_path:
+            return {"error": f"CSV file not found: {csv_file}. Checked paths: {[str(Path(p) / csv_file) for p in registry.search_paths]}"}
         
-        # First, let's check the file size and structure
-        file_size = file_path.stat().st_size
-        current_app.logger.info(f"File size: {file_size / 1024 / 1024:.2f} MB")
+        source = registry.source_stamp(dataset_name)
+        cached = _insight_cache.get(dashboard_type)
+        if cached is not None and cached[0] == source:
+            return cached[1]
         
-        # Read first few rows to understand structure
-        sample_df = pd.read_csv(file_path, nrows=5)
-        current_app.logger.info(f"CSV columns: {list(sample_df.columns)}")
-        current_app.logger.info(f"Sample data shape: {sample_df.shape}")
+        current_app.logger.info(f"Found CSV file at: {file_path}")
+        current_app.logger.info(f"File size: {source[2] / 1024 / 1024:.2f} MB")
         
-        # Now read the full file with optimized settings
-        df = pd.read_csv(file_path)
-        current_app.logger.info(f"Full dataset loaded: {df.shape}")
-        current_app.logger.info(f"Memory usage: {df.memory_usage(deep=True).sum() / 1024 / 1024:.2f} MB")
+        try:
+            if registry.is_stale(dataset_name):
+                registry.invalidate(dataset_name)
+            df = registry.get(dataset_name)
+            current_app.logger.info(f"Dataset loaded: {df.shape}")
+        except Exception as e:
+            current_app.logger.error(f"Error reading CSV: {str(e)}")
+            return {"error": f"Cannot read CSV file: {str(e)}"}
         
         # Generate insights based on dashboard type
         if dashboard_type == "user-analytics":
-            return analyze_users_data(df, dashboard_info)
+            insights = analyze_users_data(df, dashboard_info)
         elif dashboard_type == "game-analytics":
-            return analyze_games_data(df, dashboard_info)
+            insights = analyze_games_data(df, dashboard_info)
         elif dashboard_type == "recommendation-engine":
-            return analyze_recommendations_data(df, dashboard_info)
+            insights = analyze_recommendations_data(df, dashboard_info)
         else:
             return {"error": f"Unknown dashboard type: {dashboard_type}"}
+        
+        if "error" not in insights:
+            _insight_cache[dashboard_type] = (source, insights)
+        return insights
             
     except Exception as e:
         current_app.logger.error(f"Error analyzing CSV data for {dashboard_type}: {str(e)}")
@@ -4,9 +4,13 @@ from flask import Blueprint, request, jsonify, current_app
 import os
 from pathlib import Path
 import numpy as np
+from app.services.dataset_registry import get_registry
 
 dashboard_chat_bp = Blueprint('dashboard_chat', __name__)
 
+# Insight dicts per dashboard type, reused while the source file's mtime/size are unchanged
+_insight_cache = {}
+
 # Power BI Dashboard Content Mapping
 DASHBOARD_CONTENT = {
     "user-analytics": {
@@ -53,78 +57,50 @@ DASHBOARD_CONTENT = {
 def analyze_csv_data(dashboard_type):
     """Analyze the actual CSV data for the dashboard"""
     try:
-        # Try multiple possible base paths
-        base_paths = [
-            Path(current_app.root_path).parent / "data" / "raw",
-            Path(".") / "data" / "raw",
-            Path("..") / "data" / "raw",
-            Path(current_app.root_path) / "data" / "raw",
-        ]
-        
         dashboard_info = DASHBOARD_CONTENT.get(dashboard_type, {})
         csv_file = dashboard_info.get('csv_file', '')
         
         if not csv_file:
             return {"error": f"No CSV mapping found for {dashboard_type}"}
         
-        file_path = None
-        for base_path in base_paths:
-            potential_path = base_path / csv_file
-            current_app.logger.info(f"Checking path: {potential_path}")
-            if potential_path.exists():
-                file_path = potential_path
-                break
+        # The shared dataset registry resolves the path and parses the file once per process
+        registry = get_registry()
+        dataset_name = Path(csv_file).stem
+        file_path = registry.resolve_path(dataset_name)
         
         if not file_path:
-            return {"error": f"CSV file not found: {csv_file}. Checked paths: {[str(p / csv_file) for p in base_paths]}"}
-        
-        current_app.logger.info(f"Found CSV file at: {file_path}")
+            return {"error": f"CSV file not found: {csv_file}. Checked paths: {[str(Path(p) / csv_file) for p in registry.search_paths]}"}
         
-        # Read CSV with optimized settings
-        current_app.logger.info(f"Reading CSV file: {file_path}")
+        source = registry.source_stamp(dataset_name)
+        cached = _insight_cache.get(dashboard_type)
+        if cached is not None and cached[0] == source:
+            return cached[1]
         
-        # First check file size
-        file_size = file_path.stat().st_size
-        current_app.logger.info(f"File size: {file_size / 1024 / 1024:.2f} MB")
+        current_app.logger.info(f"Found CSV file at: {file_path}")
+        current_app.logger.info(f"File size: {source[2] / 1024 / 1024:.2f} MB")
         
-        # Read first few rows to understand structure
         try:
-            sample_df = pd.read_csv(file_path, nrows=5)
-            current_app.logger.info(f"CSV columns: {list(sample_df.columns)}")
-            current_app.logger.info(f"Sample data shape: {sample_df.shape}")
+            if registry.is_stale(dataset_name):
+                registry.invalidate(dataset_name)
+            df = registry.get(dataset_name)
+            current_app.logger.info(f"Dataset loaded: {df.shape}")
         except Exception as e:
-            current_app.logger.error(f"Error reading sample: {str(e)}")
+            current_app.logger.error(f"Error reading CSV: {str(e)}")
             return {"error": f"Cannot read CSV file: {str(e)}"}
         
-        # Now read the full file with optimized settings for large files
-        try:
-            # For very large files, use optimized reading
-            if file_size > 100 * 1024 * 1024:  # If file > 100MB
-                current_app.logger.info("Large file detected, using optimized reading...")
-                # Read in chunks for analysis
-                chunks = []
-                for chunk in pd.read_csv(file_path, chunksize=100000):  # 100k rows at a time
-                    chunks.append(chunk)
-                    if len(chunks) >= 3:  # Only read first 300k rows for analysis
-                        break
-                df = pd.concat(chunks, ignore_index=True)
-                current_app.logger.info(f"Sampled dataset loaded: {df.shape} (first 300k rows)")
-            else:
-                df = pd.read_csv(file_path)
-                current_app.logger.info(f"Full dataset loaded: {df.shape}")
-        except Exception as e:
-            current_app.logger.error(f"Error reading full CSV: {str(e)}")
-            return {"error": f"Cannot read full CSV file: {str(e)}"}
-        
         # Generate insights based on dashboard type
         if dashboard_type == "user-analytics":
-            return analyze_users_data(df, dashboard_info)
+            insights = analyze_users_data(df, dashboard_info)
         elif dashboard_type == "game-analytics":
-            return analyze_games_data(df, dashboard_info)
+            insights = analyze_games_data(df, dashboard_info)
         elif dashboard_type == "recommendation-engine":
-            return analyze_recommendations_data(df, dashboard_info)
+            insights = analyze_recommendations_data(df, dashboard_info)
         else:
             return {"error": f"Unknown dashboard type: {dashboard_type}"}
+        
+        if "error" not in insights:
+            _insight_cache[dashboard_type] = (source, insights)
+        return insights
             
     except Exception as e:
         current_app.logger.error(f"Error analyzing CSV data for {dashboard_type}: {str(e)}")
@@ -330,52 +306,43 @@ def analyze_dashboard():
 def test_csv_access():
     """Test endpoint to check CSV file access and structure"""
     try:
-        base_paths = [
-            Path(current_app.root_path).parent / "data" / "raw",
-            Path(".") / "data" / "raw",
-            Path("..") / "data" / "raw",
-            Path(current_app.root_path) / "data" / "raw",
-        ]
-        
+        registry = get_registry()
         results = {}
         
         for dashboard_type, info in DASHBOARD_CONTENT.items():
             csv_file = info['csv_file']
-            file_found = False
+            file_path = registry.resolve_path(Path(csv_file).stem)
+            file_found = file_path is not None
             
-            for base_path in base_paths:
-                file_path = base_path / csv_file
-                if file_path.exists():
-                    results[dashboard_type] = {
-                        'file_path': str(file_path),
-                        'exists': True,
-                        'file_size': f"{file_path.stat().st_size / 1024 / 1024:.2f} MB",
-                        'base_path_used': str(base_path)
-                    }
-                    
-                    # Try to read a sample
-                    try:
-                        sample = pd.read_csv(file_path, nrows=5)
-                        results[dashboard_type]['sample_columns'] = list(sample.columns)
-                        results[dashboard_type]['sample_shape'] = sample.shape
-                        results[dashboard_type]['sample_data'] = sample.to_dict('records')
-                        results[dashboard_type]['column_descriptions'] = describe_columns(sample)
-                    except Exception as e:
-                        results[dashboard_type]['read_error'] = str(e)
-                    
-                    file_found = True
-                    break
+            if file_found:
+                results[dashboard_type] = {
+                    'file_path': file_path,
+                    'exists': True,
+                    'file_size': f"{os.path.getsize(file_path) / 1024 / 1024:.2f} MB",
+                    'base_path_used': os.path.dirname(file_path),
+                    'loaded': registry.is_loaded(Path(csv_file).stem)
+                }
+                
+                # Try to read a sample
+                try:
+                    sample = pd.read_csv(file_path, nrows=5)
+                    results[dashboard_type]['sample_columns'] = list(sample.columns)
+                    results[dashboard_type]['sample_shape'] = sample.shape
+                    results[dashboard_type]['sample_data'] = sample.to_dict('records')
+                    results[dashboard_type]['column_descriptions'] = describe_columns(sample)
+                except Exception as e:
+                    results[dashboard_type]['read_error'] = str(e)
             
             if not file_found:
                 results[dashboard_type] = {
                     'exists': False,
-                    'checked_paths': [str(p / csv_file) for p in base_paths]
+                    'checked_paths': [str(Path(p) / csv_file) for p in registry.search_paths]
                 }
         
         return jsonify({
             "success": True,
             "results": results,
-            "base_paths_tried": [str(p) for p in base_paths]
+            "base_paths_tried": registry.search_paths
         })
         
     except Exception as e:
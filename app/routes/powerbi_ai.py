@@ -1,14 +1,15 @@
 from flask import Blueprint, request, jsonify, current_app
 from app.services.powerbi_ai_service import PowerBILlmAgent
 from app.services.real_data_analyzer import RealDataAnalyzer
+from app.services.warmup import lazy_service, warming_response
 import logging
 
 logger = logging.getLogger(__name__)
 
-# Initialize services
+# Services are built in the warmup phase (or on first use), not at import
 powerbi_ai_bp = Blueprint('powerbi_ai', __name__)
-ai_agent = PowerBILlmAgent()
-real_analyzer = RealDataAnalyzer()
+ai_agent = lazy_service('powerbi_ai', PowerBILlmAgent)
+real_analyzer = lazy_service('real_data_analyzer', RealDataAnalyzer)
 
 @powerbi_ai_bp.route('/analyze-powerbi', methods=['POST'])
 def analyze_powerbi():
@@ -33,13 +34,16 @@ def analyze_powerbi():
         
         if any(keyword in user_message_lower for keyword in data_keywords):
             logger.info("Using Real Data Analyzer for data question")
-            result = real_analyzer.analyze_question(user_message)
+            if not real_analyzer.ready:
+                real_analyzer.start()
+                return warming_response(real_analyzer)
+            result = real_analyzer.get().analyze_question(user_message)
         elif any(keyword in user_message_lower for keyword in powerbi_keywords):
             logger.info("Using Power BI AI Agent for guidance question")
-            result = ai_agent.process_query(user_message, dashboard_type, "web_user")
+            result = ai_agent.get().process_query(user_message, dashboard_type, "web_user")
         else:
             logger.info("Using AI Agent for general question")
-            result = ai_agent.process_query(user_message, dashboard_type, "web_user")
+            result = ai_agent.get().process_query(user_message, dashboard_type, "web_user")
         
         return jsonify(result)
         
@@ -55,9 +59,9 @@ def health_check():
     """Health check endpoint"""
     return jsonify({
         'success': True,
-        'status': 'operational',
+        'status': 'operational' if ai_agent.ready and real_analyzer.ready else 'warming',
         'services': {
-            'powerbi_ai': 'ready',
-            'real_data_analyzer': 'ready'
+            'powerbi_ai': ai_agent.status,
+            'real_data_analyzer': real_analyzer.status
         }
     })
\ No newline at end of file
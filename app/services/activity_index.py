@@ -0,0 +1,86 @@
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+DAY_COLUMN = 'day_number'
+# Day number used for missing or unparseable dates
+MISSING_DAY = np.iinfo(np.int32).min
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+def day_numbers(dates: pd.Series) -> np.ndarray:
+    """Days since 1970-01-01 as int32, MISSING_DAY where the date is missing"""
+    parsed = pd.to_datetime(dates, errors='coerce')
+    days = parsed.to_numpy(dtype='datetime64[ns]').astype('datetime64[D]')
+    missing = np.isnat(days)
+    return np.where(missing, MISSING_DAY, days.astype('int64')).astype('int32')
+
+
+def month_ordinals(days: np.ndarray) -> np.ndarray:
+    """year * 12 + month - 1 for each (valid) day number"""
+    return days.astype('datetime64[D]').astype('datetime64[M]').astype('int64') + 1970 * 12
+
+
+class DailyActivity:
+    """Event counts per day over a contiguous range, with calendar roll-ups
+
+    Built with one np.bincount over the day-number column; months, weeks and
+    weekdays are then bincounts over the (few thousand) days rather than over
+    every row. Immutable once built.
+    """
+
+    def __init__(self, first_day: int, counts: np.ndarray):
+        self.first_day = int(first_day)
+        self.counts = counts.astype('int64')
+        self.counts.flags.writeable = False
+
+    @classmethod
+    def from_days(cls, days: np.ndarray) -> 'DailyActivity':
+        days = np.asarray(days)
+        days = days[days != MISSING_DAY]
+        if len(days) == 0:
+            return cls(0, np.zeros(0, dtype='int64'))
+        first_day = int(days.min())
+        return cls(first_day, np.bincount(days.astype('int64') - first_day))
+
+    @classmethod
+    def from_counts(cls, daily_counts: Dict[int, int]) -> 'DailyActivity':
+        if not daily_counts:
+            return cls(0, np.zeros(0, dtype='int64'))
+        first_day = min(daily_counts)
+        counts = np.zeros(max(daily_counts) - first_day + 1, dtype='int64')
+        counts[np.fromiter(daily_counts.keys(), dtype='int64') - first_day] = list(daily_counts.values())
+        return cls(first_day, counts)
+
+    @property
+    def total(self) -> int:
+        return int(self.counts.sum())
+
+    def _days(self) -> np.ndarray:
+        return np.arange(self.first_day, self.first_day + len(self.counts), dtype='int64')
+
+    def monthly(self) -> pd.Series:
+        """Counts per calendar month, equivalent to resample('ME').size()"""
+        if len(self.counts) == 0:
+            return pd.Series(dtype='int64')
+        months = month_ordinals(self._days())
+        totals = np.bincount(months - months[0], weights=self.counts).astype('int64')
+        first = pd.Timestamp(year=int(months[0]) // 12, month=int(months[0]) % 12 + 1, day=1)
+        return pd.Series(totals, index=pd.date_range(first, periods=len(totals), freq='ME'))
+
+    def weekly(self) -> pd.Series:
+        """Counts per week ending Sunday, equivalent to resample('W').size()"""
+        if len(self.counts) == 0:
+            return pd.Series(dtype='int64')
+        # 1970-01-01 was a Thursday, so day + 3 counts from a Monday
+        weeks = (self._days() + 3) // 7
+        totals = np.bincount(weeks - weeks[0], weights=self.counts).astype('int64')
+        sundays = (weeks[0] + np.arange(len(totals))) * 7 + 3
+        return pd.Series(totals, index=pd.DatetimeIndex(sundays.astype('datetime64[D]').astype('datetime64[ns]')))
+
+    def day_of_week(self) -> pd.Series:
+        """Counts per weekday, Monday first"""
+        weekdays = (self._days() + 3) % 7
+        totals = np.bincount(weekdays, weights=self.counts, minlength=7).astype('int64')
+        return pd.Series(totals, index=WEEKDAYS)
@@ -0,0 +1,178 @@
+import logging
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from sklearn.preprocessing import normalize
+
+logger = logging.getLogger(__name__)
+
+# Lists probed per query unless the caller asks for more (recall) or fewer (speed)
+DEFAULT_PROBES = 8
+KMEANS_ITERATIONS = 10
+# Rows sampled per list to train the centroids
+TRAINING_ROWS_PER_LIST = 64
+ASSIGN_BLOCK_SIZE = 4096
+
+
+def _dense(matrix) -> np.ndarray:
+    return matrix.toarray() if sparse.issparse(matrix) else np.asarray(matrix)
+
+
+def _query_vector(query) -> np.ndarray:
+    """One query (1-D, 1 x d dense or sparse) -> L2-normalised dense float32 vector"""
+    vector = _dense(query).astype(np.float32).ravel()
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+
+def _top(ids: np.ndarray, scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Best ``k`` (ids, scores), best first with ties by id"""
+    if len(scores) > k:
+        keep = np.argpartition(-scores, k - 1)[:k]
+        ids, scores = ids[keep], scores[keep]
+    order = np.lexsort((ids, -scores))
+    return ids[order], scores[order]
+
+
+def exact_search(vectors, query, k: int = 10, exclude: Iterable[int] = ()) -> Tuple[np.ndarray, np.ndarray]:
+    """Brute-force cosine top-``k`` over every row of L2-normalised ``vectors``: (row ids, scores)"""
+    scores = np.asarray(vectors @ _query_vector(query), dtype=np.float32).ravel()
+    ids = np.arange(len(scores))
+    exclude = np.fromiter(exclude, dtype=np.int64)
+    if len(exclude):
+        scores[exclude] = -np.inf
+    found = np.isfinite(scores)
+    return _top(ids[found], scores[found], k)
+
+
+def train_centroids(vectors, n_lists: int, iterations: int = KMEANS_ITERATIONS, seed: int = 0) -> np.ndarray:
+    """Spherical k-means (cosine) centroids from a sample of the L2-normalised rows"""
+    rng = np.random.default_rng(seed)
+    n = vectors.shape[0]
+    sample = vectors[np.sort(rng.choice(n, min(n, n_lists * TRAINING_ROWS_PER_LIST), replace=False))]
+    centroids = normalize(_dense(sample[rng.choice(sample.shape[0], n_lists, replace=False)])).astype(np.float32)
+    for _ in range(iterations):
+        assignment = np.asarray(sample @ centroids.T).argmax(axis=1)
+        members = sparse.csr_matrix((np.ones(len(assignment), dtype=np.float32),
+                                     (assignment, np.arange(len(assignment)))),
+                                    shape=(n_lists, sample.shape[0]))
+        sums = _dense(members @ sample).astype(np.float32)
+        # Re-seed empty lists from random sample rows
+        empty = np.flatnonzero(np.asarray(members.sum(axis=1)).ravel() == 0)
+        if len(empty):
+            sums[empty] = _dense(sample[rng.choice(sample.shape[0], len(empty), replace=False)])
+        centroids = normalize(sums).astype(np.float32)
+    return centroids
+
+
+class IVFFlatIndex:
+    """Inverted-file index with exact scoring inside the probed lists (IVF-flat), cosine similarity
+
+    Rows are clustered into ``n_lists`` lists by spherical k-means and stored
+    grouped by list, so a query scores the centroids, picks the ``n_probe``
+    closest lists and scores only their rows: roughly n_probe / n_lists of
+    an exact search. More probes trade speed for recall. Works on dense
+    arrays and scipy sparse rows alike. Read-only once built.
+    """
+
+    def __init__(self, centroids: np.ndarray, vectors, ids: np.ndarray, offsets: np.ndarray,
+                 n_probe: int = DEFAULT_PROBES):
+        self.centroids = centroids
+        self.vectors = vectors      # L2-normalised rows grouped by list
+        self.ids = ids              # original row id of each stored row
+        self.offsets = offsets      # list i holds stored rows offsets[i]:offsets[i + 1]
+        self.n_probe = n_probe
+
+    @classmethod
+    def build(cls, vectors, n_lists: Optional[int] = None, n_probe: int = DEFAULT_PROBES,
+              iterations: int = KMEANS_ITERATIONS, seed: int = 0) -> 'IVFFlatIndex':
+        """Index the rows of ``vectors`` (default ~sqrt(n) lists)"""
+        started = time.time()
+        vectors = (sparse.csr_matrix(vectors, dtype=np.float32) if sparse.issparse(vectors)
+                   else np.asarray(vectors, dtype=np.float32))
+        n = vectors.shape[0]
+        if n == 0:
+            return cls(np.zeros((1, vectors.shape[1]), dtype=np.float32), vectors,
+                       np.zeros(0, dtype=np.int64), np.zeros(2, dtype=np.int64), n_probe)
+        vectors = normalize(vectors)
+        n_lists = max(1, min(n, n_lists or int(np.sqrt(n))))
+
+        centroids = train_centroids(vectors, n_lists, iterations, seed)
+        assignment = np.concatenate([
+            np.asarray(vectors[start:start + ASSIGN_BLOCK_SIZE] @ centroids.T).argmax(axis=1)
+            for start in range(0, n, ASSIGN_BLOCK_SIZE)
+        ])
+        order = np.argsort(assignment, kind='stable')
+        offsets = np.r_[0, np.cumsum(np.bincount(assignment, minlength=n_lists))].astype(np.int64)
+
+        index = cls(centroids, vectors[order], order.astype(np.int64), offsets, n_probe)
+        logger.info(f"🧭 Built IVF-flat index: {n:,} vectors in {n_lists:,} lists "
+                    f"in {time.time() - started:.2f}s")
+        return index
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def n_lists(self) -> int:
+        return len(self.centroids)
+
+    def search(self, query, k: int = 10, n_probe: Optional[int] = None,
+               exclude: Iterable[int] = ()) -> Tuple[np.ndarray, np.ndarray]:
+        """Approximate cosine top-``k``: (original row ids, scores), best first"""
+        if k <= 0 or len(self.ids) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        query = _query_vector(query)
+        n_probe = max(1, min(n_probe or self.n_probe, self.n_lists))
+
+        centroid_scores = self.centroids @ query
+        lists = np.argpartition(-centroid_scores, n_probe - 1)[:n_probe] if n_probe < self.n_lists \
+            else np.arange(self.n_lists)
+        starts, ends = self.offsets[lists], self.offsets[lists + 1]
+        counts = ends - starts
+        rows = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+
+        ids = self.ids[rows]
+        scores = np.asarray(self.vectors[rows] @ query, dtype=np.float32).ravel()
+        exclude = np.fromiter(exclude, dtype=np.int64)
+        if len(exclude):
+            keep = ~np.isin(ids, exclude)
+            ids, scores = ids[keep], scores[keep]
+        return _top(ids, scores, k)
+
+
+def recall_report(index: IVFFlatIndex, vectors, query_rows: Iterable[int], k: int = 10,
+                  probes: Iterable[int] = (1, 2, 4, 8, 16, 32)) -> List[Dict]:
+    """Recall@k and per-query latency of ``index`` at each probe count, against exact search
+
+    Each query is a row of ``vectors`` looking for its neighbours (itself
+    excluded). The first entry is exact search itself.
+    """
+    vectors = normalize(vectors)
+    query_rows = list(query_rows)
+
+    def timed(search):
+        results, latencies = [], []
+        for row in query_rows:
+            started = time.perf_counter()
+            results.append(set(search(row)[0].tolist()))
+            latencies.append(time.perf_counter() - started)
+        return results, np.array(latencies) * 1000
+
+    truth, exact_ms = timed(lambda row: exact_search(vectors, vectors[row], k, exclude=[row]))
+    report = [{'n_probe': None, 'method': 'exact', 'recall': 1.0,
+               'mean_ms': round(float(exact_ms.mean()), 4), 'p95_ms': round(float(np.percentile(exact_ms, 95)), 4)}]
+    for n_probe in probes:
+        found, approx_ms = timed(lambda row: index.search(vectors[row], k, n_probe, exclude=[row]))
+        hits = sum(len(a & b) for a, b in zip(found, truth))
+        expected = sum(len(b) for b in truth)
+        report.append({
+            'n_probe': n_probe,
+            'method': 'ivf-flat',
+            'recall': round(hits / expected, 4) if expected else 1.0,
+            'mean_ms': round(float(approx_ms.mean()), 4),
+            'p95_ms': round(float(np.percentile(approx_ms, 95)), 4)
+        })
+    return report
@@ -0,0 +1,70 @@
+import gzip
+import logging
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Bodies smaller than this are sent as-is; gzip would not pay for its header
+MIN_COMPRESS_BYTES = 1024
+
+
+class BundleContext:
+    """Intermediates shared by the sections of one bundle request
+
+    Each section asks for what it needs through ``get``; the first caller
+    computes a value and later sections reuse it, so e.g. the real-time
+    metrics are built once even when three sections report them.
+    """
+
+    def __init__(self, **params):
+        self.params = params
+        self._values = {}
+
+    def get(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        if key not in self._values:
+            self._values[key] = build()
+        return self._values[key]
+
+    def set(self, key: Hashable, value: Any) -> Any:
+        self._values[key] = value
+        return value
+
+
+def parse_parts(value: Optional[str], available: Iterable[str]) -> List[str]:
+    """Comma-separated section names (in order, without repeats); empty means every section"""
+    available = list(available)
+    parts = [part.strip() for part in (value or '').split(',') if part.strip()]
+    if not parts:
+        return available
+    unknown = [part for part in parts if part not in available]
+    if unknown:
+        raise ValueError(f"Unknown bundle part(s) {', '.join(unknown)}; choose from {', '.join(available)}")
+    return list(dict.fromkeys(parts))
+
+
+def build_bundle(sections: Dict[str, Callable[[BundleContext], Any]], parts: Iterable[str],
+                 context: Optional[BundleContext] = None) -> Dict[str, Any]:
+    """Run the requested sections against one shared context; a failing section doesn't sink the rest"""
+    context = context or BundleContext()
+    bundle = {}
+    for part in parts:
+        try:
+            bundle[part] = sections[part](context)
+        except Exception as e:
+            logger.warning(f"⚠️ Bundle section {part} failed: {e}")
+            bundle[part] = {'success': False, 'error': str(e)}
+    return bundle
+
+
+def encode_body(body: bytes, accept_encoding: str, min_size: int = MIN_COMPRESS_BYTES) -> Tuple[bytes, Optional[str]]:
+    """gzip ``body`` when the client accepts it and it is big enough; returns (body, Content-Encoding)"""
+    accepted = set()
+    for item in (accept_encoding or '').split(','):
+        coding, _, params = item.partition(';')
+        quality = params.strip().lower().replace(' ', '')
+        if quality.startswith('q=') and quality[2:].strip('0.') == '':
+            continue  # q=0 means "not acceptable"
+        accepted.add(coding.strip().lower())
+    if len(body) < min_size or not accepted & {'gzip', '*'}:
+        return body, None
+    return gzip.compress(body, compresslevel=6), 'gzip'
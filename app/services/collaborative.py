@@ -0,0 +1,312 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.preprocessing import normalize
+
+try:
+    import fcntl
+except ImportError:  # not on Windows: concurrent first builds are then possible, but still atomic
+    fcntl = None
+
+from app.services.dataset_registry import get_registry
+from app.services.dataset_schema import RECOMMENDATIONS_SCHEMA, schema_read_kwargs
+from app.services.recommender import MODEL_ARTIFACTS_KEPT, SIMILARITY_BLOCK_SIZE, top_k_similarities
+from app.services.review_aggregates import iter_csv_chunks
+from app.services.warmup import lazy_service
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+INTERACTION_COLUMNS = ['user_id', 'app_id', 'is_recommended', 'hours']
+# Neighbours kept per game
+ITEM_NEIGHBOURS = 50
+# Games recommended by fewer players than this get no neighbours (too little signal)
+MIN_ITEM_USERS = 2
+# Bump when the on-disk model layout changes; older artifacts are then rebuilt
+MODEL_FORMAT = 1
+MODEL_ARRAYS = ('user_ids', 'app_ids', 'interactions_indptr', 'interactions_indices', 'interactions_data',
+                'neighbours_indptr', 'neighbours_indices', 'neighbours_data')
+
+
+def source_stamp(csv_path: str, max_rows: int = 0, top_k: int = ITEM_NEIGHBOURS) -> str:
+    """What a model built from ``csv_path`` depends on: the file (path, size, mtime) and the build settings"""
+    stat = os.stat(csv_path)
+    return f"{os.path.abspath(csv_path)}:{stat.st_size}:{stat.st_mtime_ns}:{max_rows}:{top_k}:{MIN_ITEM_USERS}"
+
+
+def model_artifact_path(directory: str, stamp: str) -> str:
+    """Directory holding the model built for ``stamp``"""
+    digest = hashlib.sha1(stamp.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(directory, f"collaborative-v{MODEL_FORMAT}-{digest}")
+
+
+def interaction_weights(chunk: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Positive reviews of one chunk -> (user_ids, app_ids, weights), weight = 1 + log1p(hours)"""
+    users = pd.to_numeric(chunk['user_id'], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    apps = pd.to_numeric(chunk['app_id'], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    positive = chunk['is_recommended'].fillna(False).astype(bool).to_numpy()
+    hours = (pd.to_numeric(chunk['hours'], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+             if 'hours' in chunk.columns else np.zeros(len(chunk)))
+    keep = positive & ~np.isnan(users) & ~np.isnan(apps)
+    weights = 1.0 + np.log1p(np.clip(np.nan_to_num(hours[keep]), 0, None))
+    return users[keep].astype('int64'), apps[keep].astype('int64'), weights.astype('float32')
+
+
+class ItemItemCF:
+    """Item-item collaborative filtering over positive reviews
+
+    Players x games is a sparse matrix of hours-weighted positive reviews;
+    each game keeps its ``top_k`` most similar games by cosine over the
+    players who recommended it. A player's recommendations are the
+    neighbour scores summed over the games they liked (so serving is one
+    sparse row times a K-sparse matrix), minus the games they already
+    recommended. Read-only once built, so a saved model can be memory-mapped
+    and shared by every worker.
+    """
+
+    def __init__(self, user_ids: np.ndarray, app_ids: np.ndarray, interactions: sparse.csr_matrix,
+                 neighbours: sparse.csr_matrix, source: Optional[str] = None):
+        self.user_ids = user_ids            # sorted, row i of interactions
+        self.app_ids = app_ids              # sorted, column j of interactions / neighbours
+        self.interactions = interactions    # users x games
+        self.neighbours = neighbours        # games x games, top_k per row
+        self.source = source                # source_stamp() it was built from, when known
+        for array in (user_ids, app_ids, interactions.data, interactions.indices, interactions.indptr,
+                      neighbours.data, neighbours.indices, neighbours.indptr):
+            array.flags.writeable = False
+
+    @classmethod
+    def build(cls, chunks: Iterable[pd.DataFrame], top_k: int = ITEM_NEIGHBOURS,
+              block_size: int = SIMILARITY_BLOCK_SIZE) -> 'ItemItemCF':
+        """One pass over review chunks, then item-item similarities in blocks of games"""
+        started = time.time()
+        parts = [interaction_weights(chunk) for chunk in chunks]
+        users = np.concatenate([p[0] for p in parts]) if parts else np.zeros(0, dtype='int64')
+        apps = np.concatenate([p[1] for p in parts]) if parts else np.zeros(0, dtype='int64')
+        weights = np.concatenate([p[2] for p in parts]) if parts else np.zeros(0, dtype='float32')
+        del parts
+
+        user_ids, user_codes = np.unique(users, return_inverse=True)
+        app_ids, app_codes = np.unique(apps, return_inverse=True)
+        interactions = sparse.csr_matrix((weights, (user_codes, app_codes)),
+                                         shape=(len(user_ids), len(app_ids)), dtype=np.float32)
+        interactions.sum_duplicates()
+
+        # Cosine between games = dot products of their L2-normalised player columns
+        items = interactions.T.tocsr()
+        rare = np.diff(items.indptr) < MIN_ITEM_USERS
+        items = sparse.diags((~rare).astype(np.float32)) @ items
+        neighbours = top_k_similarities(normalize(items), top_k, block_size)
+
+        model = cls(user_ids, app_ids, interactions, neighbours)
+        logger.info(f"🤝 Built item-item model: {len(user_ids):,} players, {len(app_ids):,} games, "
+                    f"{interactions.nnz:,} positive reviews in {time.time() - started:.2f}s")
+        return model
+
+    @classmethod
+    def from_csv(cls, csv_path: str, chunksize: int = 1_000_000, max_rows: int = 0,
+                 top_k: int = ITEM_NEIGHBOURS) -> 'ItemItemCF':
+        """Stream the review log (the first ``max_rows`` rows when set) into a model"""
+        header = pd.read_csv(csv_path, nrows=0).columns
+        usecols = [col for col in INTERACTION_COLUMNS if col in header]
+        typed = schema_read_kwargs(RECOMMENDATIONS_SCHEMA, usecols, relaxed=True)
+        read_kwargs = {'nrows': max_rows} if max_rows else {}
+        chunks = iter_csv_chunks(csv_path, chunksize=chunksize, usecols=usecols, **typed, **read_kwargs)
+        model = cls.build(chunks, top_k=top_k)
+        model.source = source_stamp(csv_path, max_rows, top_k)
+        return model
+
+    def save(self, directory: str) -> str:
+        """Write the model to an artifact directory for its source stamp and return the path
+
+        Same layout as the recommender artifact: one .npy per array (so
+        loaders can memory-map them) plus manifest.json, assembled under a
+        temporary name and renamed into place.
+        """
+        path = model_artifact_path(directory, self.source or '')
+        os.makedirs(directory, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix='.collaborative-', dir=directory)
+        try:
+            arrays = {'user_ids': self.user_ids, 'app_ids': self.app_ids}
+            for name in ('interactions', 'neighbours'):
+                matrix = getattr(self, name)
+                arrays.update({f"{name}_indptr": matrix.indptr, f"{name}_indices": matrix.indices,
+                               f"{name}_data": matrix.data})
+            for name, values in arrays.items():
+                np.save(os.path.join(staging, f"{name}.npy"), np.ascontiguousarray(values))
+            with open(os.path.join(staging, 'manifest.json'), 'w', encoding='utf-8') as f:
+                json.dump({'format': MODEL_FORMAT, 'source': self.source, 'built_at': time.time(),
+                           **self.describe()}, f)
+            if os.path.isdir(path):
+                shutil.rmtree(path)  # same source rebuilt
+            os.rename(staging, path)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        logger.info(f"💾 Saved item-item model to {path}")
+        return path
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> Optional['ItemItemCF']:
+        """A saved model (arrays memory-mapped read-only by default), or None if unusable"""
+        try:
+            with open(os.path.join(path, 'manifest.json'), encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('format') != MODEL_FORMAT:
+                return None
+            arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r' if mmap else None)
+                      for name in MODEL_ARRAYS}
+            users, games = len(arrays['user_ids']), len(arrays['app_ids'])
+            interactions, neighbours = (
+                sparse.csr_matrix((arrays[f"{name}_data"], arrays[f"{name}_indices"], arrays[f"{name}_indptr"]),
+                                  shape=shape, copy=False)
+                for name, shape in (('interactions', (users, games)), ('neighbours', (games, games))))
+            model = cls(arrays['user_ids'], arrays['app_ids'], interactions, neighbours, manifest['source'])
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"⚠️ Could not load item-item model from {path}: {e}")
+            return None
+        logger.info(f"⚡ Loaded item-item model ({games:,} games) from {path}")
+        return model
+
+    def _user_row(self, user_id) -> Optional[int]:
+        try:
+            user_id = int(user_id)
+        except (TypeError, ValueError):
+            return None
+        position = int(np.searchsorted(self.user_ids, user_id))
+        if position == len(self.user_ids) or self.user_ids[position] != user_id:
+            return None
+        return position
+
+    def _columns(self, app_ids: Sequence) -> np.ndarray:
+        """Column of each known app_id (unknown ids dropped)"""
+        ids = pd.to_numeric(pd.Series(list(app_ids), dtype=object), errors='coerce').dropna().to_numpy('int64')
+        positions = np.searchsorted(self.app_ids, ids)
+        known = positions < len(self.app_ids)
+        known[known] = self.app_ids[positions[known]] == ids[known]
+        return positions[known]
+
+    def _top(self, profile: sparse.csr_matrix, exclude: np.ndarray, top_n: int) -> List[Tuple[int, float]]:
+        scores = (profile @ self.neighbours).toarray().ravel()
+        scores[exclude] = 0
+        candidates = np.flatnonzero(scores > 0)
+        if top_n <= 0 or len(candidates) == 0:
+            return []
+        if len(candidates) > top_n:
+            candidates = candidates[np.argpartition(-scores[candidates], top_n - 1)[:top_n]]
+        candidates = candidates[np.lexsort((candidates, -scores[candidates]))]
+        return [(int(self.app_ids[col]), float(scores[col])) for col in candidates]
+
+    def recommend_for_user(self, user_id, top_n: int = 10) -> List[Tuple[int, float]]:
+        """(app_id, score) best first for a known player; [] for players without positive reviews"""
+        row = self._user_row(user_id)
+        if row is None:
+            return []
+        profile = self.interactions[row]
+        return self._top(profile, profile.indices, top_n)
+
+    def recommend_for_games(self, app_ids: Sequence, top_n: int = 10) -> List[Tuple[int, float]]:
+        """(app_id, score) best first for an ad-hoc set of liked games (e.g. a player not in the log)"""
+        columns = np.unique(self._columns(app_ids))
+        if len(columns) == 0:
+            return []
+        profile = sparse.csr_matrix((np.ones(len(columns), dtype=np.float32),
+                                     (np.zeros(len(columns), dtype=np.int64), columns)),
+                                    shape=(1, len(self.app_ids)))
+        return self._top(profile, columns, top_n)
+
+    def similar_games(self, app_id, top_n: int = 10) -> List[Tuple[int, float]]:
+        """Players who liked ``app_id`` also liked: (app_id, similarity) best first"""
+        columns = self._columns([app_id])
+        if len(columns) == 0:
+            return []
+        start, end = self.neighbours.indptr[columns[0]:columns[0] + 2]
+        end = min(end, start + max(top_n, 0))
+        return [(int(self.app_ids[col]), float(score))
+                for col, score in zip(self.neighbours.indices[start:end], self.neighbours.data[start:end])]
+
+    def describe(self) -> Dict:
+        return {
+            'players': len(self.user_ids),
+            'games': len(self.app_ids),
+            'positive_reviews': int(self.interactions.nnz),
+            'neighbour_links': int(self.neighbours.nnz)
+        }
+
+
+@contextmanager
+def _build_lock(directory: str):
+    """Exclusive across processes sharing ``directory``, so one worker builds while the others wait"""
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, '.collaborative.lock'), 'a') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _prune_artifacts(directory: str, keep: str):
+    artifacts = sorted((os.path.join(directory, name) for name in os.listdir(directory)
+                        if name.startswith('collaborative-')),
+                       key=os.path.getmtime, reverse=True)
+    for path in [path for path in artifacts if path != keep][MODEL_ARTIFACTS_KEPT - 1:]:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def load_or_build_model(csv_path: str, model_dir: str, chunksize: int = 1_000_000, max_rows: int = 0,
+                        top_k: int = ITEM_NEIGHBOURS) -> ItemItemCF:
+    """Map the saved model for this version of ``csv_path``, building and saving it first if there is none"""
+    path = model_artifact_path(model_dir, source_stamp(csv_path, max_rows, top_k))
+    model = ItemItemCF.load(path) if os.path.isdir(path) else None
+    if model is not None:
+        return model
+    with _build_lock(model_dir):
+        # Another worker may have built it while we waited for the lock
+        model = ItemItemCF.load(path) if os.path.isdir(path) else None
+        if model is not None:
+            return model
+        model = ItemItemCF.from_csv(csv_path, chunksize=chunksize, max_rows=max_rows, top_k=top_k)
+        try:
+            path = model.save(model_dir)
+            _prune_artifacts(model_dir, keep=path)
+            # Serve from the mapping too, so this worker doesn't keep a private copy
+            return ItemItemCF.load(path) or model
+        except OSError as e:
+            logger.warning(f"⚠️ Could not save item-item model: {e}")
+            return model
+
+
+def build_default_model() -> Optional[ItemItemCF]:
+    """Item-item model over the registry's recommendations.csv (None when the file is missing)"""
+    csv_path = get_registry().resolve_path('recommendations')
+    if csv_path is None:
+        logger.warning("⚠️ recommendations.csv not found, collaborative filtering disabled")
+        return None
+    return load_or_build_model(csv_path, Config.RECOMMENDER_MODEL_DIR, chunksize=Config.ANALYTICS_CHUNK_SIZE,
+                               max_rows=Config.COLLABORATIVE_MAX_ROWS)
+
+
+collaborative_service = lazy_service('collaborative', build_default_model)
+
+
+def get_collaborative_model(wait: bool = False) -> Optional[ItemItemCF]:
+    """The process-wide item-item model, or None while it is still building (unless ``wait``)"""
+    if not Config.COLLABORATIVE_FILTERING:
+        return None
+    if collaborative_service.ready or wait:
+        return collaborative_service.get()
+    collaborative_service.start()
+    return None
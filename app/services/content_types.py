@@ -0,0 +1,46 @@
+import re
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+CONTENT_TYPE_COLUMN = 'content_type'
+CONTENT_TYPES = ('game', 'dlc', 'soundtrack', 'bundle', 'artbook')
+
+# Checked in order; the first match wins and anything unmatched is a game.
+# Same keywords as the old add-on title filter, matched as whole words so
+# titles like "Ghost Recon" or "Backpack Hero" stay games.
+_TITLE_PATTERNS = (
+    ('soundtrack', r'\b(?:soundtrack|ost)\b'),
+    ('artbook', r'\bart\s?book\b'),
+    ('bundle', r'\bbundle\b'),
+    ('dlc', r'\b(?:dlc|content|add-on|pack|season pass)\b'),
+)
+
+
+def classify_titles(titles: pd.Series) -> pd.Categorical:
+    """Content type of every title as a categorical over CONTENT_TYPES"""
+    titles = titles.astype('string').fillna('')
+    conditions = [titles.str.contains(pattern, flags=re.IGNORECASE, regex=True).to_numpy(dtype=bool)
+                  for _, pattern in _TITLE_PATTERNS]
+    labels = np.select(conditions, [content_type for content_type, _ in _TITLE_PATTERNS], default='game')
+    return pd.Categorical(labels, categories=CONTENT_TYPES)
+
+
+def content_types(games_df: pd.DataFrame) -> pd.Series:
+    """The games' content_type column, classifying titles if it hasn't been added yet"""
+    if CONTENT_TYPE_COLUMN in games_df.columns:
+        return games_df[CONTENT_TYPE_COLUMN]
+    if 'title' not in games_df.columns:
+        return pd.Series(pd.Categorical(['game'] * len(games_df), categories=CONTENT_TYPES), index=games_df.index)
+    return pd.Series(classify_titles(games_df['title']), index=games_df.index)
+
+
+def parse_content_type(value: Optional[str]) -> Optional[str]:
+    """Validate a content_type filter; None or 'all' means no filter"""
+    if value is None or value == 'all':
+        return None
+    value = value.lower()
+    if value not in CONTENT_TYPES:
+        raise ValueError(f"Unknown content_type: {value} (expected one of {', '.join(CONTENT_TYPES)} or all)")
+    return value
@@ -4,6 +4,7 @@ import numpy as np
 from datetime import datetime, timedelta
 import json
 import os
+from app.services.dataset_registry import get_registry
 
 class CSVAnalyzer:
     def __init__(self):
@@ -33,7 +34,10 @@ class CSVAnalyzer:
             # Try to load pre-processed games data
             games_file = os.path.join(self.processed_dir, "games_aggregated.csv")
             if os.path.exists(games_file):
-                df = pd.read_csv(games_file)
+                registry = get_registry()
+                if not registry.is_registered('games_aggregated'):
+                    registry.register('games_aggregated', path=games_file)
+                df = registry.get('games_aggregated')
                 # Return top games by players
                 top_games = df.nlargest(limit, 'players_sum')
                 return self._format_games_data(top_games)
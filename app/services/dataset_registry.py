@@ -0,0 +1,305 @@
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+from config import Config
+from app.services.dataset_schema import GAMES_SCHEMA, USERS_SCHEMA, RECOMMENDATIONS_SCHEMA
+from app.services.dataset_snapshot import CSVSnapshotCache
+from app.services.sampling import STRATA
+from app.services.shared_columns import SharedColumnStore
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _row_limit(value: int, strata: Optional[str] = None) -> Dict:
+    """Read options capping a dataset at ``value`` rows (0 = whole file)
+
+    DATA_SAMPLING='head' keeps the first rows; any other mode draws a seeded
+    random sample in one pass, stratified by ``strata`` when the mode asks
+    for it (see app.services.sampling).
+    """
+    if not value or value <= 0:
+        return {}
+    if Config.DATA_SAMPLING == 'head':
+        return {'nrows': value}
+    return {'sample': {
+        'size': value,
+        'seed': Config.DATA_SAMPLE_SEED,
+        'strata': strata if Config.DATA_SAMPLING == strata else None,
+        'min_per_stratum': Config.DATA_SAMPLE_MIN_PER_STRATUM
+    }}
+
+
+class DatasetSnapshot:
+    """One generation of loaded datasets
+
+    Frames are added lazily but never replaced: a reload builds a new
+    snapshot with a higher version and the registry swaps it in atomically,
+    so readers holding the old one keep a consistent view.
+    """
+
+    def __init__(self, version: int):
+        self.version = version
+        self.created_at = datetime.now().isoformat()
+        self.entries = {}
+
+
+class DatasetRegistry:
+    """Process-wide owner of the Steam datasets
+
+    Paths are resolved once, each dataset is parsed at most once (lazily, on
+    first use) and every consumer gets the same frame back instead of reading
+    its own copy of the CSV. With a SharedColumnStore the numeric columns are
+    memory-mapped from files shared by every worker process.
+    """
+
+    def __init__(self, search_paths: List[str], snapshots: CSVSnapshotCache,
+                 shared: Optional[SharedColumnStore] = None):
+        self.search_paths = search_paths
+        self.snapshots = snapshots
+        self.shared = shared if shared is not None and shared.enabled else None
+        self._definitions = {}
+        self._paths = {}
+        self._snapshot = DatasetSnapshot(version=1)
+        self._built_version = 1
+        self._lock = threading.Lock()
+        self._load_locks = {}
+
+    def register(self, name: str, filename: str = None, path: str = None,
+                 schema: Dict = None, **read_options):
+        """Declare a dataset by file name (searched for) or explicit path"""
+        with self._lock:
+            self._definitions[name] = {
+                'filename': filename or os.path.basename(path),
+                'path': path,
+                'schema': schema,
+                'read_options': read_options
+            }
+            self._paths.pop(name, None)
+            self._snapshot.entries.pop(name, None)
+            self._load_locks.setdefault(name, threading.Lock())
+
+    def is_registered(self, name: str) -> bool:
+        return name in self._definitions
+
+    def resolve_path(self, name: str) -> Optional[str]:
+        """Locate the dataset's source file (cached after the first lookup)"""
+        if name in self._paths:
+            return self._paths[name]
+
+        definition = self._definitions.get(name)
+        if definition is None:
+            raise KeyError(f"Unknown dataset: {name}")
+
+        candidates = [definition['path']] if definition['path'] else [
+            os.path.join(base, definition['filename']) for base in self.search_paths
+        ]
+        path = next((os.path.abspath(c) for c in candidates if os.path.exists(c)), None)
+        if path is None:
+            logger.warning(f"⚠️ {definition['filename']} not found in {candidates}")
+        self._paths[name] = path
+        return path
+
+    @property
+    def snapshot(self) -> DatasetSnapshot:
+        """The current generation; hold on to it for a consistent view"""
+        return self._snapshot
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    def get(self, name: str, snapshot: Optional[DatasetSnapshot] = None) -> Optional[pd.DataFrame]:
+        """Shared frame for ``name``; consumers must treat it as read-only"""
+        snapshot = snapshot or self._snapshot
+        entry = snapshot.entries.get(name)
+        if entry is not None:
+            return entry['df']
+
+        if name not in self._definitions:
+            raise KeyError(f"Unknown dataset: {name}")
+
+        with self._load_locks[name]:
+            entry = snapshot.entries.get(name)
+            if entry is None:
+                entry = self._load(name)
+                snapshot.entries[name] = entry
+        return entry['df']
+
+    def view(self, name: str, snapshot: Optional[DatasetSnapshot] = None) -> Optional[pd.DataFrame]:
+        """Shallow copy sharing the data; column assignments stay local"""
+        df = self.get(name, snapshot)
+        return df.copy(deep=False) if df is not None else None
+
+    def derived(self, name: str, key: str, build: Callable[[pd.DataFrame], object],
+                snapshot: Optional[DatasetSnapshot] = None):
+        """``build(frame)`` for dataset ``name``, computed once and kept with the loaded frame
+
+        Lets consumers share structures derived from a frame (indexes,
+        rankings) the way they share the frame itself. Returns None when the
+        dataset is not available.
+        """
+        snapshot = snapshot or self._snapshot
+        df = self.get(name, snapshot)
+        if df is None:
+            return None
+        entry = snapshot.entries[name]
+        derived = entry.setdefault('derived', {})
+        if key not in derived:
+            with self._load_locks[name]:
+                if key not in derived:
+                    derived[key] = build(df)
+        return derived[key]
+
+    def is_loaded(self, name: str) -> bool:
+        entry = self._snapshot.entries.get(name)
+        return entry is not None and entry['df'] is not None
+
+    def source_stamp(self, name: str) -> Optional[tuple]:
+        """(path, mtime_ns, size) of the dataset's source file right now"""
+        path = self.resolve_path(name)
+        if path is None:
+            return None
+        stat = os.stat(path)
+        return path, stat.st_mtime_ns, stat.st_size
+
+    def is_stale(self, name: str) -> bool:
+        """True if the loaded frame was parsed from an older version of its file"""
+        entry = self._snapshot.entries.get(name)
+        if entry is None or entry['df'] is None:
+            return False
+        try:
+            return self.source_stamp(name) != entry['source']
+        except OSError:
+            return False
+
+    def build_snapshot(self, names: Optional[List[str]] = None) -> DatasetSnapshot:
+        """Load a fresh generation without touching the one readers are using
+
+        Defaults to the datasets loaded in the current snapshot. Call swap()
+        to publish the result.
+        """
+        with self._lock:
+            current = self._snapshot
+            names = names or list(current.entries) or list(self._definitions)
+            for name in names:
+                self._paths.pop(name, None)
+            snapshot = DatasetSnapshot(version=self._built_version + 1)
+            self._built_version = snapshot.version
+
+        for name in names:
+            snapshot.entries[name] = self._load(name)
+        return snapshot
+
+    def swap(self, snapshot: DatasetSnapshot) -> bool:
+        """Atomically make ``snapshot`` current unless a newer one already is"""
+        with self._lock:
+            if snapshot.version <= self._snapshot.version:
+                return False
+            self._snapshot = snapshot
+        logger.info(f"🔁 Dataset snapshot v{snapshot.version} is now current")
+        return True
+
+    def invalidate(self, name: str = None):
+        """Start a new generation without ``name`` (or any dataset) so get() reloads it"""
+        with self._lock:
+            current = self._snapshot
+            names = [name] if name else list(self._definitions)
+            snapshot = DatasetSnapshot(version=self._built_version + 1)
+            snapshot.entries = {key: entry for key, entry in current.entries.items() if key not in names}
+            self._built_version = snapshot.version
+            for key in names:
+                self._paths.pop(key, None)
+            self._snapshot = snapshot
+
+    def describe(self) -> List[Dict]:
+        """What is loaded, from where and how much memory it takes"""
+        snapshot = self._snapshot
+        report = []
+        for name, definition in self._definitions.items():
+            entry = snapshot.entries.get(name)
+            item = {
+                'name': name,
+                'path': self._paths.get(name),
+                'loaded': entry is not None and entry['df'] is not None,
+                'version': snapshot.version,
+                'read_options': definition['read_options']
+            }
+            if entry is not None and entry['df'] is not None:
+                item.update({
+                    'rows': len(entry['df']),
+                    'columns': len(entry['df'].columns),
+                    'memory_bytes': entry['memory_bytes'],
+                    'shared_bytes': entry['shared_bytes'],
+                    'loaded_at': entry['loaded_at'],
+                    'load_seconds': entry['load_seconds']
+                })
+            report.append(item)
+        return report
+
+    def _load(self, name: str) -> Dict:
+        definition = self._definitions[name]
+        path = self.resolve_path(name)
+        if path is None:
+            return {'df': None}
+
+        stat = os.stat(path)
+        started = time.time()
+        load_args = dict(name=name, schema=definition['schema'], **definition['read_options'])
+        df = shared_key = None
+        if self.shared is not None:
+            shared_key = self.snapshots.version_key(path, **load_args)
+            df = self.shared.attach(shared_key)
+        if df is None:
+            df = self.snapshots.load(path, **load_args)
+            if shared_key is not None:
+                df = self.shared.publish(shared_key, df)
+                self.shared.prune(shared_key.rsplit('-', 1)[0] + '-', keep=shared_key)
+        elapsed = time.time() - started
+        logger.info(f"✅ Dataset {name}: {len(df):,} rows from {path} in {elapsed:.2f}s")
+        return {
+            'df': df,
+            'source': (path, stat.st_mtime_ns, stat.st_size),
+            'memory_bytes': int(df.memory_usage(deep=True).sum()),
+            'shared_bytes': SharedColumnStore.mapped_bytes(df) if shared_key else 0,
+            'loaded_at': datetime.now().isoformat(),
+            'load_seconds': round(elapsed, 3)
+        }
+
+
+def _default_search_paths() -> List[str]:
+    paths = [p for p in Config.DATA_SEARCH_PATHS.split(os.pathsep) if p]
+    paths += [os.path.join(PROJECT_ROOT, 'data', 'raw'), os.path.join(PROJECT_ROOT, 'raw')]
+    return list(dict.fromkeys(paths))
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> DatasetRegistry:
+    """The process-wide registry with the standard Steam datasets registered"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                registry = DatasetRegistry(
+                    _default_search_paths(),
+                    CSVSnapshotCache(Config.DATA_SNAPSHOT_DIR, enabled=Config.DATA_SNAPSHOTS_ENABLED),
+                    SharedColumnStore(Config.DATA_SHARED_DIR, enabled=Config.DATA_SHARED_COLUMNS)
+                )
+                registry.register('games', 'games.csv', schema=GAMES_SCHEMA)
+                registry.register('users', 'users.csv', schema=USERS_SCHEMA,
+                                  **_row_limit(Config.USERS_MAX_ROWS))
+                registry.register('recommendations', 'recommendations.csv', schema=RECOMMENDATIONS_SCHEMA,
+                                  **_row_limit(Config.RECOMMENDATIONS_MAX_ROWS,
+                                               strata=Config.DATA_SAMPLING if Config.DATA_SAMPLING in STRATA else None))
+                _registry = registry
+    return _registry
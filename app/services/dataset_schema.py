@@ -0,0 +1,138 @@
+import logging
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401 - enables Arrow-backed string columns
+    STRING_DTYPE = 'string[pyarrow]'
+except ImportError:
+    STRING_DTYPE = 'object'
+
+logger = logging.getLogger(__name__)
+
+DATETIME = 'datetime64[ns]'
+
+# Declared column types for the raw Steam CSV files. Columns not listed here
+# keep pandas' inferred dtype.
+GAMES_SCHEMA = {
+    'app_id': 'uint32',
+    'title': STRING_DTYPE,
+    'date_release': DATETIME,
+    'win': 'bool',
+    'mac': 'bool',
+    'linux': 'bool',
+    'rating': 'category',
+    'positive_ratio': 'uint8',
+    'user_reviews': 'uint32',
+    'price_final': 'float32',
+    'price_original': 'float32',
+    'discount': 'float32',
+    'steam_deck': 'bool'
+}
+
+USERS_SCHEMA = {
+    'user_id': 'uint32',
+    'products': 'uint32',
+    'reviews': 'uint32'
+}
+
+RECOMMENDATIONS_SCHEMA = {
+    'app_id': 'uint32',
+    'helpful': 'uint32',
+    'funny': 'uint32',
+    'date': DATETIME,
+    'is_recommended': 'bool',
+    'hours': 'float32',
+    'user_id': 'uint32',
+    'review_id': 'uint32'
+}
+
+SCHEMAS = {
+    'games': GAMES_SCHEMA,
+    'users': USERS_SCHEMA,
+    'recommendations': RECOMMENDATIONS_SCHEMA
+}
+
+# Types that cannot hold missing values; relaxed if the file has gaps
+_STRICT_KINDS = ('uint', 'int', 'bool')
+
+
+def schema_read_kwargs(schema: Dict[str, str], columns: Iterable[str], relaxed: bool = False) -> Dict:
+    """Translate a schema into ``pd.read_csv`` keyword arguments"""
+    columns = set(columns)
+    dtype = {}
+    parse_dates = []
+    for column, column_type in schema.items():
+        if column not in columns:
+            continue
+        if column_type == DATETIME:
+            parse_dates.append(column)
+        elif relaxed and column_type.startswith(_STRICT_KINDS):
+            dtype[column] = 'float64' if 'int' in column_type else 'boolean'
+        else:
+            dtype[column] = column_type
+    kwargs = {'dtype': dtype}
+    if parse_dates:
+        kwargs['parse_dates'] = parse_dates
+    return kwargs
+
+
+def read_csv_typed(csv_path: str, schema: Dict[str, str], **read_kwargs) -> pd.DataFrame:
+    """Read a CSV applying the declared schema at parse time"""
+    columns = _selected_columns(csv_path, read_kwargs.get('usecols'))
+    try:
+        return pd.read_csv(csv_path, **schema_read_kwargs(schema, columns), **read_kwargs)
+    except (ValueError, TypeError) as e:
+        # Missing values in an int/bool column: fall back to nullable-safe types
+        logger.warning(f"⚠️ Strict schema failed for {csv_path}, relaxing integer/bool columns: {e}")
+        return pd.read_csv(csv_path, **schema_read_kwargs(schema, columns, relaxed=True), **read_kwargs)
+
+
+def _selected_columns(csv_path: str, usecols: Optional[List]) -> List[str]:
+    header = list(pd.read_csv(csv_path, nrows=0).columns)
+    if usecols is None:
+        return header
+    return [column for column in header if column in usecols]
+
+
+def _default_dtype_bytes(series: pd.Series) -> int:
+    """Bytes the column would take with pandas' default CSV dtypes"""
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype) or pd.api.types.is_string_dtype(dtype):
+        return int(series.astype(object).memory_usage(index=False, deep=True))
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        # Unparsed dates are read as object strings
+        as_text = series.dt.strftime('%Y-%m-%d').astype(object)
+        return int(as_text.memory_usage(index=False, deep=True))
+    if pd.api.types.is_bool_dtype(dtype):
+        return len(series)
+    if pd.api.types.is_numeric_dtype(dtype):
+        return len(series) * np.dtype('int64').itemsize
+    return int(series.memory_usage(index=False, deep=True))
+
+
+def memory_report(df: pd.DataFrame) -> Dict:
+    """Per-column bytes with the declared schema vs. pandas' default dtypes"""
+    columns = {}
+    total = default_total = 0
+    for column in df.columns:
+        series = df[column]
+        used = int(series.memory_usage(index=False, deep=True))
+        default = _default_dtype_bytes(series)
+        columns[column] = {
+            'dtype': str(series.dtype),
+            'bytes': used,
+            'default_bytes': default
+        }
+        total += used
+        default_total += default
+
+    return {
+        'rows': len(df),
+        'columns': columns,
+        'total_bytes': total,
+        'default_total_bytes': default_total,
+        'saved_percentage': round((1 - total / default_total) * 100, 1) if default_total else 0.0
+    }
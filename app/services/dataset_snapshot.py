@@ -0,0 +1,202 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Callable, Dict, Optional
+
+import pandas as pd
+
+from app.services.dataset_schema import read_csv_typed
+from app.services.sampling import sample_csv
+
+try:
+    import pyarrow  # noqa: F401 - only needed for the Parquet engine
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+HASH_BLOCK_SIZE = 8 * 1024 * 1024
+
+
+class CSVSnapshotCache:
+    """Convert CSV files once into typed Parquet snapshots and reuse them
+
+    Each snapshot is keyed by the source file's size, mtime and content hash
+    plus the read options used to parse it. A warm load only stats the CSV and
+    reads the Parquet file; the CSV is re-parsed only when its content changes.
+    """
+
+    def __init__(self, snapshot_dir: str = 'data/snapshots', enabled: bool = True):
+        self.snapshot_dir = snapshot_dir
+        self.enabled = enabled and PARQUET_AVAILABLE
+        if enabled and not PARQUET_AVAILABLE:
+            logger.warning("⚠️ pyarrow not installed - CSV snapshots disabled")
+
+    def load(self, csv_path: str, name: Optional[str] = None, schema: Optional[Dict] = None,
+             **read_kwargs) -> pd.DataFrame:
+        """Load a CSV through its snapshot, rebuilding the snapshot if stale
+
+        ``schema`` maps column names to dtypes applied while parsing (see
+        app.services.dataset_schema); it is part of the snapshot key.
+        """
+        if not self.enabled:
+            return self._parse(csv_path, schema, read_kwargs)
+
+        name = name or os.path.splitext(os.path.basename(csv_path))[0]
+        key = f"{name}-{self._options_key(dict(read_kwargs, schema=schema))}"
+        manifest_path = os.path.join(self.snapshot_dir, f"{key}.json")
+        snapshot_path = os.path.join(self.snapshot_dir, f"{key}.parquet")
+
+        stat = os.stat(csv_path)
+        manifest = self._read_manifest(manifest_path)
+
+        if os.path.exists(snapshot_path) and self._is_fresh(manifest, manifest_path, csv_path, stat):
+            df = self._read_snapshot(snapshot_path)
+            if df is not None:
+                logger.info(f"⚡ Loaded {name} from snapshot ({len(df)} rows)")
+                return df
+
+        df = self._parse(csv_path, schema, read_kwargs)
+        self._write_snapshot(df, snapshot_path, manifest_path, csv_path, stat, dict(read_kwargs, schema=schema))
+        return df
+
+    def load_derived(self, csv_path: str, name: str, build: Callable,
+                     serialize: Callable = None, deserialize: Callable = None):
+        """Cache a JSON-serializable result computed from a CSV next to its snapshot
+
+        ``build(csv_path)`` is only called when the source file changed since
+        the result was stored.
+        """
+        if not self.enabled:
+            return build(csv_path)
+
+        serialize = serialize or (lambda value: value)
+        deserialize = deserialize or (lambda value: value)
+        manifest_path = os.path.join(self.snapshot_dir, f"{name}.json")
+
+        stat = os.stat(csv_path)
+        manifest = self._read_manifest(manifest_path)
+        if manifest and 'result' in manifest and self._is_fresh(manifest, manifest_path, csv_path, stat):
+            logger.info(f"⚡ Loaded {name} from snapshot")
+            return deserialize(manifest['result'])
+
+        value = build(csv_path)
+        try:
+            os.makedirs(self.snapshot_dir, exist_ok=True)
+            self._write_manifest(manifest_path, {
+                'source': os.path.abspath(csv_path),
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'sha256': self.content_hash(csv_path),
+                'result': serialize(value)
+            })
+        except Exception as e:
+            logger.warning(f"⚠️ Could not store {name} for {csv_path}: {e}")
+        return value
+
+    def fingerprint(self, csv_path: str) -> Dict:
+        """Return the size, mtime and content hash identifying a source file"""
+        stat = os.stat(csv_path)
+        return {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': self.content_hash(csv_path)
+        }
+
+    def version_key(self, csv_path: str, name: Optional[str] = None, schema: Optional[Dict] = None,
+                    **read_kwargs) -> str:
+        """Identify what ``load`` returns for these arguments: read options plus content hash
+
+        Uses the hash stored in a fresh snapshot manifest, so on a warm start
+        this only stats the CSV.
+        """
+        name = name or os.path.splitext(os.path.basename(csv_path))[0]
+        key = f"{name}-{self._options_key(dict(read_kwargs, schema=schema))}"
+        manifest = None
+        if self.enabled:
+            manifest_path = os.path.join(self.snapshot_dir, f"{key}.json")
+            manifest = self._read_manifest(manifest_path)
+            if not self._is_fresh(manifest, manifest_path, csv_path, os.stat(csv_path)):
+                manifest = None
+        sha256 = manifest['sha256'] if manifest else self.content_hash(csv_path)
+        return f"{key}-{sha256[:16]}"
+
+    @staticmethod
+    def _parse(csv_path: str, schema: Optional[Dict], read_kwargs: Dict) -> pd.DataFrame:
+        if 'sample' in read_kwargs:
+            options = dict(read_kwargs)
+            return sample_csv(csv_path, schema=schema, **options.pop('sample'), **options)
+        if schema:
+            return read_csv_typed(csv_path, schema, **read_kwargs)
+        return pd.read_csv(csv_path, **read_kwargs)
+
+    @staticmethod
+    def content_hash(path: str) -> str:
+        """Stream the file through SHA-256 without loading it into memory"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _is_fresh(self, manifest: Optional[Dict], manifest_path: str, csv_path: str, stat) -> bool:
+        """Check a stored manifest against the source file's size, mtime and hash"""
+        if not manifest or manifest.get('size') != stat.st_size:
+            return False
+        if manifest.get('mtime_ns') == stat.st_mtime_ns:
+            return True
+        if manifest.get('sha256') != self.content_hash(csv_path):
+            return False
+        # Touched but unchanged: remember the new mtime so the next check is a stat
+        manifest['mtime_ns'] = stat.st_mtime_ns
+        self._write_manifest(manifest_path, manifest)
+        return True
+
+    @staticmethod
+    def _options_key(read_kwargs: Dict) -> str:
+        options = json.dumps(read_kwargs, sort_keys=True, default=str)
+        return hashlib.sha1(options.encode('utf-8')).hexdigest()[:12]
+
+    @staticmethod
+    def _read_manifest(manifest_path: str) -> Optional[Dict]:
+        try:
+            with open(manifest_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _write_manifest(manifest_path: str, manifest: Dict):
+        tmp_path = f"{manifest_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, manifest_path)
+
+    @staticmethod
+    def _read_snapshot(snapshot_path: str) -> Optional[pd.DataFrame]:
+        try:
+            return pd.read_parquet(snapshot_path)
+        except Exception as e:
+            logger.warning(f"⚠️ Unreadable snapshot {snapshot_path}, rebuilding: {e}")
+            return None
+
+    def _write_snapshot(self, df, snapshot_path, manifest_path, csv_path, stat, read_kwargs):
+        try:
+            os.makedirs(self.snapshot_dir, exist_ok=True)
+            tmp_path = f"{snapshot_path}.tmp"
+            df.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, snapshot_path)
+            self._write_manifest(manifest_path, {
+                'source': os.path.abspath(csv_path),
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'sha256': self.content_hash(csv_path),
+                'read_options': json.loads(json.dumps(read_kwargs, default=str)),
+                'rows': len(df)
+            })
+            logger.info(f"💾 Wrote snapshot {snapshot_path} ({len(df)} rows)")
+        except Exception as e:
+            # A failed snapshot only costs the next load a CSV parse
+            logger.warning(f"⚠️ Could not write snapshot for {csv_path}: {e}")
@@ -0,0 +1,127 @@
+import logging
+import time
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.services.activity_index import DAY_COLUMN, MISSING_DAY, day_numbers
+
+logger = logging.getLogger(__name__)
+
+GAME_REVIEW_COLUMNS = ('review_count', 'recommend_rate', 'mean_hours', 'median_hours', 'first_review', 'last_review')
+# Keys the review stats can rank games by (see GameReviewStats.ranking_frame)
+REVIEW_RANKING_KEYS = ('review_count', 'recommend_rate', 'mean_hours')
+# A recommend rate from fewer reviews than this is too noisy to rank on
+MIN_REVIEWS_FOR_RATE = 10
+
+
+def game_positions(games_df: pd.DataFrame, app_ids) -> np.ndarray:
+    """Row position in games_df of each app_id (first row for duplicates), -1 where the game is unknown"""
+    ids = pd.Index(pd.to_numeric(games_df['app_id'], errors='coerce'))
+    first = ~ids.duplicated()
+    found = ids[first].get_indexer(pd.Index(app_ids))
+    return np.where(found >= 0, np.flatnonzero(first)[found], -1)
+
+
+def _row_totals(recommendations_df: pd.DataFrame) -> pd.DataFrame:
+    """One groupby over review rows -> per app_id totals and median hours"""
+    df = recommendations_df
+    days = (df[DAY_COLUMN].to_numpy() if DAY_COLUMN in df.columns
+            else day_numbers(df['date']) if 'date' in df.columns
+            else np.full(len(df), MISSING_DAY, dtype='int32'))
+    rows = pd.DataFrame({
+        'app_id': pd.to_numeric(df['app_id'], errors='coerce'),
+        'recommended': (df['is_recommended'].fillna(False).astype(bool)
+                        if 'is_recommended' in df.columns else False),
+        'hours': pd.to_numeric(df['hours'], errors='coerce') if 'hours' in df.columns else np.nan,
+        'day': np.where(days == MISSING_DAY, np.nan, days)
+    }).dropna(subset=['app_id'])
+    return rows.groupby(rows['app_id'].astype('int64')).agg(
+        reviews=('recommended', 'size'), recommended=('recommended', 'sum'),
+        hours_sum=('hours', 'sum'), hours_count=('hours', 'count'),
+        first_day=('day', 'min'), last_day=('day', 'max'), median_hours=('hours', 'median')
+    ).astype('float64')
+
+
+class GameReviewStats:
+    """Per-game review aggregates materialized as arrays aligned to games_df rows
+
+    review_count, recommend_rate (%), mean_hours, median_hours and the first
+    and last review day, so a games row position reads its review stats
+    directly with no per-request join. Games without reviews have a count of
+    0 and NaN elsewhere. Immutable once built.
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        self.columns = columns
+        for values in columns.values():
+            values.flags.writeable = False
+
+    @classmethod
+    def build(cls, games_df: pd.DataFrame, recommendations_df: Optional[pd.DataFrame] = None,
+              aggregate=None) -> 'GameReviewStats':
+        """From the loaded review rows; counts, rates, means and dates come from the
+        full-population ``aggregate`` when given (medians need the rows)"""
+        started = time.time()
+        totals = (_row_totals(recommendations_df)
+                  if recommendations_df is not None and 'app_id' in recommendations_df.columns
+                  else pd.DataFrame(columns=['median_hours'], dtype='float64'))
+        if aggregate is not None and aggregate.game_reviews:
+            medians = totals['median_hours']
+            totals = aggregate.game_review_totals()
+            totals['median_hours'] = medians.reindex(totals.index)
+
+        n = len(games_df)
+        columns = {
+            'review_count': np.zeros(n, dtype='int64'),
+            **{name: np.full(n, np.nan) for name in GAME_REVIEW_COLUMNS[1:]}
+        }
+        if len(totals) and 'app_id' in games_df.columns:
+            positions = game_positions(games_df, totals.index)
+            known = positions >= 0
+            rows, totals = positions[known], totals[known]
+            reviews = totals['reviews'].to_numpy()
+            hours_count = totals['hours_count'].to_numpy()
+            columns['review_count'][rows] = reviews.astype('int64')
+            with np.errstate(invalid='ignore', divide='ignore'):
+                columns['recommend_rate'][rows] = np.where(
+                    reviews > 0, totals['recommended'].to_numpy() / reviews * 100, np.nan)
+                columns['mean_hours'][rows] = np.where(
+                    hours_count > 0, totals['hours_sum'].to_numpy() / hours_count, np.nan)
+            columns['median_hours'][rows] = totals['median_hours'].to_numpy()
+            columns['first_review'][rows] = totals['first_day'].to_numpy()
+            columns['last_review'][rows] = totals['last_day'].to_numpy()
+
+        stats = cls(columns)
+        logger.info(f"🎮 Materialized review stats for {int((columns['review_count'] > 0).sum()):,} of {n:,} games "
+                    f"in {time.time() - started:.3f}s")
+        return stats
+
+    def __len__(self) -> int:
+        return len(self.columns['review_count'])
+
+    def ranking_frame(self) -> pd.DataFrame:
+        """Rankable columns (recommend rates from too few reviews masked out) for RankingIndex.build"""
+        frame = pd.DataFrame({key: self.columns[key] for key in REVIEW_RANKING_KEYS})
+        frame.loc[self.columns['review_count'] < MIN_REVIEWS_FOR_RATE, 'recommend_rate'] = np.nan
+        return frame
+
+    def record(self, position: int) -> Dict:
+        """JSON-ready review stats of one games row"""
+        def rounded(name):
+            value = self.columns[name][position]
+            return None if np.isnan(value) else round(float(value), 1)
+
+        def day(name):
+            value = self.columns[name][position]
+            return None if np.isnan(value) else str(np.datetime64(int(value), 'D'))
+
+        return {
+            'review_count': int(self.columns['review_count'][position]),
+            'recommend_rate': rounded('recommend_rate'),
+            'mean_hours': rounded('mean_hours'),
+            'median_hours': rounded('median_hours'),
+            'first_review': day('first_review'),
+            'last_review': day('last_review')
+        }
@@ -0,0 +1,164 @@
+import logging
+import threading
+import time
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from app.services.content_types import content_types
+
+logger = logging.getLogger(__name__)
+
+# Price buckets: 'free' is exactly 0, the others are (low, high] in dollars
+PRICE_EDGES = [0, 5, 10, 20, 30, 40]
+PRICE_BUCKETS = ['free', '0-5', '5-10', '10-20', '20-30', '30-40', '40+', 'unknown']
+
+# positive_ratio bands (inclusive integer percentages). The edges line up with
+# every threshold the analytics use (pd.cut at 25/50/75, the 40/70/80/90
+# rating tiers and the <=40 "low rated" cut), so each of those is a union of bands.
+RATIO_BANDS = [(0, 0), (1, 25), (26, 39), (40, 40), (41, 50), (51, 69),
+               (70, 75), (76, 79), (80, 89), (90, 100)]
+RATIO_BAND_LABELS = [f"{low}-{high}" for low, high in RATIO_BANDS] + ['unknown']
+
+DIMENSIONS = ('price_bucket', 'rating', 'steam_deck', 'discounted', 'release_year', 'ratio_band', 'content_type')
+MEASURES = ('price_final', 'positive_ratio', 'discount', 'user_reviews')
+
+
+def ratio_bands(low: int = 0, high: int = 100) -> List[str]:
+    """Band labels covering exactly ``low <= positive_ratio <= high``"""
+    labels = []
+    for (band_low, band_high), label in zip(RATIO_BANDS, RATIO_BAND_LABELS):
+        if band_low >= low and band_high <= high:
+            labels.append(label)
+        elif band_high >= low and band_low <= high:
+            raise ValueError(f"positive_ratio range {low}-{high} is not aligned with the cube bands")
+    return labels
+
+
+def _price_buckets(prices: pd.Series) -> np.ndarray:
+    values = prices.to_numpy(dtype='float64', na_value=np.nan)
+    index = np.searchsorted(PRICE_EDGES, values, side='left')
+    index = np.where(values == 0, 0, index)
+    index = np.where(np.isnan(values), len(PRICE_BUCKETS) - 1, index)
+    return np.array(PRICE_BUCKETS, dtype=object)[index]
+
+
+def _ratio_bands(ratios: pd.Series) -> np.ndarray:
+    values = ratios.to_numpy(dtype='float64', na_value=np.nan)
+    uppers = [high for _, high in RATIO_BANDS]
+    index = np.searchsorted(uppers, values, side='left')
+    index = np.where(np.isnan(values) | (index >= len(RATIO_BANDS)), len(RATIO_BAND_LABELS) - 1, index)
+    return np.array(RATIO_BAND_LABELS, dtype=object)[index]
+
+
+class GamesCube:
+    """Pre-aggregated games table for the dashboard metrics
+
+    One row per non-empty combination of price bucket, Steam rating category,
+    Steam Deck status, discounted flag, release year, positive_ratio band and
+    content type, holding the row count plus count/sum/min/max of each
+    measure. Every count, mean and range the analytics show is a sum over a
+    few cells, and answers are memoized, so repeat calls cost a dict lookup.
+    Build once per dataset version; the cube is never modified afterwards.
+    """
+
+    def __init__(self, cells: pd.DataFrame, total_rows: int):
+        self.cells = cells
+        self.total_rows = total_rows
+        self._columns = {column: cells[column].to_numpy() for column in cells.columns}
+        self._memo = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, games_df: pd.DataFrame) -> 'GamesCube':
+        started = time.time()
+        n = len(games_df)
+
+        def column(name, default=None):
+            return games_df[name] if name in games_df.columns else pd.Series([default] * n, index=games_df.index)
+
+        def labels(name):
+            values = column(name)
+            return values.astype(object).where(values.notna(), 'Unknown').astype(str).to_numpy()
+
+        discount = pd.to_numeric(column('discount', 0), errors='coerce')
+        release = pd.to_datetime(column('date_release'), errors='coerce')
+        frame = pd.DataFrame({
+            'price_bucket': _price_buckets(pd.to_numeric(column('price_final'), errors='coerce')),
+            'rating': labels('rating'),
+            'steam_deck': labels('steam_deck'),
+            'discounted': (discount > 0).to_numpy(),
+            'release_year': release.dt.year.fillna(-1).astype('int64').to_numpy(),
+            'ratio_band': _ratio_bands(pd.to_numeric(column('positive_ratio'), errors='coerce')),
+            'content_type': content_types(games_df).astype(str).to_numpy()
+        })
+        for measure in MEASURES:
+            frame[measure] = pd.to_numeric(column(measure), errors='coerce').astype('float64').to_numpy()
+
+        grouped = frame.groupby(list(DIMENSIONS), sort=False, dropna=False)
+        aggregations = {'rows': ('content_type', 'size')}
+        for measure in MEASURES:
+            aggregations.update({
+                f"{measure}_count": (measure, 'count'),
+                f"{measure}_sum": (measure, 'sum'),
+                f"{measure}_min": (measure, 'min'),
+                f"{measure}_max": (measure, 'max')
+            })
+        cells = grouped.agg(**aggregations).reset_index()
+
+        logger.info(f"🧊 Built games cube: {len(cells):,} cells from {n:,} games in {time.time() - started:.3f}s")
+        return cls(cells, n)
+
+    def count(self, **where) -> int:
+        """Number of games matching ``where`` (dimension=value or dimension=[values])"""
+        return self._memoized(('count', self._key(where)), lambda: int(self._columns['rows'][self._mask(where)].sum()))
+
+    def stats(self, measure: str, **where) -> Dict:
+        """count/sum/min/max/mean of a measure over the games matching ``where``"""
+        def compute():
+            mask = self._mask(where)
+            count = int(self._columns[f"{measure}_count"][mask].sum())
+            total = float(self._columns[f"{measure}_sum"][mask].sum())
+            return {
+                'count': count,
+                'sum': total,
+                'min': float(np.nanmin(self._columns[f"{measure}_min"][mask])) if count else None,
+                'max': float(np.nanmax(self._columns[f"{measure}_max"][mask])) if count else None,
+                'mean': total / count if count else None
+            }
+        return self._memoized(('stats', measure, self._key(where)), compute)
+
+    def counts_by(self, dimension: str, **where) -> Dict:
+        """Game counts per value of ``dimension``, largest first (empty values omitted)"""
+        def compute():
+            mask = self._mask(where)
+            counts = pd.Series(self._columns['rows'][mask]).groupby(self._columns[dimension][mask]).sum()
+            counts = counts[counts > 0].sort_values(ascending=False, kind='stable')
+            return {key: int(value) for key, value in counts.items()}
+        return self._memoized(('counts_by', dimension, self._key(where)), compute)
+
+    def _mask(self, where: Dict) -> np.ndarray:
+        mask = np.ones(len(self.cells), dtype=bool)
+        for dimension, value in where.items():
+            values = self._columns[dimension]
+            if isinstance(value, (list, tuple, set, frozenset)):
+                mask &= np.isin(values, list(value))
+            else:
+                mask &= values == value
+        return mask
+
+    @staticmethod
+    def _key(where: Dict):
+        return tuple(sorted(
+            (dimension, tuple(sorted(value, key=str)) if isinstance(value, (list, tuple, set, frozenset)) else value)
+            for dimension, value in where.items()
+        ))
+
+    def _memoized(self, key, compute):
+        if key not in self._memo:
+            value = compute()
+            with self._lock:
+                self._memo.setdefault(key, value)
+        return self._memo[key]
+
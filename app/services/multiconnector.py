@@ -4,36 +4,65 @@ import json
 from typing import Dict, List, Optional
 import logging
 
+from app.services.collaborative import get_collaborative_model
+from app.services.dataset_registry import get_registry
+from app.services.game_review_stats import game_positions
+from app.services.ranking_index import RankingIndex
+
 logger = logging.getLogger(__name__)
 
+# Connector data types -> datasets in the shared registry
+REGISTRY_DATASETS = {
+    'games': 'games',
+    'users': 'users',
+    'reviews': 'recommendations'
+}
+
 class MultiCSVConnector:
     def __init__(self, csv_config: Dict = None):
-        self.csv_config = csv_config or {
-            'games': 'data/raw/games.csv',
-            'users': 'data/raw/users.csv', 
-            'reviews': 'data/raw/recommendations.csv'
-        }
+        # Optional overrides: data type -> CSV path (otherwise the shared datasets are used)
+        self.csv_config = csv_config
         self.dataframes = {}
+        # Registry dataset name per data type, and the snapshot the frames came from
+        self.dataset_names = {}
+        self.snapshot = None
         self.load_all_data()
     
     def load_all_data(self):
-        """Load all three CSV files"""
-        for data_type, file_path in self.csv_config.items():
+        """Fetch all three datasets from the shared dataset registry"""
+        registry = get_registry()
+        self.snapshot = registry.snapshot
+        sources = self.csv_config or REGISTRY_DATASETS
+        for data_type, source in sources.items():
             try:
-                if os.path.exists(file_path):
-                    self.dataframes[data_type] = pd.read_csv(file_path)
-                    logger.info(f"✅ Loaded {len(self.dataframes[data_type])} rows from {data_type}.csv")
+                if self.csv_config:
+                    name = f"{data_type}:{os.path.abspath(source)}"
+                    if not registry.is_registered(name):
+                        registry.register(name, path=source)
+                else:
+                    name = source
+                
+                df = registry.get(name, self.snapshot)
+                if df is not None:
+                    self.dataframes[data_type] = df
+                    self.dataset_names[data_type] = name
+                    logger.info(f"✅ Loaded {len(df)} rows from {data_type}.csv")
                 else:
-                    logger.warning(f"⚠️ File not found: {file_path}")
+                    logger.warning(f"⚠️ File not found: {source}")
                     self.dataframes[data_type] = pd.DataFrame()
             except Exception as e:
-                logger.error(f"❌ Error loading {file_path}: {e}")
+                logger.error(f"❌ Error loading {source}: {e}")
                 self.dataframes[data_type] = pd.DataFrame()
     
     def get_user_recommendations(self, user_id: str, limit: int = 5) -> List[Dict]:
         """Get personalized game recommendations for a user"""
         try:
-            # If we have users and reviews data, use collaborative filtering
+            # Players who liked the same games (item-item model over the full review log)
+            recommendations = self.recommend_collaborative(user_id, limit)
+            if recommendations:
+                return recommendations
+            
+            # Otherwise fall back to the genres of the games the user reviewed
             if 'users' in self.dataframes and 'reviews' in self.dataframes:
                 user_reviews = self.dataframes['reviews'][self.dataframes['reviews']['user_id'] == user_id]
                 
@@ -53,6 +82,33 @@ class MultiCSVConnector:
             logger.error(f"Error getting recommendations for user {user_id}: {e}")
             return self.get_popular_games(limit)
     
+    def recommend_collaborative(self, user_id, limit: int = 5) -> List[Dict]:
+        """Item-item recommendations for a player in the review log; [] when unknown or still building"""
+        # The shared model covers the registry's review log, not overridden CSVs
+        model = get_collaborative_model() if not self.csv_config else None
+        games_df = self.dataframes.get('games')
+        if model is None or games_df is None or games_df.empty:
+            return []
+        
+        scored = model.recommend_for_user(user_id, top_n=limit)
+        if not scored:
+            return []
+        app_ids = [app_id for app_id, _ in scored]
+        positions = game_positions(games_df, app_ids)
+        best = scored[0][1]
+        recommendations = []
+        for (app_id, score), position in zip(scored, positions):
+            row = games_df.iloc[position].to_dict() if position >= 0 else {}
+            recommendations.append({
+                'app_id': app_id,
+                'name': row.get('name', row.get('title', 'Unknown Game')),
+                'genres': row.get('genres', ''),
+                'reason': 'Liked by players who like your games',
+                'confidence': 'high' if score >= best * 0.5 else 'medium',
+                'score': round(score, 4)
+            })
+        return recommendations
+    
     def extract_genres(self, games_df: pd.DataFrame) -> List[str]:
         """Extract genres from games dataframe"""
         try:
@@ -110,35 +166,38 @@ class MultiCSVConnector:
             if games_df is None or games_df.empty:
                 return []
             
-            # Try different popularity metrics
-            popularity_columns = ['positive_ratings', 'rating', 'recommendations']
-            sort_column = None
-            
-            for col in popularity_columns:
-                if col in games_df.columns:
-                    sort_column = col
-                    break
+            # Try different popularity metrics (numeric ones, via the pre-sorted ranking)
+            popularity_columns = ['positive_ratings', 'user_reviews', 'recommendations', 'positive_ratio']
+            ranking = self.games_ranking()
+            sort_column = next((col for col in popularity_columns if col in ranking), None)
             
             if sort_column:
-                popular_games = games_df.sort_values(sort_column, ascending=False).head(limit)
+                popular_games = games_df.iloc[ranking.top(sort_column, limit)]
             else:
                 popular_games = games_df.head(limit)
             
             return [
                 {
-                    'app_id': row.get('app_id'),
-                    'name': row.get('name', 'Unknown Game'),
+                    'app_id': int(row['app_id']) if pd.notna(row.get('app_id')) else None,
+                    'name': row.get('name', row.get('title', 'Unknown Game')),
                     'genres': row.get('genres', ''),
                     'reason': 'Popular among players',
                     'confidence': 'high'
                 }
-                for _, row in popular_games.iterrows()
+                for row in popular_games.to_dict('records')
             ]
             
         except Exception as e:
             logger.error(f"Error getting popular games: {e}")
             return []
     
+    def games_ranking(self) -> RankingIndex:
+        """Pre-sorted games orders, shared through the registry with the loaded frame"""
+        name = self.dataset_names.get('games')
+        if name is None:
+            return RankingIndex.build(self.dataframes.get('games', pd.DataFrame()))
+        return get_registry().derived(name, 'ranking', RankingIndex.build, self.snapshot)
+    
     def get_user_play_history(self, user_id: str) -> Dict:
         """Get user's play history and preferences"""
         try:
@@ -0,0 +1,390 @@
+import copy
+import logging
+import math
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.services.games_cube import MEASURES, GamesCube, ratio_bands
+
+logger = logging.getLogger(__name__)
+
+DATASETS = ('games', 'recommendations', 'users')
+FILTER_OPS = ('==', '!=', '<', '<=', '>', '>=', 'in', 'between')
+AGGREGATIONS = ('count', 'sum', 'mean', 'min', 'max', 'median', 'quantile')
+# Aggregations that only make sense over numbers (min/max also order strings)
+NUMERIC_AGGREGATIONS = ('sum', 'mean', 'quantile')
+# Filter literals: JSON scalars (bool is an int subclass)
+SCALAR_TYPES = (str, int, float)
+
+# Price buckets as low < price <= high (None = unbounded), for mapping price filters onto the cube
+_PRICE_INTERVALS = {
+    'free': (None, 0), '0-5': (0, 5), '5-10': (5, 10), '10-20': (10, 20),
+    '20-30': (20, 30), '30-40': (30, 40), '40+': (40, None)
+}
+# Games columns the cube can filter and group on directly
+_CUBE_LABEL_COLUMNS = ('rating', 'steam_deck', 'content_type')
+
+
+class QueryError(ValueError):
+    """A structured query that is malformed or refers to unknown columns"""
+
+
+class Query:
+    """Normalized structured query: filters, group-by keys and aggregations
+
+    Built from a JSON-style dict::
+
+        {'dataset': 'games',
+         'filters': [{'column': 'price_final', 'op': '>', 'value': 30}],
+         'group_by': ['steam_deck'],
+         'aggregations': [{'func': 'count'}, {'func': 'mean', 'column': 'price_final'}],
+         'order_by': 'count', 'descending': True, 'limit': 10}
+
+    Equivalent queries normalize to the same ``key`` (filter order, float
+    vs int literals), which the engine uses for its plan and result caches.
+    """
+
+    def __init__(self, dataset: str, filters=(), group_by=(), aggregations=(),
+                 order_by: Optional[str] = None, descending: bool = True, limit: Optional[int] = None):
+        if dataset not in DATASETS:
+            raise QueryError(f"Unknown dataset: {dataset}")
+        self.dataset = dataset
+        self.filters = tuple(sorted((self._filter(f) for f in self._list(filters, 'filters')), key=repr))
+        self.group_by = tuple(self._column(c) for c in
+                              ([group_by] if isinstance(group_by, str) else self._list(group_by, 'group_by')))
+        self.aggregations = (tuple(self._aggregation(a) for a in self._list(aggregations, 'aggregations'))
+                             or (('count', None, None, 'count'),))
+        self.order_by = self._column(order_by) if order_by is not None else None
+        self.descending = bool(descending)
+        self.limit = self._limit(limit)
+        names = [name for *_, name in self.aggregations]
+        if len(set(names)) != len(names):
+            raise QueryError(f"Duplicate aggregation names: {names}")
+        if order_by is not None and order_by not in names and order_by not in self.group_by:
+            raise QueryError(f"order_by must be a group-by column or aggregation name: {order_by}")
+
+    @classmethod
+    def from_dict(cls, spec: Dict) -> 'Query':
+        if not isinstance(spec, dict):
+            raise QueryError("A query must be a JSON object")
+        return cls(spec.get('dataset', 'games'), spec.get('filters', ()), spec.get('group_by', ()),
+                   spec.get('aggregations', ()), spec.get('order_by'), spec.get('descending', True),
+                   spec.get('limit'))
+
+    @staticmethod
+    def _list(value, what: str):
+        if not isinstance(value, (list, tuple)):
+            raise QueryError(f"'{what}' must be a list")
+        return value
+
+    @staticmethod
+    def _column(column) -> str:
+        if not isinstance(column, str) or not column:
+            raise QueryError(f"Column names must be non-empty strings: {column!r}")
+        return column
+
+    @staticmethod
+    def _limit(limit) -> Optional[int]:
+        if limit is None:
+            return None
+        if isinstance(limit, str) and limit.strip().isdigit():
+            limit = int(limit)
+        if isinstance(limit, float) and limit.is_integer():
+            limit = int(limit)
+        if isinstance(limit, bool) or not isinstance(limit, int) or limit < 0:
+            raise QueryError(f"'limit' must be a non-negative integer: {limit!r}")
+        return limit
+
+    @staticmethod
+    def _literal(value):
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        if isinstance(value, (list, tuple, set)):
+            return tuple(sorted((Query._literal(v) for v in value), key=repr))
+        return value
+
+    @classmethod
+    def _filter(cls, spec) -> tuple:
+        if isinstance(spec, dict):
+            column, op, value = spec.get('column'), spec.get('op', '=='), spec.get('value')
+        elif isinstance(spec, (list, tuple)) and len(spec) == 3:
+            column, op, value = spec
+        else:
+            raise QueryError(f"A filter must be [column, op, value] or an object: {spec!r}")
+        cls._column(column)
+        if not isinstance(op, str) or op not in FILTER_OPS:
+            raise QueryError(f"Unknown filter op: {op!r}")
+        if op in ('in', 'between'):
+            if not isinstance(value, (list, tuple)):
+                raise QueryError(f"'{op}' needs a list value")
+            if op == 'between' and len(value) != 2:
+                raise QueryError("'between' needs [low, high]")
+            if not all(isinstance(v, SCALAR_TYPES) for v in value):
+                raise QueryError(f"'{op}' values must be numbers or strings: {value!r}")
+        elif not isinstance(value, SCALAR_TYPES):
+            raise QueryError(f"'{op}' needs a number or string value: {value!r}")
+        value = tuple(cls._literal(v) for v in value) if op == 'between' else cls._literal(value)
+        return column, op, value
+
+    @staticmethod
+    def _aggregation(spec) -> tuple:
+        if isinstance(spec, dict):
+            func, column, q, name = spec.get('func'), spec.get('column'), spec.get('q'), spec.get('as')
+        elif isinstance(spec, (list, tuple)) and 1 <= len(spec) <= 4:
+            func, column, q, name = (tuple(spec) + (None, None, None))[:4]
+        else:
+            raise QueryError(f"An aggregation must be [func, column, q, name] or an object: {spec!r}")
+        if not isinstance(func, str) or func not in AGGREGATIONS:
+            raise QueryError(f"Unknown aggregation: {func!r}")
+        if func != 'count' and column is None:
+            raise QueryError(f"'{func}' needs a column")
+        if column is not None:
+            Query._column(column)
+        if name is not None and not isinstance(name, str):
+            raise QueryError(f"Aggregation names must be strings: {name!r}")
+        if func == 'median':
+            func, q = 'quantile', 0.5
+        if func == 'quantile':
+            try:
+                q = float(q if q is not None else 0.5)
+            except (TypeError, ValueError):
+                raise QueryError(f"Quantile must be a number: {q!r}")
+            if not 0 <= q <= 1:
+                raise QueryError(f"Quantile must be between 0 and 1: {q}")
+            name = name or f"p{q * 100:g}_{column}"
+        else:
+            q = None
+            name = name or (f"{func}_{column}" if column else func)
+        return func, column, q, name
+
+    @property
+    def key(self) -> tuple:
+        return (self.dataset, self.filters, self.group_by, self.aggregations,
+                self.order_by, self.descending, self.limit)
+
+
+class QueryEngine:
+    """Runs structured queries over one generation of the in-memory datasets
+
+    Each distinct query is planned once: games queries whose filters,
+    groups and aggregations line up with the GamesCube are answered from
+    its cells, everything else is a vectorized mask + groupby over the
+    frame. Results are cached by normalized query; the engine belongs to a
+    single data version, so the caches never need invalidating.
+    """
+
+    def __init__(self, frames: Dict[str, Optional[pd.DataFrame]],
+                 cube: Optional[Callable[[], GamesCube]] = None, max_cached: int = 256):
+        self.frames = frames
+        self._cube = cube
+        self.max_cached = max_cached
+        self._plans = {}
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def execute(self, query) -> Dict:
+        """Run ``query`` (a Query or its dict form); returns rows as a list of dicts"""
+        if not isinstance(query, Query):
+            query = Query.from_dict(query)
+        key = query.key
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                return dict(copy.deepcopy(self._results[key]), cached=True)
+
+        plan = self._plan(query)
+        rows = self._run_cube(query, plan) if plan['engine'] == 'cube' else self._run_scan(query)
+        rows = self._order(query, rows)
+        result = {'dataset': query.dataset, 'engine': plan['engine'], 'rows': rows}
+
+        with self._lock:
+            self._results[key] = result
+            while len(self._results) > self.max_cached:
+                self._results.popitem(last=False)
+        return dict(copy.deepcopy(result), cached=False)
+
+    def scalar(self, query, name: Optional[str] = None):
+        """Single value of an ungrouped query (the first aggregation unless ``name`` is given)"""
+        if not isinstance(query, Query):
+            query = Query.from_dict(query)
+        rows = self.execute(query)['rows']
+        name = name or query.aggregations[0][3]
+        return rows[0][name] if rows else None
+
+    # Planning
+
+    def _plan(self, query: Query) -> Dict:
+        key = query.key
+        if key not in self._plans:
+            where = self._cube_where(query)
+            self._plans[key] = {'engine': 'cube', 'where': where} if where is not None else {'engine': 'scan'}
+        return self._plans[key]
+
+    def _cube_where(self, query: Query) -> Optional[Dict]:
+        """Cube filter equivalent to the query's filters, or None if the cube can't answer it"""
+        df = self.frames.get('games')
+        if query.dataset != 'games' or self._cube is None or df is None:
+            return None
+        label_columns = [column for column in _CUBE_LABEL_COLUMNS if column in df.columns
+                         and not pd.api.types.is_numeric_dtype(df[column])
+                         and not pd.api.types.is_bool_dtype(df[column])]
+        if len(query.group_by) > 1 or any(column not in label_columns for column in query.group_by):
+            return None
+        for func, column, _, _ in query.aggregations:
+            if func == 'quantile' or (column is not None and column not in MEASURES):
+                return None
+
+        where = {}
+        for column, op, value in query.filters:
+            if column in label_columns and op in ('==', 'in'):
+                values = {str(v) for v in value} if op == 'in' else {str(value)}
+            elif column == 'price_final':
+                values = self._price_buckets(op, value)
+                column = 'price_bucket'
+            elif column == 'positive_ratio':
+                values = self._ratio_bands(op, value)
+                column = 'ratio_band'
+            elif column == 'discount' and op == '>' and value == 0:
+                values, column = {True}, 'discounted'
+            else:
+                return None
+            if values is None:
+                return None
+            where[column] = where[column] & values if column in where else values
+        return {column: sorted(values, key=str) for column, values in where.items()}
+
+    @staticmethod
+    def _price_buckets(op: str, value) -> Optional[set]:
+        edges = {high for _, high in _PRICE_INTERVALS.values() if high is not None}
+        if op == '==' and value == 0:
+            return {'free'}
+        if op == '>' and value in edges:
+            return {b for b, (low, _) in _PRICE_INTERVALS.items() if low is not None and low >= value}
+        if op == '<=' and value in edges:
+            return {b for b, (_, high) in _PRICE_INTERVALS.items() if high is not None and high <= value}
+        return None
+
+    @staticmethod
+    def _ratio_bands(op: str, value) -> Optional[set]:
+        bounds = {'>=': lambda v: (v, 100), '>': lambda v: (v + 1, 100), '<=': lambda v: (0, v),
+                  '<': lambda v: (0, v - 1), '==': lambda v: (v, v), 'between': lambda v: v}
+        if op not in bounds:
+            return None
+        values = value if op == 'between' else (value,)
+        if not all(isinstance(v, int) for v in values):
+            return None
+        try:
+            return set(ratio_bands(*bounds[op](value)))
+        except ValueError:
+            return None
+
+    # Execution
+
+    def _run_cube(self, query: Query, plan: Dict) -> List[Dict]:
+        cube = self._cube()
+        where = plan['where']
+        if query.group_by:
+            dimension = query.group_by[0]
+            groups = [((dimension, value),) for value in cube.counts_by(dimension, **where)]
+        else:
+            groups = [()]
+
+        rows = []
+        for group in groups:
+            cell_where = dict(where, **dict(group))
+            row = dict(group)
+            for func, column, _, name in query.aggregations:
+                if column is None:
+                    row[name] = cube.count(**cell_where)
+                else:
+                    stats = cube.stats(column, **cell_where)
+                    row[name] = stats['count'] if func == 'count' else stats[func]
+            rows.append(row)
+        return rows
+
+    def _run_scan(self, query: Query) -> List[Dict]:
+        df = self.frames.get(query.dataset)
+        if df is None:
+            raise QueryError(f"Dataset not loaded: {query.dataset}")
+        for column in {c for c, _, _ in query.filters} | set(query.group_by) | \
+                {c for _, c, _, _ in query.aggregations if c is not None}:
+            if column not in df.columns:
+                raise QueryError(f"Unknown column for {query.dataset}: {column}")
+
+        mask = np.ones(len(df), dtype=bool)
+        for column, op, value in query.filters:
+            try:
+                mask &= self._filter_mask(df[column], op, value)
+            except TypeError as e:
+                raise QueryError(f"Cannot apply {column} {op} {value!r}: {e}")
+
+        columns = {}
+        for func, column, q, name in query.aggregations:
+            if column is not None and column not in columns:
+                values = df[column]
+                if pd.api.types.is_bool_dtype(values):
+                    values = values.astype('float64')
+                columns[column] = values[mask]
+            if func in NUMERIC_AGGREGATIONS and not pd.api.types.is_numeric_dtype(columns[column]):
+                raise QueryError(f"'{func}' needs a numeric column: {column}")
+        selected = pd.DataFrame(columns, index=df.index[mask])
+        for column in query.group_by:
+            selected[column] = df[column][mask]
+
+        if not query.group_by:
+            row = {}
+            for func, column, q, name in query.aggregations:
+                row[name] = self._aggregate(selected[column] if column else selected, func, q)
+            return [row]
+
+        grouped = selected.groupby(list(query.group_by), observed=True, sort=False, dropna=False)
+        table = pd.DataFrame(index=grouped.size().index)
+        for func, column, q, name in query.aggregations:
+            if column is None:
+                table[name] = grouped.size()
+            elif func == 'quantile':
+                table[name] = grouped[column].quantile(q)
+            else:
+                table[name] = getattr(grouped[column], func)()
+        table = table.reset_index()
+        return [{key: self._python(value) for key, value in record.items()}
+                for record in table.to_dict('records')]
+
+    @staticmethod
+    def _filter_mask(values: pd.Series, op: str, value) -> np.ndarray:
+        if op == 'in':
+            return values.isin(list(value)).to_numpy(dtype=bool)
+        if op == 'between':
+            return values.between(*value).fillna(False).to_numpy(dtype=bool)
+        compare = {'==': values.__eq__, '!=': values.__ne__, '<': values.__lt__,
+                   '<=': values.__le__, '>': values.__gt__, '>=': values.__ge__}[op]
+        return compare(value).fillna(False).to_numpy(dtype=bool)
+
+    def _aggregate(self, values, func: str, q: Optional[float]):
+        if isinstance(values, pd.DataFrame):
+            return len(values)
+        if func == 'quantile':
+            return self._python(values.quantile(q)) if values.notna().any() else None
+        if func in ('mean', 'min', 'max') and not values.notna().any():
+            return None
+        return self._python(getattr(values, func)())
+
+    @staticmethod
+    def _python(value):
+        if isinstance(value, np.generic):
+            value = value.item()
+        if isinstance(value, float) and math.isnan(value):
+            return None
+        return value
+
+    @staticmethod
+    def _order(query: Query, rows: List[Dict]) -> List[Dict]:
+        if query.order_by is not None:
+            present = [row for row in rows if row.get(query.order_by) is not None]
+            missing = [row for row in rows if row.get(query.order_by) is None]
+            rows = sorted(present, key=lambda row: row[query.order_by], reverse=query.descending) + missing
+        return rows[:query.limit] if query.limit is not None else rows
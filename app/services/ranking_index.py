@@ -0,0 +1,96 @@
+import logging
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Ranking keys -> games column (keys whose column is missing are skipped)
+RANKING_COLUMNS = {
+    'positive_ratio': 'positive_ratio',
+    'user_reviews': 'user_reviews',
+    'price': 'price_final',
+    'discount': 'discount',
+    'date_release': 'date_release',
+    # Popularity columns found in other Steam games exports
+    'positive_ratings': 'positive_ratings',
+    'recommendations': 'recommendations'
+}
+
+
+def _sort_values(series: pd.Series) -> np.ndarray:
+    """Column as float64 for sorting; dates become day numbers, unparseable values NaN"""
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return pd.to_numeric(series, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    dates = pd.to_datetime(series, errors='coerce')
+    values = dates.to_numpy(dtype='datetime64[ns]').astype('datetime64[D]')
+    return np.where(np.isnat(values), np.nan, values.astype('int64')).astype('float64')
+
+
+class RankingIndex:
+    """Row orders of a games frame, pre-sorted by each ranking key
+
+    A top-K query walks the pre-sorted positions and stops after K matches,
+    instead of sorting the frame. Ties keep frame order, so results equal
+    ``nlargest(k, column)`` / ``nsmallest(k, column)``; missing values are
+    never ranked. Built once per frame and read-only afterwards.
+    """
+
+    def __init__(self, values: Dict[str, np.ndarray], descending: Dict[str, np.ndarray]):
+        self._values = values
+        self._descending = descending
+        self._ascending = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, games_df: pd.DataFrame, keys: Optional[Iterable[str]] = None) -> 'RankingIndex':
+        started = time.time()
+        values, descending = {}, {}
+        for key in keys or RANKING_COLUMNS:
+            column = RANKING_COLUMNS.get(key, key)
+            if column not in games_df.columns:
+                continue
+            column_values = _sort_values(games_df[column])
+            order = np.argsort(-column_values, kind='stable')
+            # NaNs sort last; keep only the ranked part
+            values[key] = column_values
+            descending[key] = order[:int(np.count_nonzero(~np.isnan(column_values)))].astype('int32')
+        logger.info(f"🏁 Built ranking index for {list(descending)} over {len(games_df):,} games "
+                    f"in {time.time() - started:.3f}s")
+        return cls(values, descending)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._descending
+
+    def order(self, key: str, ascending: bool = False) -> np.ndarray:
+        """Row positions ranked by ``key`` (missing values excluded)"""
+        if not ascending:
+            return self._descending[key]
+        if key not in self._ascending:
+            values = self._values[key]
+            order = np.argsort(values, kind='stable')
+            order = order[:len(self._descending[key])].astype('int32')
+            with self._lock:
+                self._ascending.setdefault(key, order)
+        return self._ascending[key]
+
+    def top(self, key: str, k: int, mask: Optional[np.ndarray] = None, ascending: bool = False) -> np.ndarray:
+        """Positions of the first ``k`` rows by ``key`` among rows where ``mask`` is True"""
+        order = self.order(key, ascending)
+        if mask is None:
+            return order[:k]
+
+        found = []
+        remaining = k
+        block = max(4 * k, 1024)
+        for start in range(0, len(order), block):
+            positions = order[start:start + block]
+            positions = positions[mask[positions]]
+            found.append(positions[:remaining])
+            remaining -= len(found[-1])
+            if remaining <= 0:
+                break
+        return np.concatenate(found) if found else order[:0]
@@ -4,6 +4,7 @@ from typing import Dict, List, Tuple, Optional
 import google.generativeai as genai
 from datetime import datetime, timedelta
 import glob
+from app.services.dataset_registry import get_registry
 
 class RealDataAnalyzer:
     def __init__(self):
@@ -38,37 +39,16 @@ class RealDataAnalyzer:
             self.use_ai = False
 
     def _load_csv_files(self):
-        """Flexible CSV file loading"""
-        loaded_files = {
-            'games': None,
-            'users': None, 
-            'recommendations': None
-        }
+        """Fetch the games, users and recommendations frames from the shared dataset registry"""
+        registry = get_registry()
+        loaded_files = {}
         
-        # Load games.csv
-        if os.path.exists('games.csv'):
+        for name in ('games', 'users', 'recommendations'):
             try:
-                loaded_files['games'] = pd.read_csv('games.csv')
+                loaded_files[name] = registry.get(name)
             except Exception as e:
-                print(f"❌ Failed to load games.csv: {e}")
-        
-        # Load recommendations.csv
-        if os.path.exists('recommendations.csv'):
-            try:
-                loaded_files['recommendations'] = pd.read_csv('recommendations.csv')
-            except Exception as e:
-                print(f"❌ Failed to load recommendations.csv: {e}")
-        
-        # Try to load users.csv
-        user_attempts = ['users.csv', 'recommendations copy.csv']
-        for attempt in user_attempts:
-            if os.path.exists(attempt):
-                try:
-                    loaded_files['users'] = pd.read_csv(attempt)
-                    break
-                except Exception as e:
-                    print(f"❌ Failed to load {attempt}: {e}")
-                    continue
+                print(f"❌ Failed to load {name}.csv: {e}")
+                loaded_files[name] = None
         
         # If no games data, we can't proceed
         if loaded_files['games'] is None:
@@ -1,20 +1,121 @@
 import pandas as pd
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
+from scipy import sparse
 from sklearn.feature_extraction.text import TfidfVectorizer
 from app.models import db
 from app.models.game import Game
+from app.services.ann_index import IVFFlatIndex, exact_search
+from config import Config
+import hashlib
+import json
 import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from types import MappingProxyType
+
+# Neighbours kept per game, and rows scored per block while building
+SIMILARITY_TOP_K = 50
+SIMILARITY_BLOCK_SIZE = 256
+# Bump when the on-disk model layout changes; older artifacts are then rebuilt
+MODEL_FORMAT = 2
+# Artifacts kept in the model directory after a build (workers may still map the previous one)
+MODEL_ARTIFACTS_KEPT = 2
+MODEL_ARRAYS = ('indptr', 'indices', 'data', 'idf', 'features_indptr', 'features_indices', 'features_data')
+VECTORIZER_PARAMS = {'stop_words': 'english', 'max_features': 1000, 'dtype': np.float32}
+
+def games_table_version():
+    """Stamp of the games table contents: row count, highest id and latest update"""
+    count, max_id, updated_at = db.session.query(
+        db.func.count(Game.id), db.func.max(Game.id), db.func.max(Game.updated_at)).one()
+    return f"{count}:{max_id or 0}:{updated_at.isoformat() if updated_at else ''}"
+
+def model_artifact_path(directory, data_version):
+    """Directory holding the model built from ``data_version`` of the games table"""
+    digest = hashlib.sha1(data_version.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(directory, f"recommender-v{MODEL_FORMAT}-{digest}")
+
+def top_k_similarities(features, k=SIMILARITY_TOP_K, block_size=SIMILARITY_BLOCK_SIZE):
+    """Top-``k`` cosine neighbours of every row of L2-normalised ``features`` as a CSR matrix
+
+    Rows are scored ``block_size`` at a time against all rows, so peak memory
+    is one dense block_size x N block instead of the N x N matrix. Each row
+    keeps its ``k`` best positive scores (never itself), sorted best first.
+    """
+    features = sparse.csr_matrix(features, dtype=np.float32)
+    n = features.shape[0]
+    k = max(0, min(k, n - 1))
+    transposed = features.T.tocsc()
+    indptr = [0]
+    indices, data = [], []
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        scores = (features[start:stop] @ transposed).toarray()
+        rows = np.arange(stop - start)
+        scores[rows, start + rows] = -np.inf
+        if k == 0:
+            top = np.zeros((stop - start, 0), dtype=np.int64)
+        else:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        # Best first; ties by index so the order is deterministic
+        order = np.lexsort((top, -top_scores), axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+        for row_top, row_scores in zip(top, top_scores):
+            keep = row_scores > 0
+            indices.append(row_top[keep])
+            data.append(row_scores[keep])
+            indptr.append(indptr[-1] + int(keep.sum()))
+    return sparse.csr_matrix(
+        (np.concatenate(data) if data else np.zeros(0, dtype=np.float32),
+         np.concatenate(indices) if indices else np.zeros(0, dtype=np.int64),
+         np.asarray(indptr)),
+        shape=(n, n)
+    )
+
+# One fitted model, swapped in whole so readers never mix two builds:
+# CSR neighbours (row i = game i's top_k, best first), read-only game dicts, game id -> row,
+# the fitted TF-IDF vectorizer, each game's L2-normalised TF-IDF row and the games table version
+SimilarityModel = namedtuple('SimilarityModel', ['matrix', 'games', 'rows', 'vectorizer', 'features', 'data_version'])
 
 class Recommender:
-    def __init__(self):
+    def __init__(self, top_k=SIMILARITY_TOP_K, block_size=SIMILARITY_BLOCK_SIZE, model_dir=None,
+                 version_check_seconds=None):
         self.logger = logging.getLogger(__name__)
-        self.similarity_matrix = None
-        self.game_features = None
+        self.top_k = top_k
+        self.block_size = block_size
+        self.model_dir = model_dir if model_dir is not None else Config.RECOMMENDER_MODEL_DIR
+        self.version_check_seconds = (version_check_seconds if version_check_seconds is not None
+                                      else Config.RECOMMENDER_VERSION_CHECK_SECONDS)
+        self.model = None
+        self._checked_at = 0.0
+        self._refresh_lock = threading.Lock()
+        # (model, IVFFlatIndex over its features), built on the first large-catalog query
+        self._ann = None
+        self._ann_lock = threading.Lock()
+    
+    @property
+    def similarity_matrix(self):
+        return self.model.matrix if self.model is not None else None
+    
+    @property
+    def game_features(self):
+        return self.model.games if self.model is not None else None
     
-    def build_recommendation_model(self):
+    @property
+    def data_version(self):
+        return self.model.data_version if self.model is not None else None
+    
+    def build_recommendation_model(self, data_version=None):
         """Build game recommendation model"""
         try:
+            # Stamp before reading so a concurrent edit makes the stamp stale, not the model
+            if data_version is None:
+                data_version = games_table_version()
             games = Game.query.all()
             
             if not games:
@@ -33,14 +134,7 @@ class Recommender:
                     'price': game.price or 0
                 })
             
-            # Create TF-IDF matrix for text features
-            vectorizer = TfidfVectorizer(stop_words='english', max_features=1000)
-            tfidf_matrix = vectorizer.fit_transform([g['features'] for g in game_data])
-            
-            # Calculate similarity matrix
-            self.similarity_matrix = cosine_similarity(tfidf_matrix, tfidf_matrix)
-            self.game_features = game_data
-            
+            self.fit(game_data, data_version)
             self.logger.info(f"Built recommendation model for {len(games)} games")
             return True
             
@@ -48,40 +142,231 @@ class Recommender:
             self.logger.error(f"Error building recommendation model: {e}")
             return False
     
-    def get_similar_games(self, game_id, top_n=5):
-        """Get similar games based on content"""
-        if self.similarity_matrix is None:
-            if not self.build_recommendation_model():
-                return []
+    def fit(self, game_data, data_version=None):
+        """Build the top-K similarity model from game dicts with a 'features' text"""
+        # TF-IDF rows are L2-normalised, so cosine similarity is a dot product
+        vectorizer = TfidfVectorizer(**VECTORIZER_PARAMS)
+        tfidf_matrix = vectorizer.fit_transform([g['features'] for g in game_data])
         
+        matrix = top_k_similarities(tfidf_matrix, self.top_k, self.block_size)
+        self.model = self._model(matrix, game_data, vectorizer, sparse.csr_matrix(tfidf_matrix), data_version)
+    
+    @staticmethod
+    def _model(matrix, game_data, vectorizer, features, data_version):
+        games = tuple(MappingProxyType(dict(g)) for g in game_data)
+        rows = {}
+        for idx, game in enumerate(games):
+            rows.setdefault(game['id'], idx)
+        return SimilarityModel(matrix, games, rows, vectorizer, features, data_version)
+    
+    def save(self, directory=None):
+        """Write the fitted model to a versioned artifact directory and return its path
+        
+        The neighbour CSR and the IDF weights are plain .npy files (so loaders
+        can memory-map them); vocabulary, games and the data version go in
+        manifest.json. The directory is assembled under a temporary name and
+        renamed into place, so readers never see a partial artifact.
+        """
+        model = self.model
+        if model is None:
+            raise ValueError("No recommendation model to save")
+        directory = directory or self.model_dir
+        path = model_artifact_path(directory, model.data_version or '')
+        os.makedirs(directory, exist_ok=True)
+        
+        staging = tempfile.mkdtemp(prefix='.recommender-', dir=directory)
         try:
-            # Find game index
-            game_idx = None
-            for idx, game in enumerate(self.game_features):
-                if game['id'] == game_id:
-                    game_idx = idx
-                    break
+            arrays = {'indptr': model.matrix.indptr, 'indices': model.matrix.indices,
+                      'data': model.matrix.data, 'idf': model.vectorizer.idf_.astype(np.float32),
+                      'features_indptr': model.features.indptr, 'features_indices': model.features.indices,
+                      'features_data': model.features.data}
+            for name, values in arrays.items():
+                np.save(os.path.join(staging, f"{name}.npy"), np.ascontiguousarray(values))
+            with open(os.path.join(staging, 'manifest.json'), 'w', encoding='utf-8') as f:
+                json.dump({
+                    'format': MODEL_FORMAT,
+                    'data_version': model.data_version,
+                    'top_k': self.top_k,
+                    'built_at': time.time(),
+                    'shape': list(model.matrix.shape),
+                    'vocabulary': model.vectorizer.get_feature_names_out().tolist(),
+                    'games': [dict(game) for game in model.games]
+                }, f)
+            if os.path.isdir(path):
+                shutil.rmtree(path)  # same data version rebuilt, e.g. a forced build
+            os.rename(staging, path)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        
+        self._prune_artifacts(directory, keep=path)
+        self.logger.info(f"💾 Saved recommendation model ({len(model.games):,} games) to {path}")
+        return path
+    
+    def load(self, path, mmap=True):
+        """Load a saved artifact (arrays memory-mapped read-only by default); False if unusable"""
+        try:
+            with open(os.path.join(path, 'manifest.json'), encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('format') != MODEL_FORMAT or manifest.get('top_k') != self.top_k:
+                self.logger.info(f"Recommendation model at {path} was built with other settings")
+                return False
+            arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r' if mmap else None)
+                      for name in MODEL_ARRAYS}
             
+            matrix = sparse.csr_matrix((arrays['data'], arrays['indices'], arrays['indptr']),
+                                       shape=tuple(manifest['shape']), copy=False)
+            vectorizer = TfidfVectorizer(**VECTORIZER_PARAMS)
+            vectorizer.vocabulary_ = {term: idx for idx, term in enumerate(manifest['vocabulary'])}
+            vectorizer.idf_ = np.asarray(arrays['idf'])
+            features = sparse.csr_matrix(
+                (arrays['features_data'], arrays['features_indices'], arrays['features_indptr']),
+                shape=(len(manifest['games']), len(manifest['vocabulary'])), copy=False)
+            self.model = self._model(matrix, manifest['games'], vectorizer, features, manifest['data_version'])
+            self.logger.info(f"⚡ Loaded recommendation model ({len(manifest['games']):,} games) from {path}")
+            return True
+        except (OSError, ValueError, KeyError) as e:
+            self.logger.warning(f"⚠️ Could not load recommendation model from {path}: {e}")
+            return False
+    
+    def load_or_build(self, force=False):
+        """Make the model match the current games table: keep it, load its artifact, or build and save one
+        
+        Returns the artifact path in use, or None when no model could be made.
+        """
+        with self._refresh_lock:
+            self._checked_at = time.time()
+            data_version = games_table_version()
+            path = model_artifact_path(self.model_dir, data_version)
+            if not force and self.data_version == data_version:
+                return path
+            if not force and os.path.isdir(path) and self.load(path):
+                return path
+            if not self.build_recommendation_model(data_version):
+                return None
+            try:
+                return self.save()
+            except OSError as e:
+                self.logger.warning(f"⚠️ Could not save recommendation model: {e}")
+                return None
+    
+    def _prune_artifacts(self, directory, keep):
+        artifacts = sorted((os.path.join(directory, name) for name in os.listdir(directory)
+                            if name.startswith('recommender-')),
+                           key=os.path.getmtime, reverse=True)
+        stale = [path for path in artifacts if path != keep][MODEL_ARTIFACTS_KEPT - 1:]
+        for path in stale:
+            shutil.rmtree(path, ignore_errors=True)
+    
+    def _ready_model(self):
+        """The current model, re-checking the games table version at most every version_check_seconds"""
+        model = self.model
+        # A model fitted directly (no data version) isn't tied to the games table
+        if model is None or (model.data_version is not None
+                             and time.time() - self._checked_at >= self.version_check_seconds):
+            try:
+                self.load_or_build()
+            except Exception as e:
+                self.logger.error(f"Error refreshing recommendation model: {e}")
+        return self.model
+    
+    def get_similar_games(self, game_id, top_n=5):
+        """Get similar games based on content (fresh dicts per call, best first)"""
+        model = self._ready_model()
+        if model is None:
+            return []
+        
+        try:
+            game_idx = model.rows.get(game_id)
             if game_idx is None:
                 return []
             
-            # Get similarity scores
-            similarity_scores = list(enumerate(self.similarity_matrix[game_idx]))
-            
-            # Sort by similarity score
-            similarity_scores = sorted(similarity_scores, key=lambda x: x[1], reverse=True)
+            # Stored neighbours are already sorted and exclude the game itself
+            start, end = model.matrix.indptr[game_idx:game_idx + 2]
+            end = min(end, start + max(top_n, 0))
+            return [dict(model.games[idx], similarity_score=float(score))
+                    for idx, score in zip(model.matrix.indices[start:end], model.matrix.data[start:end])]
             
-            # Get top N similar games (excluding the game itself)
-            similar_games = []
-            for idx, score in similarity_scores[1:top_n+1]:
-                similar_game = self.game_features[idx]
-                similar_game['similarity_score'] = float(score)
-                similar_games.append(similar_game)
+        except Exception as e:
+            self.logger.error(f"Error getting similar games: {e}")
+            return []
+    
+    def get_similar_games_batch(self, game_ids, top_n=5):
+        """Neighbours for many games at once: {game_id: [similar game dicts]} ([] for unknown ids)"""
+        model = self._ready_model()
+        game_ids = list(game_ids)
+        if model is None:
+            return {game_id: [] for game_id in game_ids}
+        
+        try:
+            rows = np.array([model.rows.get(game_id, -1) for game_id in game_ids], dtype=np.int64)
+            known = rows >= 0
+            starts = np.where(known, model.matrix.indptr[np.maximum(rows, 0)], 0)
+            counts = np.where(known, np.minimum(model.matrix.indptr[np.maximum(rows, 0) + 1] - starts,
+                                                max(top_n, 0)), 0)
+            # Gather every requested neighbour slice with one fancy index
+            offsets = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+            neighbours = model.matrix.indices[offsets].tolist()
+            scores = model.matrix.data[offsets].tolist()
             
-            return similar_games
+            results, position = {}, 0
+            for game_id, count in zip(game_ids, counts.tolist()):
+                results[game_id] = [dict(model.games[idx], similarity_score=score)
+                                    for idx, score in zip(neighbours[position:position + count],
+                                                          scores[position:position + count])]
+                position += count
+            return results
             
         except Exception as e:
             self.logger.error(f"Error getting similar games: {e}")
+            return {game_id: [] for game_id in game_ids}
+    
+    def ann_index(self, model=None):
+        """IVF-flat index over the model's game features (built once per model)"""
+        model = model or self._ready_model()
+        if model is None:
+            return None
+        ann = self._ann
+        if ann is None or ann[0] is not model:
+            with self._ann_lock:
+                ann = self._ann
+                if ann is None or ann[0] is not model:
+                    ann = (model, IVFFlatIndex.build(model.features, n_probe=Config.RECOMMENDER_ANN_PROBES))
+                    self._ann = ann
+        return ann[1]
+    
+    def more_like_this(self, text=None, game_ids=(), top_n=10, n_probe=None):
+        """Games whose features best match free ``text`` and/or the given games (which are left out)
+        
+        Catalogs of at least RECOMMENDER_ANN_MIN_GAMES (when set) are searched
+        through the IVF-flat index (``n_probe`` lists, more = better recall);
+        otherwise exactly.
+        """
+        model = self._ready_model()
+        if model is None:
+            return []
+        
+        try:
+            rows = [model.rows[game_id] for game_id in game_ids if game_id in model.rows]
+            parts = [model.features[rows].sum(axis=0)] if rows else []
+            if text:
+                parts.append(model.vectorizer.transform([text]).toarray())
+            if not parts:
+                return []
+            query = np.asarray(sum(parts), dtype=np.float32).ravel()
+            if not query.any():
+                return []
+            
+            ann_min_games = Config.RECOMMENDER_ANN_MIN_GAMES
+            if ann_min_games and len(model.games) >= ann_min_games:
+                found, scores = self.ann_index(model).search(query, top_n, n_probe, exclude=rows)
+            else:
+                found, scores = exact_search(model.features, query, top_n, exclude=rows)
+            return [dict(model.games[idx], similarity_score=float(score))
+                    for idx, score in zip(found.tolist(), scores.tolist()) if score > 0]
+            
+        except Exception as e:
+            self.logger.error(f"Error finding similar games: {e}")
             return []
     
     def get_popular_recommendations(self, top_n=10):
@@ -111,12 +396,53 @@ class Recommender:
             return []
     
     def get_personalized_recommendations(self, user_preferences, top_n=5):
-        """Get personalized recommendations based on user preferences"""
+        """Get personalized recommendations based on user preferences
+        
+        A Steam ``user_id`` from the review log or a list of liked ``app_ids``
+        goes through the item-item collaborative model; popular games are
+        the fallback while it builds or when neither is known.
+        """
         try:
-            # This would integrate with user data in a real application
-            # For now, return popular recommendations
+            from app.services.collaborative import get_collaborative_model
+            preferences = user_preferences if isinstance(user_preferences, dict) else {}
+            model = get_collaborative_model()
+            scored = []
+            if model is not None:
+                if preferences.get('user_id') is not None:
+                    scored = model.recommend_for_user(preferences['user_id'], top_n)
+                if not scored and preferences.get('app_ids'):
+                    scored = model.recommend_for_games(preferences['app_ids'], top_n)
+            
+            if scored:
+                games = {game.steam_appid: game for game in
+                         Game.query.filter(Game.steam_appid.in_([app_id for app_id, _ in scored])).all()}
+                recommendations = [{
+                    'id': games[app_id].id,
+                    'name': games[app_id].name,
+                    'developer': games[app_id].developer,
+                    'rating': games[app_id].rating,
+                    'price': games[app_id].price,
+                    'score': round(score, 4),
+                    'reason': 'Liked by players with similar taste'
+                } for app_id, score in scored if app_id in games]
+                if recommendations:
+                    return recommendations
+            
             return self.get_popular_recommendations(top_n)
             
         except Exception as e:
             self.logger.error(f"Error getting personalized recommendations: {e}")
-            return []
\ No newline at end of file
+            return []
+
+_recommender = None
+_recommender_lock = threading.Lock()
+
+
+def get_recommender():
+    """The process-wide recommender, sharing one loaded model artifact"""
+    global _recommender
+    if _recommender is None:
+        with _recommender_lock:
+            if _recommender is None:
+                _recommender = Recommender()
+    return _recommender
@@ -0,0 +1,74 @@
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ReloadSuperseded(Exception):
+    """A reload whose result lost to a newer generation and was never published"""
+
+
+class ReloadJobManager:
+    """Runs dataset reloads on a background thread and tracks them by job id
+
+    Jobs run one at a time. Submitting while a job of the same kind is still
+    queued returns that job instead of stacking up identical reloads.
+    """
+
+    def __init__(self, max_history: int = 20):
+        self.max_history = max_history
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='dataset-reload')
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, task: Callable[[], Optional[Dict]], kind: str = 'reload') -> Dict:
+        """Queue ``task``; its return value is stored as the job result"""
+        with self._lock:
+            for job in self._jobs.values():
+                if job['status'] == 'queued' and job['kind'] == kind:
+                    return dict(job)
+
+            job_id = uuid.uuid4().hex
+            self._jobs[job_id] = {
+                'job_id': job_id,
+                'kind': kind,
+                'status': 'queued',
+                'submitted_at': datetime.now().isoformat(),
+                'started_at': None,
+                'finished_at': None,
+                'result': None,
+                'error': None
+            }
+            while len(self._jobs) > self.max_history:
+                self._jobs.popitem(last=False)
+            job = dict(self._jobs[job_id])
+
+        self._executor.submit(self._run, job_id, task)
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def _update(self, job_id: str, **fields):
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(fields)
+
+    def _run(self, job_id: str, task: Callable[[], Optional[Dict]]):
+        self._update(job_id, status='running', started_at=datetime.now().isoformat())
+        try:
+            result = task()
+            self._update(job_id, status='completed', result=result, finished_at=datetime.now().isoformat())
+        except ReloadSuperseded as e:
+            logger.warning(f"⚠️ Reload job {job_id} superseded: {e}")
+            self._update(job_id, status='superseded', error=str(e), finished_at=datetime.now().isoformat())
+        except Exception as e:
+            logger.error(f"❌ Reload job {job_id} failed: {e}")
+            self._update(job_id, status='failed', error=str(e), finished_at=datetime.now().isoformat())
@@ -0,0 +1,510 @@
+import base64
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+import zlib
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.services.activity_index import MISSING_DAY, DailyActivity, day_numbers, month_ordinals
+from app.services.dataset_schema import RECOMMENDATIONS_SCHEMA, schema_read_kwargs
+from app.services.review_time_index import MEASURES, app_day_totals, empty_app_days, merge_app_days
+from app.services.sketches import ReviewSketches
+
+logger = logging.getLogger(__name__)
+
+REVIEW_COLUMNS = ['app_id', 'date', 'is_recommended', 'hours']
+# Also read when the aggregate keeps sketches (distinct reviewers, most active reviewers)
+SKETCH_COLUMNS = ['user_id']
+
+# Same thresholds as SteamDataAnalyzer._get_engagement_patterns
+PLAYTIME_BUCKETS = {
+    'casual_players': (None, 10),
+    'regular_players': (10, 50),
+    'hardcore_players': (50, None)
+}
+HEAVY_PLAYER_HOURS = 100
+
+
+class ReviewAggregate:
+    """Compact, mergeable summary of recommendations.csv
+
+    Holds everything analyze_user_behavior and get_real_time_metrics need
+    (daily and monthly activity, recommend ratio, hours mean, playtime buckets and
+    per-game review counts, hours and first/last review day), so the full review log can be streamed once in
+    bounded memory instead of being held as a DataFrame. Review measures per
+    (app_id, day) are kept too, for the date-range queries of ReviewTimeIndex. With ``sketches``
+    it also keeps fixed-size ReviewSketches (distinct counts, playtime
+    quantiles, heavy hitters) built in the same pass.
+    """
+
+    def __init__(self, sketches: bool = False):
+        self.total_rows = 0
+        self.recommended = 0
+        self.recommend_known = 0
+        self.hours_sum = 0.0
+        self.hours_count = 0
+        self.hours_min = None
+        self.hours_max = None
+        self.heavy_players = 0
+        self.playtime_buckets = {name: 0 for name in PLAYTIME_BUCKETS}
+        # Month ordinal (year * 12 + month - 1) -> review count
+        self.monthly_counts = {}
+        # Day number (days since 1970-01-01) -> review count
+        self.daily_counts = {}
+        # app_id -> review count / recommending review count
+        self.game_reviews = {}
+        self.game_recommended = {}
+        # app_id -> hours total / reviews with hours / first and last review day number
+        self.game_hours_sum = {}
+        self.game_hours_count = {}
+        self.game_first_day = {}
+        self.game_last_day = {}
+        # (app_id, day) -> MEASURES totals; chunk totals wait in _pending until folded in
+        self._game_days = empty_app_days()
+        self._pending = []
+        self.sketches = ReviewSketches() if sketches else None
+
+    def update(self, chunk: pd.DataFrame):
+        """Fold one chunk of recommendations rows into the aggregate"""
+        self.total_rows += len(chunk)
+
+        if 'is_recommended' in chunk.columns:
+            recommended = chunk['is_recommended'].dropna().astype(bool)
+            self.recommended += int(recommended.sum())
+            self.recommend_known += len(recommended)
+
+        if 'hours' in chunk.columns:
+            hours = pd.to_numeric(chunk['hours'], errors='coerce').dropna().to_numpy()
+            if len(hours) > 0:
+                self.hours_sum += float(hours.sum())
+                self.hours_count += len(hours)
+                chunk_min, chunk_max = float(hours.min()), float(hours.max())
+                self.hours_min = chunk_min if self.hours_min is None else min(self.hours_min, chunk_min)
+                self.hours_max = chunk_max if self.hours_max is None else max(self.hours_max, chunk_max)
+                self.heavy_players += int((hours > HEAVY_PLAYER_HOURS).sum())
+                for name, (low, high) in PLAYTIME_BUCKETS.items():
+                    mask = np.ones(len(hours), dtype=bool)
+                    if low is not None:
+                        mask &= hours > low
+                    if high is not None:
+                        mask &= hours <= high
+                    self.playtime_buckets[name] += int(mask.sum())
+
+        chunk_days = day_numbers(chunk['date']) if 'date' in chunk.columns else None
+        if chunk_days is not None:
+            days = chunk_days[chunk_days != MISSING_DAY]
+            if len(days) > 0:
+                daily = DailyActivity.from_days(days)
+                for offset in np.flatnonzero(daily.counts).tolist():
+                    day = daily.first_day + offset
+                    self.daily_counts[day] = self.daily_counts.get(day, 0) + int(daily.counts[offset])
+                values, counts = np.unique(month_ordinals(days), return_counts=True)
+                for month, count in zip(values.tolist(), counts.tolist()):
+                    self.monthly_counts[month] = self.monthly_counts.get(month, 0) + count
+
+        if 'app_id' in chunk.columns and chunk_days is not None:
+            self._add_game_days(app_day_totals(chunk, chunk_days))
+
+        if 'app_id' in chunk.columns:
+            recommended = (chunk['is_recommended'].fillna(False).astype(bool)
+                           if 'is_recommended' in chunk.columns else False)
+            games = pd.DataFrame({
+                'app_id': pd.to_numeric(chunk['app_id'], errors='coerce'),
+                'recommended': recommended,
+                'hours': (pd.to_numeric(chunk['hours'], errors='coerce')
+                          if 'hours' in chunk.columns else np.nan),
+                'day': (pd.Series(chunk_days, index=chunk.index).replace(MISSING_DAY, np.nan)
+                        if chunk_days is not None else np.nan)
+            }).dropna(subset=['app_id'])
+            per_game = games.groupby(games['app_id'].astype('int64')).agg(
+                reviews=('recommended', 'size'), recommended=('recommended', 'sum'),
+                hours_sum=('hours', 'sum'), hours_count=('hours', 'count'),
+                first_day=('day', 'min'), last_day=('day', 'max')
+            )
+            for app_id, reviews, recommended, hours_sum, hours_count, first_day, last_day in zip(
+                    per_game.index.tolist(), *(per_game[col].tolist() for col in per_game.columns)):
+                self.game_reviews[app_id] = self.game_reviews.get(app_id, 0) + int(reviews)
+                self.game_recommended[app_id] = self.game_recommended.get(app_id, 0) + int(recommended)
+                if hours_count:
+                    self.game_hours_sum[app_id] = self.game_hours_sum.get(app_id, 0.0) + float(hours_sum)
+                    self.game_hours_count[app_id] = self.game_hours_count.get(app_id, 0) + int(hours_count)
+                if pd.notna(first_day):
+                    self._game_day_range(app_id, int(first_day), int(last_day))
+
+        if self.sketches is not None:
+            self.sketches.update(chunk)
+
+        return self
+
+    def merge(self, other: 'ReviewAggregate'):
+        """Merge another aggregate (e.g. from a different chunk or process)"""
+        # Sketches are only kept while they cover every merged row
+        if other.sketches is None:
+            if other.total_rows:
+                self.sketches = None
+        elif self.sketches is not None:
+            self.sketches.merge(other.sketches)
+        elif not self.total_rows:
+            self.sketches = other.sketches.copy()
+        self.total_rows += other.total_rows
+        self.recommended += other.recommended
+        self.recommend_known += other.recommend_known
+        self.hours_sum += other.hours_sum
+        self.hours_count += other.hours_count
+        if other.hours_min is not None:
+            self.hours_min = other.hours_min if self.hours_min is None else min(self.hours_min, other.hours_min)
+            self.hours_max = other.hours_max if self.hours_max is None else max(self.hours_max, other.hours_max)
+        self.heavy_players += other.heavy_players
+        for name, count in other.playtime_buckets.items():
+            self.playtime_buckets[name] = self.playtime_buckets.get(name, 0) + count
+        for month, count in other.monthly_counts.items():
+            self.monthly_counts[month] = self.monthly_counts.get(month, 0) + count
+        for day, count in other.daily_counts.items():
+            self.daily_counts[day] = self.daily_counts.get(day, 0) + count
+        for app_id, count in other.game_reviews.items():
+            self.game_reviews[app_id] = self.game_reviews.get(app_id, 0) + count
+        for app_id, count in other.game_recommended.items():
+            self.game_recommended[app_id] = self.game_recommended.get(app_id, 0) + count
+        for app_id, hours in other.game_hours_sum.items():
+            self.game_hours_sum[app_id] = self.game_hours_sum.get(app_id, 0.0) + hours
+        for app_id, count in other.game_hours_count.items():
+            self.game_hours_count[app_id] = self.game_hours_count.get(app_id, 0) + count
+        for app_id, first_day in other.game_first_day.items():
+            self._game_day_range(app_id, first_day, other.game_last_day[app_id])
+        self._add_game_days(other.game_day_totals())
+        return self
+
+    def _add_game_days(self, totals: pd.DataFrame):
+        if len(totals):
+            self._pending.append(totals)
+        # Fold pending chunks in once they outgrow the table, so merging stays amortised linear
+        if sum(len(t) for t in self._pending) > len(self._game_days):
+            self.game_day_totals()
+
+    def game_day_totals(self) -> pd.DataFrame:
+        """MEASURES summed per (app_id, day), sorted by app_id then day"""
+        if self._pending:
+            self._game_days = merge_app_days(self._game_days, *self._pending).sort_index()
+            self._pending = []
+        return self._game_days
+
+    def _game_day_range(self, app_id: int, first_day: int, last_day: int):
+        if app_id in self.game_first_day:
+            first_day = min(first_day, self.game_first_day[app_id])
+            last_day = max(last_day, self.game_last_day[app_id])
+        self.game_first_day[app_id] = first_day
+        self.game_last_day[app_id] = last_day
+
+    def copy(self) -> 'ReviewAggregate':
+        """Independent copy, so a published aggregate is never updated in place"""
+        return ReviewAggregate().merge(self)
+
+    @property
+    def hours_mean(self) -> Optional[float]:
+        return self.hours_sum / self.hours_count if self.hours_count else None
+
+    @property
+    def positive_rate(self) -> Optional[float]:
+        """Percentage of reviews that recommend the game"""
+        return self.recommended / self.recommend_known * 100 if self.recommend_known else None
+
+    def monthly_activity(self) -> pd.Series:
+        """Reviews per calendar month, equivalent to resample('ME').size()"""
+        if not self.monthly_counts:
+            return pd.Series(dtype='int64')
+        first, last = min(self.monthly_counts), max(self.monthly_counts)
+        ordinals = range(first, last + 1)
+        index = pd.DatetimeIndex([
+            pd.Timestamp(year=m // 12, month=m % 12 + 1, day=1) + pd.offsets.MonthEnd(0)
+            for m in ordinals
+        ])
+        return pd.Series([self.monthly_counts.get(m, 0) for m in ordinals], index=index, dtype='int64')
+
+    def daily_activity(self) -> DailyActivity:
+        """Reviews per day, for weekly and day-of-week roll-ups"""
+        return DailyActivity.from_counts(self.daily_counts)
+
+    def game_review_counts(self) -> pd.DataFrame:
+        """Reviews and recommending reviews per app_id"""
+        app_ids = sorted(self.game_reviews)
+        return pd.DataFrame({
+            'reviews': [self.game_reviews[a] for a in app_ids],
+            'recommended': [self.game_recommended.get(a, 0) for a in app_ids]
+        }, index=pd.Index(app_ids, name='app_id'), dtype='int64')
+
+    def game_review_totals(self) -> pd.DataFrame:
+        """Per app_id: reviews, recommended, hours_sum, hours_count, first_day, last_day (NaN if unknown)"""
+        counts = self.game_review_counts()
+        app_ids = counts.index
+        totals = counts.astype('float64')
+        for column, values in (('hours_sum', self.game_hours_sum), ('hours_count', self.game_hours_count),
+                               ('first_day', self.game_first_day), ('last_day', self.game_last_day)):
+            totals[column] = pd.Series(values, dtype='float64').reindex(app_ids).to_numpy()
+        totals['hours_count'] = totals['hours_count'].fillna(0)
+        totals['hours_sum'] = totals['hours_sum'].fillna(0)
+        return totals
+
+    def to_dict(self) -> Dict:
+        return {
+            'total_rows': self.total_rows,
+            'recommended': self.recommended,
+            'recommend_known': self.recommend_known,
+            'hours_sum': self.hours_sum,
+            'hours_count': self.hours_count,
+            'hours_min': self.hours_min,
+            'hours_max': self.hours_max,
+            'heavy_players': self.heavy_players,
+            'playtime_buckets': dict(self.playtime_buckets),
+            'monthly_counts': {str(k): v for k, v in self.monthly_counts.items()},
+            'daily_counts': {str(k): v for k, v in self.daily_counts.items()},
+            'game_reviews': {str(k): v for k, v in self.game_reviews.items()},
+            'game_recommended': {str(k): v for k, v in self.game_recommended.items()},
+            'game_hours_sum': {str(k): v for k, v in self.game_hours_sum.items()},
+            'game_hours_count': {str(k): v for k, v in self.game_hours_count.items()},
+            'game_first_day': {str(k): v for k, v in self.game_first_day.items()},
+            'game_last_day': {str(k): v for k, v in self.game_last_day.items()},
+            'game_days': _encode_app_days(self.game_day_totals()),
+            'sketches': self.sketches.to_dict() if self.sketches is not None else None
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'ReviewAggregate':
+        aggregate = cls()
+        for field in ('total_rows', 'recommended', 'recommend_known', 'hours_sum',
+                      'hours_count', 'hours_min', 'hours_max', 'heavy_players'):
+            setattr(aggregate, field, data.get(field, getattr(aggregate, field)))
+        aggregate.playtime_buckets.update(data.get('playtime_buckets', {}))
+        aggregate.monthly_counts = {int(k): v for k, v in data.get('monthly_counts', {}).items()}
+        aggregate.daily_counts = {int(k): v for k, v in data.get('daily_counts', {}).items()}
+        aggregate.game_reviews = {int(k): v for k, v in data.get('game_reviews', {}).items()}
+        aggregate.game_recommended = {int(k): v for k, v in data.get('game_recommended', {}).items()}
+        for field in ('game_hours_sum', 'game_hours_count', 'game_first_day', 'game_last_day'):
+            setattr(aggregate, field, {int(k): v for k, v in data.get(field, {}).items()})
+        if data.get('game_days'):
+            aggregate._game_days = _decode_app_days(data['game_days'])
+        if data.get('sketches'):
+            aggregate.sketches = ReviewSketches.from_dict(data['sketches'])
+        return aggregate
+
+
+def _encode_array(values: np.ndarray, dtype: str) -> str:
+    return base64.b64encode(zlib.compress(np.ascontiguousarray(values, dtype=dtype).tobytes())).decode('ascii')
+
+
+def _decode_array(data: str, dtype: str) -> np.ndarray:
+    return np.frombuffer(zlib.decompress(base64.b64decode(data)), dtype=dtype).copy()
+
+
+def _encode_app_days(totals: pd.DataFrame) -> Dict:
+    """Per-(app_id, day) totals as compressed little-endian columns (JSON-safe)"""
+    encoded = {level: _encode_array(totals.index.get_level_values(level), '<i8') for level in ('app_id', 'day')}
+    encoded.update((name, _encode_array(totals[name].to_numpy(), '<f8')) for name in MEASURES)
+    return encoded
+
+
+def _decode_app_days(data: Dict) -> pd.DataFrame:
+    index = pd.MultiIndex.from_arrays([_decode_array(data[level], '<i8') for level in ('app_id', 'day')],
+                                      names=['app_id', 'day'])
+    return pd.DataFrame({name: _decode_array(data[name], '<f8') for name in MEASURES}, index=index)
+
+
+def iter_csv_chunks(csv_path: str, chunksize: int = 1_000_000, **read_kwargs) -> Iterable[pd.DataFrame]:
+    """Stream a CSV in fixed-size chunks so memory stays bounded"""
+    return pd.read_csv(csv_path, chunksize=chunksize, **read_kwargs)
+
+
+def _review_columns(header, sketches: bool):
+    wanted = REVIEW_COLUMNS + (SKETCH_COLUMNS if sketches else [])
+    return [col for col in wanted if col in header]
+
+
+def aggregate_reviews(csv_path: str, chunksize: int = 1_000_000, sketches: bool = False) -> ReviewAggregate:
+    """Single pass over the whole review log"""
+    header = pd.read_csv(csv_path, nrows=0).columns
+    usecols = _review_columns(header, sketches)
+
+    aggregate = ReviewAggregate(sketches=sketches)
+    typed = schema_read_kwargs(RECOMMENDATIONS_SCHEMA, usecols, relaxed=True)
+    for chunk in iter_csv_chunks(csv_path, chunksize=chunksize, usecols=usecols, **typed):
+        aggregate.update(chunk)
+    logger.info(f"📊 Aggregated {aggregate.total_rows:,} reviews from {csv_path}")
+    return aggregate
+
+
+def count_csv_rows(csv_path: str, chunksize: int = 1_000_000) -> int:
+    """Count data rows by streaming only the first column"""
+    total = 0
+    for chunk in iter_csv_chunks(csv_path, chunksize=chunksize, usecols=[0]):
+        total += len(chunk)
+    return total
+
+
+class _ByteRangeReader:
+    """File-like view of ``[start, end)`` of a file, for parsing appended rows"""
+
+    def __init__(self, f, start: int, end: int):
+        self._f = f
+        self._remaining = end - start
+        f.seek(start)
+
+    def read(self, size: int = -1) -> bytes:
+        if self._remaining <= 0:
+            return b''
+        if size is None or size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._f.read(size)
+        self._remaining -= len(data)
+        return data
+
+    def __iter__(self):
+        return iter(self.readline, b'')
+
+    def readline(self, size: int = -1) -> bytes:
+        if self._remaining <= 0:
+            return b''
+        line = self._f.readline(self._remaining if size is None or size < 0 else min(size, self._remaining))
+        self._remaining -= len(line)
+        return line
+
+
+class ReviewLogIngestor:
+    """Keeps a ReviewAggregate current for the append-only recommendations.csv
+
+    Remembers the byte offset and row count it has consumed. A refresh only
+    parses rows appended since then and folds them into a copy of the running
+    aggregate; the file is re-read from the top only if it was rewritten
+    (shrunk, or the bytes before the offset changed). Partially written last
+    lines are left for the next refresh. The state is kept in memory and, with
+    ``state_path``, persisted as JSON so restarts stay incremental. Turning
+    ``sketches`` on or off re-aggregates once, since the sketches must cover
+    every row.
+    """
+
+    TAIL_CHECK_BYTES = 64 * 1024
+    # Bumped when ReviewAggregate gains fields, so older state is rebuilt rather than resumed
+    STATE_FORMAT = 5
+
+    def __init__(self, csv_path: str, state_path: Optional[str] = None, chunksize: int = 1_000_000,
+                 sketches: bool = False):
+        self.csv_path = csv_path
+        self.state_path = state_path
+        self.chunksize = chunksize
+        self.sketches = sketches
+        self._state = None
+        self._lock = threading.Lock()
+
+    @property
+    def rows(self) -> int:
+        return self._state['rows'] if self._state else 0
+
+    def refresh(self) -> ReviewAggregate:
+        """Aggregate over every complete row currently in the file"""
+        with self._lock:
+            state = self._state or self._read_state()
+            if state is not None and (state['aggregate'].sketches is not None) != self.sketches:
+                state = None
+            with open(self.csv_path, 'rb') as f:
+                header_line = f.readline()
+                end = self._last_line_end(f)
+
+                if state is None or not self._is_append_of(f, state, header_line, end):
+                    if state is not None:
+                        logger.info(f"🔄 {self.csv_path} was rewritten, re-aggregating from the start")
+                    state = {
+                        'offset': len(header_line),
+                        'rows': 0,
+                        'header_sha': hashlib.sha256(header_line).hexdigest(),
+                        'aggregate': ReviewAggregate(sketches=self.sketches)
+                    }
+
+                aggregate = state['aggregate']
+                appended = 0
+                if end > state['offset']:
+                    aggregate = aggregate.copy()
+                    appended = self._ingest(f, header_line, state['offset'], end, aggregate)
+
+            if appended or state is not self._state:
+                offset = max(end, state['offset'])
+                state = dict(state, offset=offset, rows=state['rows'] + appended, aggregate=aggregate,
+                             tail_sha=self._tail_hash(offset, len(header_line)))
+                self._state = state
+                self._write_state(state)
+                logger.info(f"📊 Ingested {appended:,} new reviews ({state['rows']:,} total) from {self.csv_path}")
+            return aggregate
+
+    def _ingest(self, f, header_line: bytes, start: int, end: int, aggregate: ReviewAggregate) -> int:
+        header = pd.read_csv(io.BytesIO(header_line), nrows=0).columns.tolist()
+        usecols = _review_columns(header, self.sketches)
+        typed = schema_read_kwargs(RECOMMENDATIONS_SCHEMA, usecols, relaxed=True)
+        rows = 0
+        reader = _ByteRangeReader(f, start, end)
+        for chunk in pd.read_csv(reader, names=header, header=None, usecols=usecols,
+                                 chunksize=self.chunksize, **typed):
+            aggregate.update(chunk)
+            rows += len(chunk)
+        return rows
+
+    def _is_append_of(self, f, state: Dict, header_line: bytes, end: int) -> bool:
+        """True if the file still starts with everything consumed so far"""
+        if state.get('header_sha') != hashlib.sha256(header_line).hexdigest():
+            return False
+        if end < state['offset']:
+            return False
+        return state.get('tail_sha') == self._tail_hash(state['offset'], len(header_line), f)
+
+    def _tail_hash(self, offset: int, header_end: int, f=None) -> str:
+        """Hash of the last consumed bytes, to notice a rewritten file"""
+        start = max(header_end, offset - self.TAIL_CHECK_BYTES)
+        if f is None:
+            with open(self.csv_path, 'rb') as handle:
+                handle.seek(start)
+                return hashlib.sha256(handle.read(offset - start)).hexdigest()
+        f.seek(start)
+        return hashlib.sha256(f.read(offset - start)).hexdigest()
+
+    @staticmethod
+    def _last_line_end(f) -> int:
+        """Offset just past the last newline; a half-written last row is skipped"""
+        size = f.seek(0, os.SEEK_END)
+        position = size
+        while position > 0:
+            step = min(64 * 1024, position)
+            f.seek(position - step)
+            block = f.read(step)
+            newline = block.rfind(b'\n')
+            if newline != -1:
+                return position - step + newline + 1
+            position -= step
+        return 0
+
+    def _read_state(self) -> Optional[Dict]:
+        if not self.state_path:
+            return None
+        try:
+            with open(self.state_path, 'r') as f:
+                data = json.load(f)
+            if data.get('format') != self.STATE_FORMAT:
+                return None
+            data['aggregate'] = ReviewAggregate.from_dict(data['aggregate'])
+            return data
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _write_state(self, state: Dict):
+        if not self.state_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.state_path) or '.', exist_ok=True)
+            tmp_path = f"{self.state_path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(dict(state, format=self.STATE_FORMAT, source=os.path.abspath(self.csv_path),
+                               aggregate=state['aggregate'].to_dict()), f)
+            os.replace(tmp_path, self.state_path)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not store ingestion state for {self.csv_path}: {e}")
@@ -0,0 +1,195 @@
+import logging
+import time
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.services.activity_index import DAY_COLUMN, MISSING_DAY, day_numbers
+
+logger = logging.getLogger(__name__)
+
+# Measures kept per day: review count, recommending reviews, hours total, reviews with hours
+MEASURES = ('reviews', 'positive', 'hours_sum', 'hours_count')
+
+
+def to_day(value) -> Optional[int]:
+    """Date-like value (or None) -> day number; raises ValueError if it can't be parsed"""
+    if value is None or value == '':
+        return None
+    try:
+        timestamp = pd.Timestamp(value)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid date: {value!r}") from e
+    if pd.isna(timestamp):
+        raise ValueError(f"Invalid date: {value!r}")
+    return int(timestamp.to_datetime64().astype('datetime64[D]').astype('int64'))
+
+
+def parse_date_range(start=None, end=None) -> Optional[Tuple[Optional[int], Optional[int]]]:
+    """``start``/``end`` query values -> inclusive (start_day, end_day), or None when neither is given"""
+    start_day, end_day = to_day(start), to_day(end)
+    if start_day is None and end_day is None:
+        return None
+    if start_day is not None and end_day is not None and start_day > end_day:
+        raise ValueError(f"Date range starts after it ends: {start} > {end}")
+    return start_day, end_day
+
+
+def _summary(totals: Dict[str, float]) -> Dict:
+    reviews, positive = int(totals['reviews']), int(totals['positive'])
+    hours_sum, hours_count = float(totals['hours_sum']), int(totals['hours_count'])
+    return {
+        'reviews': reviews,
+        'positive': positive,
+        'positive_rate': round(positive / reviews * 100, 1) if reviews else None,
+        'total_playtime': round(hours_sum, 1),
+        'avg_playtime': round(hours_sum / hours_count, 1) if hours_count else None
+    }
+
+
+class ReviewTimeIndex:
+    """Per-day prefix sums of review measures, globally and per app_id
+
+    The global part is one cumulative array per measure over a contiguous day
+    range, so any date range is two lookups. The per-game part is CSR: rows
+    sorted by (app_id, day) with one entry per active app-day, ``indptr``
+    delimiting each app's entries and cumulative sums over all entries; a
+    range for one game is two binary searches within its segment. Built once
+    per data version and read-only afterwards.
+    """
+
+    def __init__(self, first_day: int, cumulative: Dict[str, np.ndarray], app_ids: np.ndarray,
+                 indptr: np.ndarray, entry_days: np.ndarray, entry_cumulative: Dict[str, np.ndarray]):
+        self.first_day = int(first_day)
+        self.cumulative = cumulative
+        self.app_ids = app_ids
+        self.indptr = indptr
+        self.entry_days = entry_days
+        self.entry_cumulative = entry_cumulative
+        # 'full' when built from the whole review log, 'sample' from the loaded rows; rows covered
+        self.population = 'sample'
+        self.rows = 0
+        # Entries keyed by (segment, day offset) in one sorted array, for per_app range searches
+        self._span = len(cumulative['reviews'])
+        segments = np.repeat(np.arange(len(app_ids), dtype='int64'), np.diff(indptr))
+        self._entry_keys = segments * self._span + (entry_days.astype('int64') - self.first_day)
+        for array in [app_ids, indptr, entry_days, self._entry_keys,
+                      *cumulative.values(), *entry_cumulative.values()]:
+            array.flags.writeable = False
+
+    @classmethod
+    def build(cls, recommendations_df: pd.DataFrame, population: str = 'sample') -> 'ReviewTimeIndex':
+        """From review rows (``population`` says whether they are the whole log or a sample)"""
+        return cls.from_app_days(app_day_totals(recommendations_df), population, len(recommendations_df))
+
+    @classmethod
+    def from_app_days(cls, totals: pd.DataFrame, population: str = 'full',
+                      rows: Optional[int] = None) -> 'ReviewTimeIndex':
+        """From per-(app_id, day) measure totals such as ReviewAggregate.game_day_totals()"""
+        started = time.time()
+        totals = totals.sort_index()
+        apps = totals.index.get_level_values('app_id').to_numpy(dtype='int64')
+        days = totals.index.get_level_values('day').to_numpy(dtype='int64')
+
+        if len(days) == 0:
+            index = cls(0, {name: np.zeros(1) for name in MEASURES}, np.zeros(0, dtype='int64'),
+                        np.zeros(1, dtype='int64'), np.zeros(0, dtype='int32'),
+                        {name: np.zeros(1) for name in MEASURES})
+        else:
+            first_day = int(days.min())
+            offsets = days - first_day
+            span = int(offsets.max()) + 1
+            cumulative = {name: _prefix(np.bincount(offsets, weights=totals[name].to_numpy(), minlength=span))
+                          for name in MEASURES}
+            # Entries are already one per (app_id, day), sorted: a CSR per app
+            entry_cumulative = {name: _prefix(totals[name].to_numpy()) for name in MEASURES}
+            app_starts = np.flatnonzero(np.r_[True, apps[1:] != apps[:-1]])
+            indptr = np.r_[app_starts, len(apps)].astype('int64')
+            index = cls(first_day, cumulative, apps[app_starts], indptr, days.astype('int32'), entry_cumulative)
+            logger.info(f"📅 Built review time index: {span:,} days, {len(app_starts):,} games, "
+                        f"{len(apps):,} game-days in {time.time() - started:.3f}s")
+        index.population = population
+        index.rows = int(totals['reviews'].sum()) if rows is None else int(rows)
+        return index
+
+    def _day_bounds(self, start: Optional[int], end: Optional[int]) -> Tuple[int, int]:
+        """Prefix positions covering days [start, end], clipped to the indexed range"""
+        span = self._span - 1
+        low = 0 if start is None else min(max(start - self.first_day, 0), span)
+        high = span if end is None else min(max(end - self.first_day + 1, 0), span)
+        return low, max(low, high)
+
+    def totals(self, start: Optional[int] = None, end: Optional[int] = None,
+               app_id: Optional[int] = None) -> Dict:
+        """Reviews, positive rate and playtime for days [start, end] (inclusive), optionally for one game"""
+        if app_id is None:
+            low, high = self._day_bounds(start, end)
+            return _summary({name: self.cumulative[name][high] - self.cumulative[name][low] for name in MEASURES})
+
+        position = int(np.searchsorted(self.app_ids, app_id))
+        if position == len(self.app_ids) or self.app_ids[position] != app_id:
+            return _summary({name: 0 for name in MEASURES})
+        segment_start, segment_end = self.indptr[position], self.indptr[position + 1]
+        segment = self.entry_days[segment_start:segment_end]
+        low = segment_start + (0 if start is None else int(np.searchsorted(segment, start, 'left')))
+        high = segment_start + (len(segment) if end is None else int(np.searchsorted(segment, end, 'right')))
+        return _summary({name: self.entry_cumulative[name][high] - self.entry_cumulative[name][low]
+                         for name in MEASURES})
+
+    def per_app(self, start: Optional[int] = None, end: Optional[int] = None) -> pd.DataFrame:
+        """Range totals for every game at once (one vectorised search per segment bound)"""
+        low, high = self.indptr[:-1], self.indptr[1:]
+        base = np.arange(len(self.app_ids), dtype='int64') * self._span
+        if start is not None:
+            low = np.searchsorted(self._entry_keys, base + np.clip(start - self.first_day, 0, self._span - 1), 'left')
+        if end is not None:
+            high = np.searchsorted(self._entry_keys, base + np.clip(end - self.first_day, -1, self._span - 1), 'right')
+        high = np.maximum(low, high)
+        return pd.DataFrame({name: self.entry_cumulative[name][high] - self.entry_cumulative[name][low]
+                             for name in MEASURES}, index=pd.Index(self.app_ids, name='app_id'))
+
+
+def app_day_totals(recommendations_df: pd.DataFrame, days: Optional[np.ndarray] = None) -> pd.DataFrame:
+    """Review rows -> MEASURES summed per (app_id, day), for rows with both known"""
+    df = recommendations_df
+    if days is None:
+        days = (df[DAY_COLUMN].to_numpy() if DAY_COLUMN in df.columns
+                else day_numbers(df['date']) if 'date' in df.columns
+                else np.full(len(df), MISSING_DAY, dtype='int32'))
+    app_ids = (pd.to_numeric(df['app_id'], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+               if 'app_id' in df.columns else np.full(len(df), np.nan))
+    valid = (days != MISSING_DAY) & ~np.isnan(app_ids)
+    positive = (df['is_recommended'].fillna(False).astype(bool).to_numpy()
+                if 'is_recommended' in df.columns else np.zeros(len(df), dtype=bool))
+    hours = (pd.to_numeric(df['hours'], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+             if 'hours' in df.columns else np.full(len(df), np.nan))
+    rows = pd.DataFrame({
+        'app_id': app_ids[valid].astype('int64'),
+        'day': days[valid].astype('int64'),
+        'reviews': np.ones(int(valid.sum())),
+        'positive': positive[valid].astype('float64'),
+        'hours_sum': np.nan_to_num(hours[valid]),
+        'hours_count': (~np.isnan(hours[valid])).astype('float64')
+    })
+    return rows.groupby(['app_id', 'day']).sum()
+
+
+def merge_app_days(*totals: pd.DataFrame) -> pd.DataFrame:
+    """Sum several per-(app_id, day) totals tables into one"""
+    totals = [t for t in totals if len(t)]
+    if not totals:
+        return empty_app_days()
+    if len(totals) == 1:
+        return totals[0]
+    return pd.concat(totals).groupby(level=['app_id', 'day']).sum()
+
+
+def empty_app_days() -> pd.DataFrame:
+    index = pd.MultiIndex.from_arrays([np.zeros(0, dtype='int64')] * 2, names=['app_id', 'day'])
+    return pd.DataFrame({name: np.zeros(0) for name in MEASURES}, index=index)
+
+
+def _prefix(values: np.ndarray) -> np.ndarray:
+    """Cumulative sums with a leading zero, so range [i, j) is prefix[j] - prefix[i]"""
+    return np.concatenate([[0.0], np.cumsum(values, dtype='float64')])
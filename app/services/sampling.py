@@ -0,0 +1,150 @@
+import logging
+import math
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.services.dataset_schema import schema_read_kwargs
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_WEIGHT_COLUMN = 'sample_weight'
+SAMPLE_STRATUM_COLUMN = 'sample_stratum'
+
+STRATA = ('month', 'app_id')
+
+# Two-sided normal quantiles for the supported confidence levels
+Z_SCORES = {0.90: 1.645, 0.95: 1.96, 0.99: 2.576}
+
+
+def _stratum_keys(chunk: pd.DataFrame, strata: Optional[str]) -> np.ndarray:
+    if strata is None:
+        return np.zeros(len(chunk), dtype='int64')
+    if strata == 'month':
+        dates = pd.to_datetime(chunk['date'], errors='coerce')
+        return (dates.dt.year * 12 + dates.dt.month - 1).fillna(-1).astype('int64').to_numpy()
+    if strata == 'app_id':
+        return pd.to_numeric(chunk['app_id'], errors='coerce').fillna(-1).astype('int64').to_numpy()
+    raise ValueError(f"Unknown strata: {strata} (expected one of {STRATA})")
+
+
+def sample_csv(csv_path: str, size: int, seed: int = 42, strata: Optional[str] = None,
+               min_per_stratum: int = 10, chunksize: int = 1_000_000,
+               schema: Optional[Dict] = None, **read_kwargs) -> pd.DataFrame:
+    """Draw a seeded random sample of ``size`` rows in one streaming pass
+
+    Every row gets a uniform random key and the ``size`` smallest keys are
+    kept (a reservoir sample). With ``strata`` ('month' or 'app_id') the
+    ``min_per_stratum`` smallest keys of every stratum are kept as well, so
+    small months/games are always represented. Within each stratum the kept
+    rows are a simple random sample, and each row carries the weight
+    population / sample size of its stratum for the estimators below.
+    Rows come back in file order.
+    """
+    rng = np.random.default_rng(seed)
+    columns = list(pd.read_csv(csv_path, nrows=0).columns)
+    usecols = read_kwargs.pop('usecols', None)
+    if usecols is not None:
+        columns = [column for column in columns if column in usecols]
+    typed = schema_read_kwargs(schema, columns, relaxed=True) if schema else {}
+
+    pool = None
+    population = {}
+    offset = 0
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize, usecols=usecols, **typed, **read_kwargs):
+        chunk = chunk.assign(
+            _row=np.arange(offset, offset + len(chunk)),
+            _key=rng.random(len(chunk)),
+            _stratum=_stratum_keys(chunk, strata)
+        )
+        offset += len(chunk)
+        values, counts = np.unique(chunk['_stratum'].to_numpy(), return_counts=True)
+        for stratum, count in zip(values.tolist(), counts.tolist()):
+            population[stratum] = population.get(stratum, 0) + count
+
+        pool = chunk if pool is None else pd.concat([pool, chunk], ignore_index=True)
+        pool = pool.sort_values('_key', kind='stable', ignore_index=True)
+        keep = np.arange(len(pool)) < size
+        if strata is not None:
+            keep |= (pool.groupby('_stratum', sort=False).cumcount() < min_per_stratum).to_numpy()
+        pool = pool[keep]
+
+    if pool is None:
+        return pd.DataFrame(columns=columns)
+
+    sample = pool.sort_values('_row', ignore_index=True)
+    sampled = sample['_stratum'].value_counts()
+    sample[SAMPLE_WEIGHT_COLUMN] = sample['_stratum'].map(population) / sample['_stratum'].map(sampled)
+    sample[SAMPLE_STRATUM_COLUMN] = sample['_stratum']
+    sample = sample.drop(columns=['_row', '_key', '_stratum'])
+    if schema:
+        sample = _restore_strict_types(sample, schema)
+    logger.info(f"🎲 Sampled {len(sample):,} of {offset:,} rows from {csv_path} "
+                f"(strata={strata or 'none'}, seed={seed})")
+    return sample
+
+
+def _restore_strict_types(df: pd.DataFrame, schema: Dict) -> pd.DataFrame:
+    """Cast relaxed int/bool columns back to the schema type when the sample has no gaps"""
+    for column, column_type in schema.items():
+        if column in df.columns and column_type.startswith(('uint', 'int', 'bool')):
+            if not df[column].isna().any():
+                df[column] = df[column].astype(column_type)
+    return df
+
+
+def is_weighted_sample(df: Optional[pd.DataFrame]) -> bool:
+    return df is not None and SAMPLE_WEIGHT_COLUMN in df.columns
+
+
+def estimate(df: pd.DataFrame, column: str, statistic: str = 'mean',
+             confidence: float = 0.95, scale: float = 1.0) -> Optional[Dict]:
+    """Population mean or total of ``column`` with a normal-approximation confidence interval
+
+    Uses the stratified estimator (with finite population correction) over
+    the sample_weight / sample_stratum columns written by sample_csv. For a
+    boolean column the mean is the population proportion. Returns None for
+    frames that are not weighted random samples.
+    """
+    if not is_weighted_sample(df) or column not in df.columns:
+        return None
+
+    frame = pd.DataFrame({
+        'value': pd.to_numeric(df[column], errors='coerce').astype('float64'),
+        'weight': df[SAMPLE_WEIGHT_COLUMN],
+        'stratum': df[SAMPLE_STRATUM_COLUMN] if SAMPLE_STRATUM_COLUMN in df.columns else 0
+    })
+    strata = frame.groupby('stratum').agg(
+        n=('weight', 'size'),
+        weight=('weight', 'first'),
+        n_valid=('value', 'count'),
+        mean=('value', 'mean'),
+        var=('value', 'var')
+    )
+    strata = strata[strata['n_valid'] > 0]
+    if strata.empty:
+        return None
+
+    population_sizes = strata['weight'] * strata['n']
+    population = float(population_sizes.sum())
+    shares = population_sizes / population
+    fpc = (1 - strata['n'] / population_sizes).clip(lower=0)
+    point = float((shares * strata['mean']).sum())
+    variance = float((shares ** 2 * fpc * strata['var'].fillna(0) / strata['n_valid']).sum())
+
+    if statistic == 'total':
+        point *= population
+        variance *= population ** 2
+    elif statistic != 'mean':
+        raise ValueError(f"Unknown statistic: {statistic}")
+
+    margin = Z_SCORES.get(confidence, 1.96) * math.sqrt(variance)
+    return {
+        'estimate': round(point * scale, 4),
+        'ci_low': round((point - margin) * scale, 4),
+        'ci_high': round((point + margin) * scale, 4),
+        'confidence': confidence,
+        'sample_size': int(strata['n'].sum()),
+        'population': int(round(population))
+    }
@@ -0,0 +1,137 @@
+import json
+import logging
+import os
+import shutil
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.services.dataset_snapshot import PARQUET_AVAILABLE
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = 'manifest.json'
+OTHER_COLUMNS_FILE = 'other.parquet'
+
+# numpy kinds that can be memory-mapped as-is: bool, ints, floats, datetimes
+_MAPPABLE_KINDS = 'biufM'
+
+
+def is_mappable(series: pd.Series) -> bool:
+    """Plain numpy numeric/bool/datetime columns; strings and categoricals are not"""
+    dtype = series.dtype
+    return isinstance(dtype, np.dtype) and dtype.kind in _MAPPABLE_KINDS
+
+
+class SharedColumnStore:
+    """Dataset columns kept in memory-mapped .npy files shared by all workers
+
+    The first process to load a dataset version writes its numeric columns as
+    .npy files (plus the remaining string/category columns as Parquet) into a
+    directory named after the version. Every other worker maps those files
+    read-only, so the OS page cache holds one copy of the numeric data no
+    matter how many gunicorn workers are running. Point the directory at
+    /dev/shm to keep the shared pages in RAM.
+    """
+
+    def __init__(self, root_dir: str, enabled: bool = True):
+        self.root_dir = root_dir
+        self.enabled = enabled and PARQUET_AVAILABLE
+        if enabled and not PARQUET_AVAILABLE:
+            logger.warning("⚠️ pyarrow not installed - shared dataset columns disabled")
+
+    def attach(self, key: str) -> Optional[pd.DataFrame]:
+        """Map an already published version, or None if it does not exist yet"""
+        directory = os.path.join(self.root_dir, key)
+        try:
+            with open(os.path.join(directory, MANIFEST_FILE), 'r') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        try:
+            other = None
+            if any(column['storage'] == 'parquet' for column in manifest['columns']):
+                other = pd.read_parquet(os.path.join(directory, OTHER_COLUMNS_FILE))
+
+            data = {}
+            for column in manifest['columns']:
+                if column['storage'] == 'npy':
+                    data[column['name']] = np.load(os.path.join(directory, column['file']), mmap_mode='r')
+                else:
+                    data[column['name']] = other[column['name']]
+            # copy=False keeps every mapped column as its own zero-copy block
+            df = pd.DataFrame(data, columns=[c['name'] for c in manifest['columns']], copy=False)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not attach shared columns {key}: {e}")
+            return None
+
+        logger.info(f"🔗 Attached shared dataset {key} ({len(df):,} rows)")
+        return df
+
+    def publish(self, key: str, df: pd.DataFrame) -> pd.DataFrame:
+        """Write ``df`` under ``key`` (unless another worker already did) and map it"""
+        existing = self.attach(key)
+        if existing is not None:
+            return existing
+
+        directory = os.path.join(self.root_dir, key)
+        tmp_dir = os.path.join(self.root_dir, f".{key}.{os.getpid()}.tmp")
+        try:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            os.makedirs(tmp_dir)
+            self._write(tmp_dir, df)
+            try:
+                os.rename(tmp_dir, directory)
+                logger.info(f"💾 Published shared dataset {key} to {directory}")
+            except OSError:
+                # Another worker published the same version first
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+        except Exception as e:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            logger.warning(f"⚠️ Could not publish shared columns {key}: {e}")
+            return df
+
+        return self.attach(key) if os.path.isdir(directory) else df
+
+    def prune(self, prefix: str, keep: str):
+        """Remove older versions of a dataset; mapped pages stay valid until unmapped"""
+        if not os.path.isdir(self.root_dir):
+            return
+        for entry in os.listdir(self.root_dir):
+            if entry.startswith(prefix) and entry != keep:
+                shutil.rmtree(os.path.join(self.root_dir, entry), ignore_errors=True)
+
+    @staticmethod
+    def mapped_bytes(df: pd.DataFrame) -> int:
+        """Bytes of ``df`` backed by shared memory-mapped files"""
+        total = 0
+        for column in df.columns:
+            values = df[column].to_numpy()
+            base = values
+            while getattr(base, 'base', None) is not None and not isinstance(base, np.memmap):
+                base = base.base
+            if isinstance(base, np.memmap):
+                total += values.nbytes
+        return total
+
+    @staticmethod
+    def _write(directory: str, df: pd.DataFrame):
+        columns: List[Dict] = []
+        other_columns = []
+        for position, column in enumerate(df.columns):
+            series = df[column]
+            if is_mappable(series):
+                filename = f"c{position}.npy"
+                np.save(os.path.join(directory, filename), series.to_numpy())
+                columns.append({'name': column, 'storage': 'npy', 'file': filename, 'dtype': str(series.dtype)})
+            else:
+                other_columns.append(column)
+                columns.append({'name': column, 'storage': 'parquet', 'dtype': str(series.dtype)})
+
+        if other_columns:
+            df[other_columns].to_parquet(os.path.join(directory, OTHER_COLUMNS_FILE), index=False)
+
+        with open(os.path.join(directory, MANIFEST_FILE), 'w') as f:
+            json.dump({'rows': len(df), 'columns': columns}, f, indent=2)
@@ -0,0 +1,299 @@
+import base64
+import logging
+import math
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+_MASK64 = (1 << 64) - 1
+
+
+def _hash(values) -> np.ndarray:
+    """Stable 64-bit hash of any column (ints, strings, ...)"""
+    return pd.util.hash_array(np.asarray(values))
+
+
+def _ids(values: pd.Series) -> pd.Series:
+    """Non-missing ids, integral floats as int64 so every chunk hashes an id the same way"""
+    values = values.dropna()
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_integer_dtype(values):
+        if (values == np.floor(values)).all():
+            return values.astype('int64')
+    return values
+
+
+def _mix(hashes: np.ndarray, seed: int) -> np.ndarray:
+    """splitmix64 finalizer over ``hashes ^ seed``, for independent hash rows"""
+    x = hashes ^ np.uint64((seed * 0x9E3779B97F4A7C15) & _MASK64)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+class HyperLogLog:
+    """Distinct-count sketch: 2**precision one-byte registers, ~1.04/sqrt(2**precision) relative error"""
+
+    def __init__(self, precision: int = 14):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype='uint8')
+
+    def update(self, values):
+        hashes = _hash(values)
+        if len(hashes) == 0:
+            return self
+        index = (hashes >> np.uint64(64 - self.precision)).astype('int64')
+        rest = hashes & np.uint64((1 << (64 - self.precision)) - 1)
+        # Position of the leftmost 1-bit in the remaining bits (exact: they fit in a float64 mantissa)
+        _, bit_length = np.frexp(rest.astype('float64'))
+        rank = (64 - self.precision - bit_length + 1).astype('uint8')
+        np.maximum.at(self.registers, index, rank)
+        return self
+
+    def merge(self, other: 'HyperLogLog'):
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / float(np.sum(np.ldexp(1.0, -self.registers.astype('int64'))))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            raw = m * math.log(m / zeros)
+        return int(round(raw))
+
+    def to_dict(self) -> Dict:
+        return {'precision': self.precision, 'registers': base64.b64encode(self.registers.tobytes()).decode('ascii')}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'HyperLogLog':
+        sketch = cls(data['precision'])
+        sketch.registers = np.frombuffer(base64.b64decode(data['registers']), dtype='uint8').copy()
+        return sketch
+
+
+class KLLSketch:
+    """Quantile sketch (KLL compactors); rank error roughly 1.7/k, independent of stream length"""
+
+    def __init__(self, k: int = 400, seed: int = 0):
+        self.k = k
+        self.count = 0
+        self.min = None
+        self.max = None
+        self.levels = [np.empty(0, dtype='float64')]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def update(self, values):
+        values = pd.to_numeric(pd.Series(values), errors='coerce').dropna().to_numpy(dtype='float64')
+        if len(values) == 0:
+            return self
+        self.count += len(values)
+        self.min = float(values.min()) if self.min is None else min(self.min, float(values.min()))
+        self.max = float(values.max()) if self.max is None else max(self.max, float(values.max()))
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0, dtype='float64'))
+                items = np.sort(items)
+                # An odd item out stays behind; every other remaining item moves up with double weight
+                keep = items[:1] if len(items) % 2 else items[:0]
+                items = items[len(keep):]
+                promoted = items[int(self._rng.integers(2))::2]
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+                self.levels[level] = keep
+            level += 1
+
+    def merge(self, other: 'KLLSketch'):
+        if other.count == 0:
+            return self
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0, dtype='float64'))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        self._compress()
+        return self
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.count == 0:
+            return None
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2 ** level, dtype='float64')
+                                  for level, items in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        cumulative = np.cumsum(weights[order])
+        position = min(int(np.searchsorted(cumulative, q * cumulative[-1])), len(order) - 1)
+        return float(items[order][position])
+
+    def to_dict(self) -> Dict:
+        return {'k': self.k, 'count': self.count, 'min': self.min, 'max': self.max,
+                'levels': [items.tolist() for items in self.levels]}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'KLLSketch':
+        sketch = cls(data['k'])
+        sketch.count, sketch.min, sketch.max = data['count'], data['min'], data['max']
+        sketch.levels = [np.asarray(items, dtype='float64') for items in data['levels']] or sketch.levels
+        return sketch
+
+
+class CountMinSketch:
+    """Frequency sketch (over-estimates by at most ~e/width of the total) tracking its top keys
+
+    Each chunk's most frequent keys become candidates; candidates are ranked
+    by their sketch estimate, so heavy hitters survive chunking and merges.
+    """
+
+    def __init__(self, width: int = 1 << 15, depth: int = 4, top_k: int = 20):
+        self.width = width
+        self.depth = depth
+        self.top_k = top_k
+        self.table = np.zeros((depth, width), dtype='int64')
+        self.candidates = []
+
+    @property
+    def error_bound(self) -> int:
+        """Over-estimate that holds for each key with probability 1 - e**-depth"""
+        return int(math.ceil(math.e / self.width * int(self.table[0].sum())))
+
+    def _buckets(self, hashes: np.ndarray) -> List[np.ndarray]:
+        return [(_mix(hashes, row + 1) % np.uint64(self.width)).astype('int64') for row in range(self.depth)]
+
+    def update(self, keys):
+        keys = pd.Series(keys).dropna()
+        if keys.empty:
+            return self
+        for row, buckets in enumerate(self._buckets(_hash(keys.to_numpy()))):
+            self.table[row] += np.bincount(buckets, minlength=self.width)
+        chunk_top = [self._key(key) for key in keys.value_counts().head(self.top_k).index]
+        self._keep_top(self.candidates + chunk_top)
+        return self
+
+    @staticmethod
+    def _key(key):
+        return key.item() if isinstance(key, np.generic) else key
+
+    def estimate(self, keys) -> np.ndarray:
+        buckets = self._buckets(_hash(np.asarray(list(keys))))
+        return np.min([self.table[row][buckets[row]] for row in range(self.depth)], axis=0)
+
+    def _keep_top(self, keys: List):
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return
+        estimates = self.estimate(keys)
+        order = np.argsort(-estimates, kind='stable')[:self.top_k]
+        self.candidates = [keys[i] for i in order]
+
+    def heavy_hitters(self, n: Optional[int] = None) -> List[Dict]:
+        if not self.candidates:
+            return []
+        estimates = self.estimate(self.candidates)
+        return [{'key': key, 'count': int(count)} for key, count in zip(self.candidates, estimates)][:n]
+
+    def merge(self, other: 'CountMinSketch'):
+        self.table += other.table
+        self._keep_top(self.candidates + other.candidates)
+        return self
+
+    def to_dict(self) -> Dict:
+        return {'width': self.width, 'depth': self.depth, 'top_k': self.top_k,
+                'table': base64.b64encode(self.table.astype('<i8').tobytes()).decode('ascii'),
+                'candidates': self.candidates}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'CountMinSketch':
+        sketch = cls(data['width'], data['depth'], data['top_k'])
+        table = np.frombuffer(base64.b64decode(data['table']), dtype='<i8')
+        sketch.table = table.reshape(sketch.depth, sketch.width).astype('int64')
+        sketch.candidates = list(data['candidates'])
+        return sketch
+
+
+def _rounded(value: Optional[float]) -> Optional[float]:
+    return round(value, 2) if value is not None else None
+
+
+class ReviewSketches:
+    """Fixed-size approximate aggregates over the review log
+
+    Distinct reviewers and reviewed games (HyperLogLog), playtime quantiles
+    (KLL) and the most active reviewers (count-min). Every part merges, so
+    chunks, incremental refreshes and other processes combine exactly as
+    the exact ReviewAggregate counters do.
+    """
+
+    COLUMNS = ['user_id', 'app_id', 'hours']
+    QUANTILES = (0.5, 0.9, 0.99)
+
+    def __init__(self):
+        self.users = HyperLogLog()
+        self.games = HyperLogLog()
+        self.hours = KLLSketch()
+        self.reviewers = CountMinSketch()
+
+    def update(self, chunk: pd.DataFrame):
+        if 'user_id' in chunk.columns:
+            user_ids = _ids(chunk['user_id'])
+            self.users.update(user_ids.to_numpy())
+            self.reviewers.update(user_ids)
+        if 'app_id' in chunk.columns:
+            self.games.update(_ids(chunk['app_id']).to_numpy())
+        if 'hours' in chunk.columns:
+            self.hours.update(chunk['hours'])
+        return self
+
+    def merge(self, other: 'ReviewSketches'):
+        self.users.merge(other.users)
+        self.games.merge(other.games)
+        self.hours.merge(other.hours)
+        self.reviewers.merge(other.reviewers)
+        return self
+
+    def copy(self) -> 'ReviewSketches':
+        return ReviewSketches.from_dict(self.to_dict())
+
+    def summary(self, top: int = 10) -> Dict:
+        """Approximate full-population figures, JSON-ready"""
+        return {
+            'distinct_users': self.users.estimate(),
+            'distinct_games': self.games.estimate(),
+            'hours_quantiles': {f"p{q * 100:g}": _rounded(self.hours.quantile(q)) for q in self.QUANTILES},
+            'top_reviewers': [{'user_id': hit['key'], 'reviews': hit['count']}
+                              for hit in self.reviewers.heavy_hitters(top)],
+            'top_reviewers_max_overcount': self.reviewers.error_bound,
+            'approximate': True
+        }
+
+    def to_dict(self) -> Dict:
+        return {'users': self.users.to_dict(), 'games': self.games.to_dict(),
+                'hours': self.hours.to_dict(), 'reviewers': self.reviewers.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'ReviewSketches':
+        sketches = cls()
+        sketches.users = HyperLogLog.from_dict(data['users'])
+        sketches.games = HyperLogLog.from_dict(data['games'])
+        sketches.hours = KLLSketch.from_dict(data['hours'])
+        sketches.reviewers = CountMinSketch.from_dict(data['reviewers'])
+        return sketches
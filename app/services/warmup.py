@@ -0,0 +1,139 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from flask import jsonify, render_template
+
+logger = logging.getLogger(__name__)
+
+COLD = 'cold'
+WARMING = 'warming'
+READY = 'ready'
+FAILED = 'failed'
+
+
+class LazyService:
+    """An expensive service built by an explicit warmup instead of at import
+
+    ``start()`` builds it on a background thread; ``get()`` returns it,
+    building synchronously if nobody has started it yet. Request handlers
+    check ``ready`` to answer with a fast "warming" response meanwhile.
+    """
+
+    def __init__(self, name: str, factory: Callable):
+        self.name = name
+        self.factory = factory
+        self.status = COLD
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+        self.build_seconds = None
+        self._instance = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.status == READY
+
+    def start(self):
+        """Build in the background unless already built or building"""
+        with self._lock:
+            if self.status in (WARMING, READY):
+                return
+            self.status = WARMING
+        threading.Thread(target=self._build, name=f"warmup-{self.name}", daemon=True).start()
+
+    def get(self):
+        """The built service (blocks until built)"""
+        if self.status != READY:
+            with self._lock:
+                starting = self.status in (COLD, FAILED)
+                if starting:
+                    self.status = WARMING
+            if starting:
+                self._build()
+            else:
+                self._wait()
+        if self.status == FAILED:
+            raise RuntimeError(f"{self.name} failed to start: {self.error}")
+        return self._instance
+
+    def describe(self) -> Dict:
+        return {
+            'status': self.status,
+            'error': self.error,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'build_seconds': self.build_seconds
+        }
+
+    def _wait(self, poll_seconds: float = 0.05):
+        while self.status == WARMING:
+            time.sleep(poll_seconds)
+
+    def _build(self):
+        self.started_at = datetime.now().isoformat()
+        started = time.time()
+        try:
+            instance = self.factory()
+            self._instance = instance
+            self.error = None
+            self.status = READY
+            logger.info(f"✅ {self.name} warmed up in {time.time() - started:.2f}s")
+        except Exception as e:
+            self.error = str(e)
+            self.status = FAILED
+            logger.error(f"❌ {self.name} warmup failed: {e}")
+        self.finished_at = datetime.now().isoformat()
+        self.build_seconds = round(time.time() - started, 3)
+
+
+_services = OrderedDict()
+
+
+def lazy_service(name: str, factory: Callable) -> LazyService:
+    """Declare a service that takes part in the warmup phase"""
+    service = LazyService(name, factory)
+    _services[name] = service
+    return service
+
+
+def get_service(name: str) -> Optional[LazyService]:
+    return _services.get(name)
+
+
+def start_warmup():
+    """Kick off every declared service in the background"""
+    for service in _services.values():
+        service.start()
+
+
+def readiness() -> Dict:
+    """Per-service warmup status; ready once every service is built"""
+    services = {name: service.describe() for name, service in _services.items()}
+    return {
+        'ready': all(service.ready for service in _services.values()),
+        'services': services
+    }
+
+
+def warming_response(service: LazyService, retry_after: int = 5):
+    """Fast JSON 503 for requests that arrive before ``service`` is ready"""
+    response = jsonify({
+        'success': False,
+        'status': service.status,
+        'message': f"{service.name} is warming up, please retry shortly",
+        'retry_after': retry_after
+    })
+    response.status_code = 503
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+
+def warming_page(service: LazyService, retry_after: int = 5):
+    """Small HTML "loading" page (refreshing itself) for page requests that arrive before ``service`` is ready"""
+    html = render_template('errors/warming.html', service_name=service.name, retry_after=retry_after)
+    return html, 503, {'Retry-After': str(retry_after)}
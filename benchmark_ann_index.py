@@ -0,0 +1,46 @@
+import sys
+
+import numpy as np
+
+from app.services.ann_index import IVFFlatIndex, recall_report
+
+# Usage: python benchmark_ann_index.py [--synthetic N] [--queries Q] [--k K]
+# Recall@k and per-query latency of the IVF-flat index at several probe
+# counts against exact search, over the recommender's game features (or N
+# synthetic clustered 128-d vectors).
+args = sys.argv[1:]
+
+def option(name, default):
+    return int(args[args.index(name) + 1]) if name in args else default
+
+queries, k = option('--queries', 500), option('--k', 10)
+synthetic = option('--synthetic', 0)
+
+if synthetic:
+    print(f"🧪 Generating {synthetic:,} synthetic vectors...")
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(max(1, synthetic // 100), 128))
+    vectors = (centers[rng.integers(0, len(centers), synthetic)]
+               + rng.normal(scale=0.6, size=(synthetic, 128))).astype(np.float32)
+else:
+    from app import create_app
+    from app.services.recommender import Recommender
+
+    app = create_app()
+    with app.app_context():
+        recommender = Recommender()
+        if recommender.load_or_build() is None:
+            print("❌ No recommendation model (are there games in the database?)")
+            sys.exit(1)
+        vectors = recommender.model.features
+
+print(f"🔄 Building IVF-flat index over {vectors.shape[0]:,} vectors...")
+index = IVFFlatIndex.build(vectors)
+rows = np.random.default_rng(1).choice(vectors.shape[0], min(queries, vectors.shape[0]), replace=False)
+report = recall_report(index, vectors, rows, k=k)
+
+print(f"📊 Recall@{k} vs latency ({len(rows):,} queries, {index.n_lists:,} lists)")
+print(f"{'method':<10}{'n_probe':>8}{'recall':>9}{'mean ms':>10}{'p95 ms':>10}")
+for entry in report:
+    print(f"{entry['method']:<10}{entry['n_probe'] or '-':>8}{entry['recall']:>9.3f}"
+          f"{entry['mean_ms']:>10.3f}{entry['p95_ms']:>10.3f}")
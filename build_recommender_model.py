@@ -0,0 +1,21 @@
+import sys
+
+from app import create_app
+from app.services.recommender import Recommender, games_table_version
+
+# Usage: python build_recommender_model.py [--force]
+# Writes the recommendation model artifact for the current games table so
+# workers load it at startup instead of fitting their own copy.
+force = '--force' in sys.argv[1:]
+
+app = create_app()
+
+with app.app_context():
+    print("🔄 Building recommendation model...")
+    print(f"📋 Games table version: {games_table_version()}")
+    recommender = Recommender()
+    path = recommender.load_or_build(force=force)
+    if path is None:
+        print("❌ No recommendation model built (are there games in the database?)")
+        sys.exit(1)
+    print(f"✅ Recommendation model for {len(recommender.game_features):,} games at {path}")
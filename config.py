@@ -38,6 +38,50 @@ class Config:
     UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER', './data/raw')
     MAX_CONTENT_LENGTH = int(os.environ.get('MAX_CONTENT_LENGTH', 16 * 1024 * 1024))
     
+    # Steam datasets: directories searched for games.csv / users.csv / recommendations.csv
+    DATA_SEARCH_PATHS = os.environ.get('DATA_SEARCH_PATHS', os.pathsep.join(['raw', 'data/raw', '.']))
+    USERS_MAX_ROWS = int(os.environ.get('USERS_MAX_ROWS', 50000))  # 0 = whole file
+    RECOMMENDATIONS_MAX_ROWS = int(os.environ.get('RECOMMENDATIONS_MAX_ROWS', 100000))  # 0 = whole file
+    # How the row limits pick rows: 'head' (first rows), 'uniform' (seeded reservoir sample)
+    # or 'month' / 'app_id' (reservoir sample stratified by review month or game)
+    DATA_SAMPLING = os.environ.get('DATA_SAMPLING', 'head').lower()
+    DATA_SAMPLE_SEED = int(os.environ.get('DATA_SAMPLE_SEED', 42))
+    DATA_SAMPLE_MIN_PER_STRATUM = int(os.environ.get('DATA_SAMPLE_MIN_PER_STRATUM', 10))
+    
+    # Dataset snapshots (typed Parquet copies of the raw CSV files)
+    DATA_SNAPSHOT_DIR = os.environ.get('DATA_SNAPSHOT_DIR', './data/snapshots')
+    DATA_SNAPSHOTS_ENABLED = os.environ.get('DATA_SNAPSHOTS_ENABLED', 'True').lower() == 'true'
+    
+    # Memory-map numeric dataset columns from files shared by all worker processes
+    # (set DATA_SHARED_DIR to a /dev/shm path to keep them in RAM)
+    DATA_SHARED_COLUMNS = os.environ.get('DATA_SHARED_COLUMNS', 'False').lower() == 'true'
+    DATA_SHARED_DIR = os.environ.get('DATA_SHARED_DIR', './data/snapshots/shared')
+    
+    # Start loading datasets in the background when the app is created (otherwise on first request)
+    DATA_WARMUP_ON_STARTUP = os.environ.get('DATA_WARMUP_ON_STARTUP', 'True').lower() == 'true'
+    
+    # Stream the full review log into aggregates instead of using the sampled rows
+    ANALYTICS_FULL_POPULATION = os.environ.get('ANALYTICS_FULL_POPULATION', 'True').lower() == 'true'
+    ANALYTICS_CHUNK_SIZE = int(os.environ.get('ANALYTICS_CHUNK_SIZE', 1000000))
+    # Only parse rows appended to recommendations.csv since the last refresh
+    ANALYTICS_INCREMENTAL_REVIEWS = os.environ.get('ANALYTICS_INCREMENTAL_REVIEWS', 'True').lower() == 'true'
+    # Also build fixed-size sketches (distinct reviewers/games, playtime quantiles, top reviewers)
+    ANALYTICS_SKETCHES = os.environ.get('ANALYTICS_SKETCHES', 'False').lower() == 'true'
+    
+    # Recommendation model artifacts (build_recommender_model.py); workers load them at startup
+    # and rebuild when the games table changes, checking at most every N seconds
+    RECOMMENDER_MODEL_DIR = os.environ.get('RECOMMENDER_MODEL_DIR', './data/models')
+    RECOMMENDER_VERSION_CHECK_SECONDS = int(os.environ.get('RECOMMENDER_VERSION_CHECK_SECONDS', 300))
+    # "More like this" searches catalogs this large through the IVF-flat index, probing N lists
+    # (0 = always exact; check recall with benchmark_ann_index.py before enabling)
+    RECOMMENDER_ANN_MIN_GAMES = int(os.environ.get('RECOMMENDER_ANN_MIN_GAMES', 0))
+    RECOMMENDER_ANN_PROBES = int(os.environ.get('RECOMMENDER_ANN_PROBES', 8))
+    
+    # Item-item collaborative filtering over positive reviews in recommendations.csv (built during warmup,
+    # from the first N rows, and saved to RECOMMENDER_MODEL_DIR so other workers map it instead of rebuilding)
+    COLLABORATIVE_FILTERING = os.environ.get('COLLABORATIVE_FILTERING', 'False').lower() == 'true'
+    COLLABORATIVE_MAX_ROWS = int(os.environ.get('COLLABORATIVE_MAX_ROWS', 5_000_000))  # 0 = whole file
+    
     # AI Configuration
     OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
     
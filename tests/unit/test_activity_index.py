@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+from app.services.activity_index import MISSING_DAY, DailyActivity, day_numbers
+
+class TestDailyActivity:
+    def setup_method(self):
+        rng = np.random.default_rng(5)
+        self.dates = pd.Series(pd.to_datetime('2019-03-05') + pd.to_timedelta(rng.integers(0, 800, 4000), 'D'))
+        self.activity = DailyActivity.from_days(day_numbers(self.dates.dt.strftime('%Y-%m-%d')))
+
+    def test_rollups_match_resample(self):
+        frame = pd.DataFrame({'n': 1}, index=self.dates)
+
+        assert self.activity.monthly().equals(frame.resample('ME').size())
+        assert self.activity.weekly().tolist() == frame.resample('W').size().tolist()
+        assert self.activity.weekly().index.equals(frame.resample('W').size().index)
+        assert self.activity.day_of_week().tolist() == self.dates.dt.dayofweek.value_counts().sort_index().tolist()
+
+    def test_missing_dates_are_skipped(self):
+        days = day_numbers(pd.Series(['2020-01-01', None, 'not a date']))
+
+        assert days.dtype == np.int32
+        assert days[1] == MISSING_DAY and days[2] == MISSING_DAY
+        assert DailyActivity.from_days(days).total == 1
+
+    def test_from_counts_matches_from_days(self):
+        counts = self.activity.counts
+        daily = {self.activity.first_day + i: int(c) for i, c in enumerate(counts) if c}
+
+        assert np.array_equal(DailyActivity.from_counts(daily).counts, counts)
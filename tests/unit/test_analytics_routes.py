@@ -0,0 +1,113 @@
+import pandas as pd
+import pytest
+from flask import Flask
+from flask_login import LoginManager
+from app.routes import analytics
+from app.services.content_types import CONTENT_TYPE_COLUMN, content_types
+from app.services.dataset_schema import GAMES_SCHEMA, read_csv_typed
+from app.services.warmup import READY, WARMING
+from config import Config
+
+@pytest.fixture
+def client():
+    app = Flask(__name__, template_folder=Config.TEMPLATES_FOLDER)
+    app.config.update(LOGIN_DISABLED=True, SECRET_KEY='test')
+    LoginManager(app).user_loader(lambda user_id: None)
+    app.register_blueprint(analytics.analytics_bp, url_prefix='/analytics')
+    return app.test_client()
+
+class TestWarmupResponses:
+    @pytest.fixture(autouse=True)
+    def warming(self, monkeypatch):
+        # Pretend the warmup is already running so the request doesn't start one
+        monkeypatch.setattr(analytics.analytics_warmup, 'status', WARMING)
+
+    def test_api_endpoints_answer_json(self, client):
+        response = client.get('/analytics/api/metrics')
+
+        assert response.status_code == 503
+        assert response.get_json()['status'] == WARMING
+        assert response.headers['Retry-After'] == '5'
+
+    def test_pages_render_a_loading_page(self, client):
+        response = client.get('/analytics/games')
+
+        assert response.status_code == 503
+        assert response.mimetype == 'text/html'
+        assert response.headers['Retry-After'] == '5'
+        assert b'Loading Steam Data' in response.data
+
+class TestQueryAnalytics:
+    @pytest.fixture(autouse=True)
+    def loaded(self, monkeypatch):
+        games = pd.DataFrame({'title': ['A', 'B', 'C'], 'price_final': [0.0, 9.99, 19.99]})
+        monkeypatch.setattr(analytics.analytics_warmup, 'status', READY)
+        monkeypatch.setattr(analytics.analyzer, '_state',
+                            analytics.AnalyticsState(version=1, games_df=games, data_loaded=True))
+
+    def _post(self, client, query):
+        return client.post('/analytics/api/query-analytics', json={'query': query})
+
+    def test_valid_query(self, client):
+        response = self._post(client, {'filters': [['price_final', '>', 5]], 'limit': '10'})
+
+        assert response.status_code == 200
+        assert response.get_json()['result']['rows'] == [{'count': 2}]
+
+    @pytest.mark.parametrize('query', [
+        {'filters': [5]},
+        {'filters': [['price_final', '>']]},
+        {'filters': {'price_final': 5}},
+        {'filters': [['price_final', 'like', 5]]},
+        {'filters': [['price_final', '==', {'a': 1}]]},
+        {'filters': [['price_final', 'in', [[1], [2]]]]},
+        {'filters': [['missing', '==', 1]]},
+        {'limit': 'x'},
+        {'limit': -1},
+        {'aggregations': [['sum', 'title']]},
+        {'aggregations': [['mean', 'title']]},
+        {'aggregations': [['quantile', 'price_final', 'high']]},
+        {'group_by': [['title']]},
+    ])
+    def test_malformed_queries_are_rejected(self, client, query):
+        response = self._post(client, query)
+
+        assert response.status_code == 400
+        assert response.get_json()['success'] is False
+
+class TestSteamDeck:
+    @pytest.fixture(autouse=True)
+    def loaded(self, tmp_path, monkeypatch):
+        path = tmp_path / 'games.csv'
+        path.write_text(
+            "app_id,title,date_release,win,mac,linux,rating,positive_ratio,user_reviews,"
+            "price_final,price_original,discount,steam_deck\n"
+            "1,Deck Game,2021-01-01,true,false,false,Very Positive,95,1000,9.99,9.99,0.0,true\n"
+            "2,Desk Game,2021-02-01,true,false,false,Positive,90,500,4.99,9.99,50.0,false\n"
+            "3,Other Game,2021-03-01,true,true,false,Mixed,60,200,0.0,0.0,0.0,false\n"
+        )
+        games = read_csv_typed(str(path), GAMES_SCHEMA)
+        games[CONTENT_TYPE_COLUMN] = content_types(games)
+        self.games = games
+        monkeypatch.setattr(analytics.analyzer, '_state',
+                            analytics.AnalyticsState(version=1, games_df=games, data_loaded=True))
+
+    def test_true_false_column_reads_as_booleans(self):
+        assert self.games['steam_deck'].dtype == bool
+        top = analytics.analyzer.get_top_performing_games(3, content_type=None)
+
+        assert {game['name']: game['steam_deck'] for game in top} == \
+            {'Deck Game': True, 'Desk Game': False, 'Other Game': False}
+        assert all(type(game['steam_deck']) is bool for game in top)
+
+    def test_deck_line_only_for_compatible_games(self):
+        lines = analytics.analyzer._analyze_games_data('top games').splitlines()
+
+        assert [line for line in lines if 'Steam Deck' in line] == \
+            [line for line in lines if 'Deck Game' in line]
+        assert 'Steam Deck: Compatible' in next(line for line in lines if 'Deck Game' in line)
+
+    def test_deck_counts_use_the_boolean(self):
+        assert analytics.analyzer.get_real_time_metrics()['steam_deck_verified'] == 1
+        answer = analytics.analyzer._analyze_steam_deck('steam deck?')
+        assert 'Compatible: 1 games' in answer and 'Not compatible: 2 games' in answer
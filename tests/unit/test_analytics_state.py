@@ -0,0 +1,109 @@
+import threading
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from app.routes.analytics import AnalyticsState, SteamDataAnalyzer
+from app.services.dataset_registry import DatasetRegistry
+from app.services.dataset_snapshot import CSVSnapshotCache
+from app.services.reload_jobs import ReloadSuperseded
+from app.services.review_aggregates import ReviewAggregate
+from app.services.review_time_index import to_day
+
+class TestAnalyticsState:
+    def test_concurrent_first_calls_build_once(self):
+        state = AnalyticsState(version=1)
+        calls = []
+
+        def build():
+            calls.append(1)
+            time.sleep(0.05)
+            return {'total_games': 3}
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(state.derived('games_analysis', build)))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert all(result is results[0] for result in results)
+
+    def test_new_state_does_not_reuse_results(self):
+        old = AnalyticsState(version=1)
+        old.derived('games_analysis', lambda: {'total_games': 3})
+
+        fresh = AnalyticsState(version=2)
+
+        assert fresh.derived('games_analysis', lambda: {'total_games': 6}) == {'total_games': 6}
+        assert AnalyticsState(version=3, derived=old.derived_values('games_analysis')).derived(
+            'games_analysis', lambda: None) == {'total_games': 3}
+
+    def test_failed_build_is_retried(self):
+        state = AnalyticsState(version=1)
+
+        def fail():
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            state.derived('user_analysis', fail)
+        assert state.derived('user_analysis', lambda: {'ok': True}) == {'ok': True}
+
+class TestRefreshRace:
+    def _analyzer(self, tmp_path, monkeypatch, invalidations):
+        registry = DatasetRegistry([str(tmp_path)], CSVSnapshotCache(enabled=False))
+        analyzer = SteamDataAnalyzer()
+        analyzer.registry = registry
+
+        def build_state(snapshot):
+            # Someone invalidates the registry while this build is running
+            if invalidations:
+                invalidations.pop()
+                registry.invalidate()
+            return AnalyticsState(version=next(analyzer._versions), data_loaded=True)
+        monkeypatch.setattr(analyzer, '_build_state', build_state)
+        return analyzer, registry
+
+    def test_refresh_rebuilds_after_losing_the_swap(self, tmp_path, monkeypatch):
+        analyzer, registry = self._analyzer(tmp_path, monkeypatch, invalidations=[1])
+
+        result = analyzer._refresh()
+
+        assert result['data_version'] == analyzer.data_version
+        # v2 lost to the invalidation (v3); the rebuild (v4) went live
+        assert registry.version == 4
+
+    def test_refresh_that_keeps_losing_is_superseded(self, tmp_path, monkeypatch):
+        analyzer, registry = self._analyzer(tmp_path, monkeypatch, invalidations=[1, 1])
+
+        with pytest.raises(ReloadSuperseded):
+            analyzer._refresh()
+        assert analyzer.data_version == 0
+
+class TestReviewsBetween:
+    def test_date_range_covers_the_full_population_not_the_sample(self):
+        rng = np.random.default_rng(11)
+        n = 3000
+        reviews = pd.DataFrame({
+            'app_id': rng.integers(1, 20, n),
+            'date': (pd.to_datetime('2022-01-01') + pd.to_timedelta(rng.integers(0, 200, n), 'D')).astype(str),
+            'is_recommended': rng.random(n) < 0.6,
+            'hours': np.round(rng.exponential(20, n), 1)
+        })
+        sample = reviews.sample(300, random_state=1)
+        date_range = (to_day('2022-02-01'), to_day('2022-03-31'))
+        in_range = reviews['date'].between('2022-02-01', '2022-03-31')
+
+        analyzer = SteamDataAnalyzer()
+        analyzer._state = AnalyticsState(version=1, recommendations_df=sample,
+                                         review_aggregate=ReviewAggregate().update(reviews), data_loaded=True)
+        full = analyzer.reviews_between(date_range)
+        assert (full['reviews'], full['population'], full['source_rows']) == (int(in_range.sum()), 'full', n)
+
+        # Without the full-population aggregate the block says it comes from the sample
+        analyzer._state = AnalyticsState(version=2, recommendations_df=sample, data_loaded=True)
+        sampled = analyzer.reviews_between(date_range)
+        assert (sampled['population'], sampled['source_rows']) == ('sample', 300)
+        assert sampled['reviews'] == int(sample['date'].between('2022-02-01', '2022-03-31').sum())
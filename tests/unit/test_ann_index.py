@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from scipy import sparse
+from app.services.ann_index import IVFFlatIndex, exact_search, recall_report
+
+class TestIVFFlatIndex:
+    def setup_method(self):
+        rng = np.random.default_rng(0)
+        centers = rng.normal(size=(40, 32))
+        self.vectors = (centers[rng.integers(0, 40, 4000)] + rng.normal(scale=0.5, size=(4000, 32))).astype(np.float32)
+        self.index = IVFFlatIndex.build(self.vectors, n_lists=40, n_probe=4)
+
+    def test_probing_every_list_is_exact(self):
+        for row in (0, 17, 3999):
+            ids, scores = self.index.search(self.vectors[row], k=10, n_probe=40, exclude=[row])
+            expected_ids, expected_scores = exact_search(self.index.vectors[np.argsort(self.index.ids)],
+                                                         self.vectors[row], k=10, exclude=[row])
+            assert ids.tolist() == expected_ids.tolist()
+            assert scores == pytest.approx(expected_scores, abs=1e-5)
+            assert row not in ids
+
+    def test_recall_report(self):
+        report = recall_report(self.index, self.vectors, range(0, 4000, 40), k=10, probes=(1, 4, 40))
+
+        assert [entry['method'] for entry in report] == ['exact', 'ivf-flat', 'ivf-flat', 'ivf-flat']
+        assert report[-1]['recall'] == 1.0
+        assert report[2]['recall'] >= 0.95
+        assert report[1]['recall'] <= report[2]['recall']
+        assert all(entry['mean_ms'] >= 0 for entry in report)
+
+    def test_sparse_rows_and_edge_cases(self):
+        rows = sparse.random(300, 50, density=0.1, format='csr', random_state=1, dtype=np.float32)
+        index = IVFFlatIndex.build(rows, n_lists=5)
+        ids, scores = index.search(rows[3], k=5, n_probe=5)
+        assert ids[0] == 3 and scores[0] == pytest.approx(1.0)
+
+        assert len(IVFFlatIndex.build(np.zeros((0, 8))).search(np.ones(8))[0]) == 0
+        assert len(self.index.search(self.vectors[0], k=0)[0]) == 0
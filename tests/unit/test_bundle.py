@@ -0,0 +1,44 @@
+import gzip
+import json
+import pytest
+from app.services.bundle import BundleContext, build_bundle, encode_body, parse_parts
+
+class TestBundle:
+    def setup_method(self):
+        self.calls = []
+
+        def metrics():
+            self.calls.append('metrics')
+            return {'total_games': 3}
+
+        self.sections = {
+            'summary': lambda context: {'games': context.get('metrics', metrics)['total_games']},
+            'metrics': lambda context: context.get('metrics', metrics),
+            'broken': lambda context: 1 / 0
+        }
+
+    def test_sections_share_intermediates(self):
+        bundle = build_bundle(self.sections, ['summary', 'metrics'])
+
+        assert bundle == {'summary': {'games': 3}, 'metrics': {'total_games': 3}}
+        assert self.calls == ['metrics']
+
+    def test_failing_section_is_reported_alone(self):
+        bundle = build_bundle(self.sections, ['broken', 'metrics'], BundleContext(content_type='dlc'))
+
+        assert bundle['broken']['success'] is False
+        assert bundle['metrics'] == {'total_games': 3}
+
+    def test_parse_parts(self):
+        assert parse_parts(None, self.sections) == ['summary', 'metrics', 'broken']
+        assert parse_parts('metrics, summary,metrics', self.sections) == ['metrics', 'summary']
+        with pytest.raises(ValueError):
+            parse_parts('metrics,nope', self.sections)
+
+    def test_encode_body_gzips_when_accepted(self):
+        body = json.dumps({'rows': list(range(1000))}).encode()
+
+        compressed, encoding = encode_body(body, 'br, gzip;q=0.8')
+        assert encoding == 'gzip' and gzip.decompress(compressed) == body
+        assert encode_body(body, 'gzip;q=0') == (body, None)
+        assert encode_body(b'{}', 'gzip') == (b'{}', None)
@@ -0,0 +1,117 @@
+import mmap
+import os
+import numpy as np
+import pandas as pd
+import pytest
+import app.services.collaborative as collaborative
+from app.services.collaborative import ItemItemCF, load_or_build_model
+
+def _mapped(array) -> bool:
+    """True if ``array`` is a view of a memory-mapped file"""
+    while array is not None and not isinstance(array, mmap.mmap):
+        array = getattr(array, 'base', None)
+    return array is not None
+
+class TestItemItemCF:
+    def setup_method(self):
+        rng = np.random.default_rng(3)
+        n = 6000
+        self.reviews = pd.DataFrame({
+            'user_id': rng.integers(0, 500, n),
+            'app_id': 1000 + rng.zipf(1.6, n) % 120,
+            'is_recommended': rng.random(n) < 0.8,
+            'hours': np.where(rng.random(n) < 0.05, np.nan, rng.exponential(20, n))
+        })
+        self.model = ItemItemCF.build([self.reviews.iloc[i:i + 1000] for i in range(0, n, 1000)], top_k=10)
+
+    def _dense(self):
+        positive = self.reviews[self.reviews['is_recommended']]
+        weights = 1 + np.log1p(positive['hours'].fillna(0))
+        matrix = pd.crosstab(positive['user_id'], positive['app_id'], weights, aggfunc='sum').fillna(0)
+        matrix.loc[:, (matrix > 0).sum() < 2] = 0
+        items = matrix.to_numpy().T
+        norms = np.linalg.norm(items, axis=1, keepdims=True)
+        items = np.divide(items, norms, out=np.zeros_like(items), where=norms > 0)
+        similarity = items @ items.T
+        np.fill_diagonal(similarity, 0)
+        return matrix, similarity
+
+    def test_neighbours_match_dense_cosine(self):
+        matrix, similarity = self._dense()
+        assert list(self.model.app_ids) == list(matrix.columns)
+        for column in range(0, len(matrix.columns), 5):
+            expected = np.sort(similarity[column])[::-1][:10]
+            expected = expected[expected > 0]
+            neighbours = self.model.similar_games(int(matrix.columns[column]), top_n=10)
+            assert [score for _, score in neighbours] == pytest.approx(expected, abs=1e-5)
+
+    def test_user_recommendations_exclude_liked_games(self):
+        user_id = int(self.reviews['user_id'].iloc[0])
+        liked = set(self.reviews.loc[(self.reviews['user_id'] == user_id) & self.reviews['is_recommended'], 'app_id'])
+        recommended = self.model.recommend_for_user(user_id, top_n=5)
+
+        assert 0 < len(recommended) <= 5
+        assert not liked & {app_id for app_id, _ in recommended}
+        scores = [score for _, score in recommended]
+        assert scores == sorted(scores, reverse=True)
+        assert self.model.recommend_for_user(str(user_id), top_n=5) == recommended
+        assert self.model.recommend_for_user(10 ** 9) == []
+        assert self.model.recommend_for_user('user_1') == []
+
+    def test_recommend_for_games(self):
+        liked = [int(a) for a in self.model.app_ids[:3]]
+        recommended = self.model.recommend_for_games(liked + [-5], top_n=4)
+
+        assert len(recommended) == 4
+        assert not set(liked) & {app_id for app_id, _ in recommended}
+        assert self.model.recommend_for_games([-5]) == []
+
+    def test_from_csv_matches_in_memory_build(self, tmp_path):
+        path = tmp_path / 'recommendations.csv'
+        self.reviews.assign(is_recommended=self.reviews['is_recommended'].map({True: 'true', False: 'false'})
+                            ).to_csv(path, index=False)
+        loaded = ItemItemCF.from_csv(str(path), chunksize=700, top_k=10)
+
+        assert loaded.describe() == self.model.describe()
+        # hours are read back as float32, so scores agree to float precision
+        assert loaded.neighbours.toarray() == pytest.approx(self.model.neighbours.toarray(), abs=1e-5)
+
+    def _csv(self, tmp_path):
+        path = tmp_path / 'recommendations.csv'
+        self.reviews.to_csv(path, index=False)
+        return str(path)
+
+    def test_saved_model_reloads_with_same_recommendations(self, tmp_path):
+        model = ItemItemCF.from_csv(self._csv(tmp_path), chunksize=700, top_k=10)
+        loaded = ItemItemCF.load(model.save(str(tmp_path / 'models')))
+
+        assert _mapped(loaded.neighbours.data) and not _mapped(model.neighbours.data)
+        assert loaded.source == model.source
+        assert loaded.describe() == model.describe()
+        for user_id in self.reviews['user_id'].unique()[:25]:
+            assert loaded.recommend_for_user(user_id, top_n=5) == model.recommend_for_user(user_id, top_n=5)
+        for app_id in model.app_ids[:10]:
+            assert loaded.similar_games(app_id, top_n=5) == model.similar_games(app_id, top_n=5)
+        liked = [int(a) for a in model.app_ids[:3]]
+        assert loaded.recommend_for_games(liked) == model.recommend_for_games(liked)
+
+    def test_load_or_build_maps_the_saved_model(self, tmp_path, monkeypatch):
+        csv_path, model_dir = self._csv(tmp_path), str(tmp_path / 'models')
+        first = load_or_build_model(csv_path, model_dir, chunksize=700, top_k=10)
+
+        def rebuild(*args, **kwargs):
+            raise AssertionError("model was rebuilt")
+        monkeypatch.setattr(ItemItemCF, 'from_csv', rebuild)
+        second = load_or_build_model(csv_path, model_dir, chunksize=700, top_k=10)
+
+        assert _mapped(first.interactions.data) and _mapped(second.interactions.data)
+        assert second.recommend_for_user(self.reviews['user_id'].iloc[0]) == \
+            first.recommend_for_user(self.reviews['user_id'].iloc[0])
+
+        # A changed review log gets its own artifact
+        monkeypatch.undo()
+        self.reviews.iloc[:3000].to_csv(csv_path, index=False)
+        third = load_or_build_model(csv_path, model_dir, chunksize=700, top_k=10)
+        assert third.source != first.source
+        assert len([name for name in os.listdir(model_dir) if name.startswith('collaborative-')]) == \
+            collaborative.MODEL_ARTIFACTS_KEPT
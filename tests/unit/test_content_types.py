@@ -0,0 +1,24 @@
+import pandas as pd
+import pytest
+from app.services.content_types import CONTENT_TYPES, classify_titles, content_types, parse_content_type
+
+class TestContentTypes:
+    def test_titles_are_classified_by_whole_words(self):
+        titles = pd.Series(['Ghost Recon', 'Half-Life OST', 'Witcher 3 Art Book', 'Skyrim - Dawnguard DLC',
+                            'Humble Bundle', 'Backpack Hero', 'Map Pack', 'Season Pass', None])
+
+        types = classify_titles(titles)
+
+        assert list(types.categories) == list(CONTENT_TYPES)
+        assert types.tolist() == ['game', 'soundtrack', 'artbook', 'dlc', 'bundle', 'game', 'dlc', 'dlc', 'game']
+
+    def test_existing_column_is_reused(self):
+        games = pd.DataFrame({'title': ['Map Pack'], 'content_type': pd.Categorical(['game'], categories=CONTENT_TYPES)})
+
+        assert content_types(games).tolist() == ['game']
+
+    def test_filter_values(self):
+        assert parse_content_type('all') is None
+        assert parse_content_type('DLC') == 'dlc'
+        with pytest.raises(ValueError):
+            parse_content_type('video')
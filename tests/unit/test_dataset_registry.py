@@ -0,0 +1,111 @@
+import time
+import pandas as pd
+from app.services.dataset_registry import DatasetRegistry
+from app.services.dataset_snapshot import CSVSnapshotCache
+from app.services.reload_jobs import ReloadJobManager, ReloadSuperseded
+
+class TestDatasetRegistry:
+    def setup_method(self):
+        self.frame = pd.DataFrame({'app_id': [1, 2, 3], 'title': ['A', 'B', 'C']})
+
+    def _registry(self, tmp_path):
+        self.frame.to_csv(tmp_path / 'games.csv', index=False)
+        registry = DatasetRegistry([str(tmp_path)], CSVSnapshotCache(enabled=False))
+        registry.register('games', 'games.csv')
+        return registry
+
+    def test_frames_are_parsed_once_and_shared(self, tmp_path):
+        registry = self._registry(tmp_path)
+
+        assert registry.get('games') is registry.get('games')
+        assert registry.describe()[0]['rows'] == 3
+
+    def test_swap_leaves_old_snapshot_untouched(self, tmp_path):
+        registry = self._registry(tmp_path)
+        old = registry.snapshot
+        assert len(registry.get('games')) == 3
+
+        pd.concat([self.frame, self.frame]).to_csv(tmp_path / 'games.csv', index=False)
+        fresh = registry.build_snapshot()
+        assert registry.version == old.version
+
+        assert registry.swap(fresh)
+        assert registry.version == old.version + 1
+        assert len(registry.get('games')) == 6
+        assert len(registry.get('games', old)) == 3
+
+    def test_stale_snapshot_is_not_swapped_in(self, tmp_path):
+        registry = self._registry(tmp_path)
+        first = registry.build_snapshot()
+        second = registry.build_snapshot()
+
+        assert registry.swap(second)
+        assert not registry.swap(first)
+        assert registry.version == second.version
+
+    def test_derived_values_are_built_once_per_frame(self, tmp_path):
+        registry = self._registry(tmp_path)
+        calls = []
+
+        def build(df):
+            calls.append(1)
+            return len(df)
+
+        assert registry.derived('games', 'rows', build) == 3
+        assert registry.derived('games', 'rows', build) == 3
+        assert len(calls) == 1
+
+    def test_rewritten_source_marks_frame_stale(self, tmp_path):
+        registry = self._registry(tmp_path)
+        registry.get('games')
+        assert not registry.is_stale('games')
+
+        pd.concat([self.frame, self.frame]).to_csv(tmp_path / 'games.csv', index=False)
+
+        assert registry.is_stale('games')
+
+class TestReloadJobManager:
+    def test_job_reports_result(self):
+        manager = ReloadJobManager()
+
+        job = manager.submit(lambda: {'data_version': 2})
+        for _ in range(100):
+            status = manager.get(job['job_id'])
+            if status['status'] == 'completed':
+                break
+            time.sleep(0.01)
+
+        assert status['status'] == 'completed'
+        assert status['result'] == {'data_version': 2}
+
+    def test_failed_job_keeps_error(self):
+        manager = ReloadJobManager()
+
+        def fail():
+            raise RuntimeError("boom")
+
+        job = manager.submit(fail)
+        for _ in range(100):
+            status = manager.get(job['job_id'])
+            if status['status'] == 'failed':
+                break
+            time.sleep(0.01)
+
+        assert status['error'] == 'boom'
+        assert manager.get('missing') is None
+
+    def test_superseded_job_is_not_completed(self):
+        manager = ReloadJobManager()
+
+        def superseded():
+            raise ReloadSuperseded("newer generation")
+
+        job = manager.submit(superseded)
+        for _ in range(100):
+            status = manager.get(job['job_id'])
+            if status['status'] == 'superseded':
+                break
+            time.sleep(0.01)
+
+        assert status['status'] == 'superseded'
+        assert status['result'] is None
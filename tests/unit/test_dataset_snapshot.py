@@ -0,0 +1,94 @@
+import os
+import pytest
+import pandas as pd
+from app.services.dataset_schema import memory_report, read_csv_typed
+from app.services.dataset_snapshot import CSVSnapshotCache, PARQUET_AVAILABLE
+
+pytestmark = pytest.mark.skipif(not PARQUET_AVAILABLE, reason="pyarrow not installed")
+
+class TestCSVSnapshotCache:
+    def setup_method(self):
+        self.frame = pd.DataFrame({
+            'app_id': [10, 20, 30],
+            'title': ['Game A', 'Game B Soundtrack', 'Game C'],
+            'price_final': [9.99, 0.0, 19.99]
+        })
+
+    def _write_csv(self, tmp_path):
+        csv_path = tmp_path / 'games.csv'
+        self.frame.to_csv(csv_path, index=False)
+        return str(csv_path)
+
+    def test_first_load_writes_snapshot(self, tmp_path):
+        csv_path = self._write_csv(tmp_path)
+        cache = CSVSnapshotCache(str(tmp_path / 'snapshots'))
+
+        df = cache.load(csv_path)
+
+        assert len(df) == 3
+        files = os.listdir(tmp_path / 'snapshots')
+        assert any(f.endswith('.parquet') for f in files)
+        assert any(f.endswith('.json') for f in files)
+
+    def test_warm_load_skips_csv_parse(self, tmp_path, monkeypatch):
+        csv_path = self._write_csv(tmp_path)
+        cache = CSVSnapshotCache(str(tmp_path / 'snapshots'))
+        cache.load(csv_path)
+
+        def fail_read_csv(*args, **kwargs):
+            raise AssertionError("CSV should not be re-parsed")
+
+        monkeypatch.setattr(pd, 'read_csv', fail_read_csv)
+        df = cache.load(csv_path)
+        assert df['title'].tolist() == self.frame['title'].tolist()
+
+    def test_touched_but_unchanged_source_reuses_snapshot(self, tmp_path, monkeypatch):
+        csv_path = self._write_csv(tmp_path)
+        cache = CSVSnapshotCache(str(tmp_path / 'snapshots'))
+        cache.load(csv_path)
+
+        stat = os.stat(csv_path)
+        os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        monkeypatch.setattr(pd, 'read_csv', lambda *a, **k: pytest.fail("CSV re-parsed"))
+
+        assert len(cache.load(csv_path)) == 3
+
+    def test_changed_source_rebuilds_snapshot(self, tmp_path):
+        csv_path = self._write_csv(tmp_path)
+        cache = CSVSnapshotCache(str(tmp_path / 'snapshots'))
+        cache.load(csv_path)
+
+        pd.concat([self.frame, self.frame]).to_csv(csv_path, index=False)
+
+        assert len(cache.load(csv_path)) == 6
+
+    def test_read_options_get_separate_snapshots(self, tmp_path):
+        csv_path = self._write_csv(tmp_path)
+        cache = CSVSnapshotCache(str(tmp_path / 'snapshots'))
+
+        assert len(cache.load(csv_path, nrows=2)) == 2
+        assert len(cache.load(csv_path)) == 3
+        assert list(cache.load(csv_path, usecols=['app_id']).columns) == ['app_id']
+
+    def test_schema_dtypes_survive_snapshot(self, tmp_path):
+        csv_path = self._write_csv(tmp_path)
+        cache = CSVSnapshotCache(str(tmp_path / 'snapshots'))
+        schema = {'app_id': 'uint32', 'title': 'category', 'price_final': 'float32'}
+
+        cold = cache.load(csv_path, schema=schema)
+        warm = cache.load(csv_path, schema=schema)
+
+        for df in (cold, warm):
+            assert df['app_id'].dtype == 'uint32'
+            assert df['price_final'].dtype == 'float32'
+            assert isinstance(df['title'].dtype, pd.CategoricalDtype)
+
+    def test_memory_report_compares_against_default_dtypes(self, tmp_path):
+        csv_path = self._write_csv(tmp_path)
+        typed = read_csv_typed(csv_path, {'app_id': 'uint32', 'price_final': 'float32'})
+
+        report = memory_report(typed)
+
+        assert report['columns']['app_id']['bytes'] == 3 * 4
+        assert report['columns']['app_id']['default_bytes'] == 3 * 8
+        assert report['total_bytes'] < report['default_total_bytes']
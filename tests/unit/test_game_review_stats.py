@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+from app.services.game_review_stats import GameReviewStats, game_positions
+from app.services.review_aggregates import ReviewAggregate
+
+class TestGameReviewStats:
+    def setup_method(self):
+        rng = np.random.default_rng(3)
+        n = 3000
+        self.games = pd.DataFrame({'app_id': [30, 10, 20, 40, 10], 'title': ['C', 'A', 'B', 'D', 'A again']})
+        self.reviews = pd.DataFrame({
+            'app_id': rng.choice([10, 20, 30, 99], n),
+            'date': (pd.to_datetime('2022-01-01') + pd.to_timedelta(rng.integers(0, 300, n), 'D')).astype(str),
+            'is_recommended': rng.random(n) < 0.6,
+            'hours': np.round(rng.exponential(20, n), 1)
+        })
+        self.expected = self.reviews.groupby('app_id').agg(
+            count=('hours', 'size'), rate=('is_recommended', 'mean'), mean=('hours', 'mean'),
+            median=('hours', 'median'), first=('date', 'min'), last=('date', 'max'))
+
+    def _check(self, stats):
+        assert stats.columns['review_count'].tolist() == [self.expected.loc[30, 'count'],
+                                                          self.expected.loc[10, 'count'],
+                                                          self.expected.loc[20, 'count'], 0, 0]
+        record = stats.record(1)
+        assert record['recommend_rate'] == round(self.expected.loc[10, 'rate'] * 100, 1)
+        assert record['mean_hours'] == round(self.expected.loc[10, 'mean'], 1)
+        assert record['median_hours'] == round(self.expected.loc[10, 'median'], 1)
+        assert (record['first_review'], record['last_review']) == tuple(self.expected.loc[10, ['first', 'last']])
+        assert stats.record(3) == {'review_count': 0, 'recommend_rate': None, 'mean_hours': None,
+                                   'median_hours': None, 'first_review': None, 'last_review': None}
+
+    def test_aligned_to_games_rows(self):
+        self._check(GameReviewStats.build(self.games, self.reviews))
+
+    def test_full_population_aggregate_matches_rows(self):
+        aggregate = ReviewAggregate()
+        for start in range(0, len(self.reviews), 700):
+            aggregate.merge(ReviewAggregate().update(self.reviews.iloc[start:start + 700]))
+        restored = ReviewAggregate.from_dict(aggregate.to_dict())
+
+        self._check(GameReviewStats.build(self.games, self.reviews, restored))
+
+    def test_game_positions(self):
+        assert game_positions(self.games, [10, 40, 77]).tolist() == [1, 3, -1]
+
+    def test_ranking_frame_masks_thin_rates(self):
+        stats = GameReviewStats.build(self.games, self.reviews.iloc[:12])
+        frame = stats.ranking_frame()
+
+        assert frame['recommend_rate'].isna().all()
+        assert frame['review_count'].sum() == sum(app in (10, 20, 30) for app in self.reviews['app_id'][:12])
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+from app.services.games_cube import GamesCube, ratio_bands
+
+class TestGamesCube:
+    def setup_method(self):
+        rng = np.random.default_rng(7)
+        n = 500
+        prices = rng.choice([0.0, 2.99, 5.0, 9.99, 19.99, 29.99, 39.99, 59.99, np.nan], n)
+        self.games = pd.DataFrame({
+            'title': rng.choice(['Game', 'Game Soundtrack', 'Game DLC Pack', 'Other Game'], n),
+            'price_final': prices,
+            'positive_ratio': rng.integers(0, 101, n).astype('float64'),
+            'discount': rng.choice([0.0, 0.0, 25.0, 50.0], n),
+            'rating': rng.choice(['Very Positive', 'Mixed', None], n),
+            'steam_deck': rng.choice([True, False], n),
+            'date_release': pd.to_datetime('2015-01-01') + pd.to_timedelta(rng.integers(0, 3000, n), 'D'),
+            'user_reviews': rng.integers(10, 5000, n)
+        })
+        self.cube = GamesCube.build(self.games)
+
+    def test_counts_match_row_filters(self):
+        games, cube = self.games, self.cube
+        price = games['price_final']
+
+        assert cube.count() == len(games)
+        assert cube.count(price_bucket='free') == (price == 0).sum()
+        assert cube.count(price_bucket=['0-5', '5-10']) == ((price > 0) & (price <= 10)).sum()
+        assert cube.count(price_bucket=['30-40', '40+']) == (price > 30).sum()
+        assert cube.count(ratio_band=ratio_bands(40, 69)) == games['positive_ratio'].between(40, 69).sum()
+        assert cube.count(steam_deck='True', discounted=True) == (games['steam_deck'] & (games['discount'] > 0)).sum()
+        assert cube.counts_by('release_year')[2016] == (games['date_release'].dt.year == 2016).sum()
+
+    def test_stats_match_row_aggregates(self):
+        games, cube = self.games, self.cube
+        real = ~games['title'].str.contains('Soundtrack|DLC', case=False)
+
+        prices = cube.stats('price_final')
+        assert prices['count'] == games['price_final'].count()
+        assert prices['mean'] == pytest.approx(games['price_final'].mean())
+        assert prices['max'] == games['price_final'].max()
+        assert cube.stats('positive_ratio', content_type='game')['mean'] == pytest.approx(games.loc[real, 'positive_ratio'].mean())
+        assert cube.count(content_type=['dlc', 'soundtrack']) == (~real).sum()
+
+    def test_misaligned_ratio_range_is_rejected(self):
+        with pytest.raises(ValueError):
+            ratio_bands(30, 60)
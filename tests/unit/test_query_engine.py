@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+from app.services.games_cube import GamesCube
+from app.services.query_engine import Query, QueryEngine, QueryError
+
+class TestQueryEngine:
+    def setup_method(self):
+        rng = np.random.default_rng(3)
+        n = 800
+        self.games = pd.DataFrame({
+            'title': rng.choice(['Game', 'Game Soundtrack', 'Map Pack'], n),
+            'price_final': rng.choice([0.0, 4.99, 9.99, 24.99, 39.99, 59.99], n),
+            'positive_ratio': rng.integers(0, 101, n),
+            'discount': rng.choice([0.0, 0.0, 50.0], n),
+            'rating': pd.Categorical(rng.choice(['Positive', 'Mixed', 'Negative'], n)),
+            'steam_deck': pd.Categorical(rng.choice(['True', 'False'], n))
+        })
+        self.reviews = pd.DataFrame({'hours': rng.exponential(40, 2000), 'is_recommended': rng.random(2000) < 0.7})
+        self.cube = GamesCube.build(self.games)
+        self.engine = QueryEngine({'games': self.games, 'recommendations': self.reviews}, cube=lambda: self.cube)
+        self.scan = QueryEngine({'games': self.games, 'recommendations': self.reviews})
+
+    def test_cube_and_scan_agree(self):
+        query = {
+            'dataset': 'games',
+            'filters': [['price_final', '>', 10], ['positive_ratio', 'between', [40, 69]], ['discount', '>', 0]],
+            'group_by': ['rating'],
+            'aggregations': [['count'], ['mean', 'price_final'], ['max', 'positive_ratio']],
+            'order_by': 'count'
+        }
+
+        from_cube = self.engine.execute(query)
+        scanned = self.scan.execute(query)
+
+        assert from_cube['engine'] == 'cube' and scanned['engine'] == 'scan'
+        assert [row['rating'] for row in from_cube['rows']] == [row['rating'] for row in scanned['rows']]
+        for cube_row, scan_row in zip(from_cube['rows'], scanned['rows']):
+            assert cube_row['count'] == scan_row['count']
+            assert cube_row['mean_price_final'] == pytest.approx(scan_row['mean_price_final'])
+            assert cube_row['max_positive_ratio'] == scan_row['max_positive_ratio']
+
+    def test_equivalent_queries_share_a_cached_result(self):
+        first = self.engine.execute({'dataset': 'recommendations', 'filters': [['hours', '>', 100.0]],
+                                     'aggregations': [['quantile', 'hours', 0.9]]})
+        again = self.engine.execute({'dataset': 'recommendations', 'filters': [{'column': 'hours', 'op': '>', 'value': 100}],
+                                     'aggregations': [{'func': 'quantile', 'column': 'hours', 'q': 0.9}]})
+
+        assert not first['cached'] and again['cached']
+        assert again['rows'] == first['rows']
+        assert first['rows'][0]['p90_hours'] == pytest.approx(self.reviews.loc[self.reviews['hours'] > 100, 'hours'].quantile(0.9))
+
+    def test_invalid_queries_are_rejected(self):
+        with pytest.raises(QueryError):
+            Query.from_dict({'dataset': 'games', 'aggregations': [['variance', 'price_final']]})
+        with pytest.raises(QueryError):
+            self.engine.execute({'dataset': 'games', 'filters': [['genre', '==', 'RPG']]})
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+from app.services.ranking_index import RankingIndex
+
+class TestRankingIndex:
+    def setup_method(self):
+        rng = np.random.default_rng(11)
+        n = 3000
+        self.games = pd.DataFrame({
+            'positive_ratio': rng.integers(0, 101, n).astype('float64'),
+            'user_reviews': rng.integers(10, 10000, n),
+            'price_final': rng.choice([0.0, 4.99, 9.99, 19.99, np.nan], n),
+            'date_release': (pd.to_datetime('2010-01-01') + pd.to_timedelta(rng.integers(0, 4000, n), 'D')).astype(str)
+        })
+        self.index = RankingIndex.build(self.games)
+
+    def test_top_matches_nlargest_with_ties(self):
+        top = self.index.top('positive_ratio', 25)
+
+        assert self.games.iloc[top].index.tolist() == self.games.nlargest(25, 'positive_ratio').index.tolist()
+        cheapest = self.index.top('price', 10, ascending=True)
+        assert self.games.iloc[cheapest].index.tolist() == self.games.nsmallest(10, 'price_final').index.tolist()
+
+    def test_filtered_top_walks_the_order(self):
+        mask = (self.games['user_reviews'] > 9000).to_numpy()
+
+        top = self.index.top('positive_ratio', 5, mask)
+
+        expected = self.games[mask].nlargest(5, 'positive_ratio').index.tolist()
+        assert self.games.iloc[top].index.tolist() == expected
+
+    def test_missing_values_are_not_ranked(self):
+        order = self.index.order('price')
+
+        assert len(order) == self.games['price_final'].notna().sum()
+        latest = self.games.iloc[self.index.top('date_release', 1)]['date_release'].iloc[0]
+        assert latest == self.games['date_release'].max()
@@ -0,0 +1,144 @@
+import os
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+from app.services.recommender import Recommender, top_k_similarities
+from config import Config
+
+class TestRecommender:
+    def setup_method(self):
+        rng = np.random.default_rng(0)
+        words = [f"tag{i}" for i in range(60)]
+        self.games = [{'id': 100 + i, 'name': f"Game {i}", 'rating': 0, 'price': 0,
+                       'features': ' '.join(rng.choice(words, rng.integers(0, 6)))}
+                      for i in range(400)]
+        self.recommender = Recommender(top_k=10, block_size=64)
+        self.recommender.fit(self.games)
+        tfidf = TfidfVectorizer(stop_words='english', max_features=1000).fit_transform(
+            [g['features'] for g in self.games])
+        self.dense = cosine_similarity(tfidf)
+        np.fill_diagonal(self.dense, -1)
+
+    def test_top_k_matches_dense_similarities(self):
+        model = self.recommender.similarity_matrix
+        assert model.shape == (400, 400)
+        for row in range(0, 400, 7):
+            start, end = model.indptr[row:row + 2]
+            expected = np.sort(self.dense[row])[::-1][:10]
+            expected = expected[expected > 0]
+            assert row not in model.indices[start:end]
+            assert model.data[start:end] == pytest.approx(expected, abs=1e-5)
+
+    def test_similar_games_shape(self):
+        similar = self.recommender.get_similar_games(105, top_n=3)
+        assert len(similar) <= 3
+        assert all({'id', 'name', 'features', 'similarity_score'} <= set(game) for game in similar)
+        assert [g['similarity_score'] for g in similar] == sorted((g['similarity_score'] for g in similar), reverse=True)
+        assert self.recommender.get_similar_games(-1) == []
+
+    def test_tiny_inputs(self):
+        assert top_k_similarities(np.zeros((0, 3))).shape == (0, 0)
+        assert top_k_similarities(np.ones((1, 3))).nnz == 0
+
+    def test_results_are_fresh_copies(self):
+        first = self.recommender.get_similar_games(105, top_n=3)
+        first[0]['similarity_score'] = -1
+
+        assert self.recommender.get_similar_games(105, top_n=3)[0]['similarity_score'] > 0
+        assert 'similarity_score' not in self.recommender.game_features[0]
+        with pytest.raises(TypeError):
+            self.recommender.game_features[0]['name'] = 'changed'
+
+    def test_batch_matches_single_lookups(self):
+        game_ids = [105, -1, 100, 399 + 100, 105]
+        batch = self.recommender.get_similar_games_batch(game_ids, top_n=4)
+
+        assert set(batch) == {105, -1, 100, 499}
+        for game_id in game_ids:
+            single = self.recommender.get_similar_games(game_id, top_n=4)
+            assert [g['id'] for g in batch[game_id]] == [g['id'] for g in single]
+            assert [g['similarity_score'] for g in batch[game_id]] == pytest.approx(
+                [g['similarity_score'] for g in single])
+
+class TestRecommenderArtifact:
+    def setup_method(self):
+        rng = np.random.default_rng(1)
+        words = [f"tag{i}" for i in range(40)]
+        self.games = [{'id': 10 + i, 'name': f"Game {i}", 'rating': 4.5, 'price': 9.99,
+                       'features': ' '.join(rng.choice(words, rng.integers(1, 6)))}
+                      for i in range(120)]
+
+    def test_save_and_load_round_trip(self, tmp_path):
+        built = Recommender(top_k=8, model_dir=str(tmp_path))
+        built.fit(self.games, data_version='120:129:2024-01-01')
+        path = built.save()
+
+        loaded = Recommender(top_k=8, model_dir=str(tmp_path))
+        assert loaded.load(path)
+        assert loaded.data_version == '120:129:2024-01-01'
+        # Arrays are read-only views of the mapped files, not copies
+        assert not loaded.similarity_matrix.indices.flags.writeable
+        assert not loaded.similarity_matrix.data.flags.owndata
+        assert loaded.get_similar_games_batch([10, 55, 129]) == built.get_similar_games_batch([10, 55, 129])
+        texts = ['tag1 tag7 tag30', 'unknown words']
+        assert (loaded.model.vectorizer.transform(texts) != built.model.vectorizer.transform(texts)).nnz == 0
+
+    def test_load_rejects_other_settings(self, tmp_path):
+        built = Recommender(top_k=8, model_dir=str(tmp_path))
+        built.fit(self.games, data_version='v1')
+        path = built.save()
+
+        assert not Recommender(top_k=5).load(path)
+        assert not Recommender(top_k=8).load(str(tmp_path / 'missing'))
+
+    def test_rebuilds_only_when_games_table_changes(self, tmp_path, monkeypatch):
+        import app.services.recommender as recommender_module
+        version = {'value': 'v1'}
+        monkeypatch.setattr(recommender_module, 'games_table_version', lambda: version['value'])
+        builds = []
+
+        def build(recommender, data_version=None):
+            builds.append(data_version)
+            recommender.fit(self.games, data_version)
+            return True
+        monkeypatch.setattr(Recommender, 'build_recommendation_model', build)
+
+        first = Recommender(top_k=8, model_dir=str(tmp_path))
+        first_path = first.load_or_build()
+        worker = Recommender(top_k=8, model_dir=str(tmp_path))
+        assert worker.load_or_build() == first_path
+        assert worker.load_or_build() == first_path
+        assert builds == ['v1']
+
+        version['value'] = 'v2'
+        second_path = worker.load_or_build()
+        assert builds == ['v1', 'v2'] and second_path != first_path
+        version['value'] = 'v3'
+        worker.load_or_build()
+        # Only the newest artifacts are kept
+        assert sorted(p.name for p in tmp_path.iterdir()) == sorted(
+            [os.path.basename(second_path), os.path.basename(recommender_module.model_artifact_path(str(tmp_path), 'v3'))])
+
+class TestMoreLikeThis:
+    def setup_method(self):
+        rng = np.random.default_rng(2)
+        words = [f"tag{i}" for i in range(80)]
+        self.games = [{'id': i, 'name': f"Game {i}", 'features': ' '.join(rng.choice(words, rng.integers(1, 8)))}
+                      for i in range(600)]
+        self.recommender = Recommender(top_k=10)
+        self.recommender.fit(self.games)
+
+    def test_exact_and_ann_search_agree_with_all_lists_probed(self, monkeypatch):
+        exact = self.recommender.more_like_this('tag3 tag7', game_ids=[5], top_n=8)
+        assert 0 < len(exact) <= 8 and 5 not in [g['id'] for g in exact]
+
+        monkeypatch.setattr(Config, 'RECOMMENDER_ANN_MIN_GAMES', 1)
+        index = self.recommender.ann_index()
+        approximate = self.recommender.more_like_this('tag3 tag7', game_ids=[5], top_n=8, n_probe=index.n_lists)
+        assert [g['similarity_score'] for g in approximate] == pytest.approx([g['similarity_score'] for g in exact], abs=1e-5)
+        assert self.recommender.ann_index() is index
+
+    def test_unknown_query(self):
+        assert self.recommender.more_like_this('nothing matches this') == []
+        assert self.recommender.more_like_this(game_ids=[-1]) == []
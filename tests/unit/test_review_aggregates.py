@@ -0,0 +1,112 @@
+import pytest
+import numpy as np
+import pandas as pd
+from app.services.review_aggregates import ReviewAggregate, ReviewLogIngestor, aggregate_reviews, count_csv_rows
+
+@pytest.fixture
+def reviews():
+    rng = np.random.default_rng(7)
+    n = 5000
+    return pd.DataFrame({
+        'app_id': rng.integers(1, 50, n),
+        'date': pd.to_datetime('2020-01-01') + pd.to_timedelta(rng.integers(0, 900, n), 'D'),
+        'is_recommended': rng.random(n) < 0.75,
+        'hours': np.round(rng.exponential(40, n), 1),
+        'user_id': rng.integers(0, 800, n)
+    })
+
+class TestReviewAggregate:
+    def test_matches_full_dataframe(self, reviews):
+        aggregate = ReviewAggregate().update(reviews)
+
+        expected_monthly = reviews.set_index('date').resample('ME').size()
+        assert aggregate.monthly_activity().tolist() == expected_monthly.tolist()
+        assert aggregate.daily_activity().monthly().tolist() == expected_monthly.tolist()
+        assert aggregate.positive_rate == pytest.approx(reviews['is_recommended'].mean() * 100)
+        assert aggregate.hours_mean == pytest.approx(reviews['hours'].mean())
+        assert aggregate.playtime_buckets['casual_players'] == int((reviews['hours'] <= 10).sum())
+        assert aggregate.playtime_buckets['hardcore_players'] == int((reviews['hours'] > 50).sum())
+
+    def test_chunked_merge_equals_single_pass(self, reviews):
+        whole = ReviewAggregate().update(reviews)
+        merged = ReviewAggregate()
+        for start in range(0, len(reviews), 700):
+            merged.merge(ReviewAggregate().update(reviews.iloc[start:start + 700]))
+
+        assert merged.monthly_counts == whole.monthly_counts
+        assert merged.daily_counts == whole.daily_counts
+        assert merged.playtime_buckets == whole.playtime_buckets
+        assert merged.total_rows == whole.total_rows
+        assert merged.hours_sum == pytest.approx(whole.hours_sum)
+
+    def test_round_trips_through_dict(self, reviews):
+        aggregate = ReviewAggregate().update(reviews)
+        restored = ReviewAggregate.from_dict(aggregate.to_dict())
+
+        assert restored.monthly_activity().equals(aggregate.monthly_activity())
+        assert restored.positive_rate == aggregate.positive_rate
+
+    def test_streams_csv_in_chunks(self, reviews, tmp_path):
+        csv_path = tmp_path / 'recommendations.csv'
+        reviews.to_csv(csv_path, index=False)
+
+        aggregate = aggregate_reviews(str(csv_path), chunksize=512)
+
+        assert aggregate.total_rows == len(reviews)
+        assert count_csv_rows(str(csv_path), chunksize=512) == len(reviews)
+        assert aggregate.recommended == int(reviews['is_recommended'].sum())
+
+class TestReviewLogIngestor:
+    def test_appended_rows_match_full_rebuild(self, reviews, tmp_path):
+        csv_path = tmp_path / 'recommendations.csv'
+        reviews.iloc[:3000].to_csv(csv_path, index=False)
+        ingestor = ReviewLogIngestor(str(csv_path), str(tmp_path / 'state.json'), chunksize=512)
+        assert ingestor.refresh().total_rows == 3000
+
+        reviews.iloc[3000:].to_csv(csv_path, mode='a', header=False, index=False)
+        resumed = ReviewLogIngestor(str(csv_path), str(tmp_path / 'state.json'), chunksize=512)
+        aggregate = resumed.refresh()
+
+        full = aggregate_reviews(str(csv_path))
+        assert aggregate.total_rows == len(reviews)
+        assert aggregate.monthly_counts == full.monthly_counts
+        assert aggregate.game_reviews == full.game_reviews
+        assert aggregate.game_recommended == full.game_recommended
+
+    def test_half_written_row_waits_for_next_refresh(self, reviews, tmp_path):
+        csv_path = tmp_path / 'recommendations.csv'
+        reviews.iloc[:100].to_csv(csv_path, index=False)
+        ingestor = ReviewLogIngestor(str(csv_path))
+        first = ingestor.refresh()
+
+        row = reviews.iloc[100:101].to_csv(header=False, index=False)
+        with open(csv_path, 'a') as f:
+            f.write(row[:5])
+        assert ingestor.refresh().total_rows == 100
+        with open(csv_path, 'a') as f:
+            f.write(row[5:])
+
+        assert ingestor.refresh().total_rows == 101
+        assert first.total_rows == 100
+
+    def test_rewritten_file_is_reaggregated(self, reviews, tmp_path):
+        csv_path = tmp_path / 'recommendations.csv'
+        reviews.to_csv(csv_path, index=False)
+        ingestor = ReviewLogIngestor(str(csv_path))
+        ingestor.refresh()
+
+        reviews.iloc[:10].to_csv(csv_path, index=False)
+
+        assert ingestor.refresh().total_rows == 10
+
+    def test_sketches_follow_the_ingested_rows(self, reviews, tmp_path):
+        csv_path = tmp_path / 'recommendations.csv'
+        reviews.iloc[:3000].to_csv(csv_path, index=False)
+        assert ReviewLogIngestor(str(csv_path), str(tmp_path / 'state.json')).refresh().sketches is None
+
+        reviews.iloc[3000:].to_csv(csv_path, mode='a', header=False, index=False)
+        aggregate = ReviewLogIngestor(str(csv_path), str(tmp_path / 'state.json'), sketches=True).refresh()
+
+        assert aggregate.sketches.hours.count == len(reviews)
+        assert aggregate.sketches.summary()['distinct_users'] == pytest.approx(reviews['user_id'].nunique(), rel=0.03)
+        assert aggregate.copy().merge(ReviewAggregate().update(reviews.iloc[:10])).sketches is None
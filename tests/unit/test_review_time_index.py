@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+from app.services.review_aggregates import ReviewAggregate
+from app.services.review_time_index import ReviewTimeIndex, parse_date_range, to_day
+
+class TestReviewTimeIndex:
+    def setup_method(self):
+        rng = np.random.default_rng(5)
+        n = 4000
+        self.reviews = pd.DataFrame({
+            'app_id': rng.integers(1, 40, n),
+            'date': (pd.to_datetime('2021-01-01') + pd.to_timedelta(rng.integers(0, 400, n), 'D')).astype(str),
+            'is_recommended': rng.random(n) < 0.7,
+            'hours': np.where(rng.random(n) < 0.1, np.nan, np.round(rng.exponential(30, n), 1))
+        })
+        self.reviews.loc[:5, 'date'] = None
+        self.index = ReviewTimeIndex.build(self.reviews)
+        self.dates = pd.to_datetime(self.reviews['date'])
+
+    def _expected(self, start, end, app_id=None):
+        rows = self.reviews[self.dates.between(start, end)]
+        if app_id is not None:
+            rows = rows[rows['app_id'] == app_id]
+        return rows
+
+    @pytest.mark.parametrize('start, end', [('2021-01-01', '2022-02-04'), ('2021-03-10', '2021-03-10'),
+                                            ('2020-06-01', '2021-02-01'), ('2021-12-20', '2030-01-01')])
+    def test_range_totals_match_filtering(self, start, end):
+        expected = self._expected(start, end)
+        totals = self.index.totals(to_day(start), to_day(end))
+
+        assert totals['reviews'] == len(expected)
+        assert totals['positive'] == int(expected['is_recommended'].sum())
+        assert totals['avg_playtime'] == round(expected['hours'].mean(), 1)
+
+        for app_id in (3, 17, 99):
+            one_game = self.index.totals(to_day(start), to_day(end), app_id=app_id)
+            assert one_game['reviews'] == len(self._expected(start, end, app_id))
+
+        per_app = self.index.per_app(to_day(start), to_day(end))
+        counts = expected.groupby('app_id').size().reindex(per_app.index, fill_value=0)
+        assert per_app['reviews'].astype(int).tolist() == counts.tolist()
+
+    def test_open_ranges_and_missing_dates(self):
+        assert self.index.totals()['reviews'] == self.dates.notna().sum()
+        assert self.index.totals(end=to_day('2021-01-31'))['reviews'] == (self.dates <= '2021-01-31').sum()
+        assert self.index.totals(to_day('2030-01-01'))['positive_rate'] is None
+        assert self.index.per_app(start=to_day('2021-06-01'))['reviews'].sum() == (self.dates >= '2021-06-01').sum()
+
+    def test_parse_date_range(self):
+        assert parse_date_range(None, '') is None
+        assert parse_date_range('2021-01-02', None) == (to_day('2021-01-02'), None)
+        with pytest.raises(ValueError):
+            parse_date_range('2021-02-01', '2021-01-01')
+        with pytest.raises(ValueError):
+            parse_date_range('soon', None)
+
+    def test_index_from_streamed_aggregate_matches_rows(self):
+        aggregate = ReviewAggregate()
+        for start in range(0, len(self.reviews), 700):
+            aggregate.merge(ReviewAggregate().update(self.reviews.iloc[start:start + 700]))
+        aggregate = ReviewAggregate.from_dict(aggregate.to_dict())
+        index = ReviewTimeIndex.from_app_days(aggregate.game_day_totals(), 'full', aggregate.total_rows)
+
+        assert (index.population, index.rows) == ('full', len(self.reviews))
+        assert (self.index.population, self.index.rows) == ('sample', len(self.reviews))
+        for start, end in (('2021-01-01', '2022-02-04'), ('2021-03-10', '2021-04-10')):
+            for app_id in (None, 3, 17):
+                assert index.totals(to_day(start), to_day(end), app_id) == \
+                    self.index.totals(to_day(start), to_day(end), app_id)
+        pd.testing.assert_frame_equal(index.per_app(to_day('2021-06-01')), self.index.per_app(to_day('2021-06-01')))
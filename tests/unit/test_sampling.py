@@ -0,0 +1,56 @@
+import pytest
+import numpy as np
+import pandas as pd
+from app.services.sampling import SAMPLE_WEIGHT_COLUMN, estimate, sample_csv
+
+@pytest.fixture
+def reviews_csv(tmp_path):
+    rng = np.random.default_rng(3)
+    n = 20000
+    # Early rows are skewed so a head-of-file sample would be biased
+    hours = np.where(np.arange(n) < 2000, 500.0, rng.exponential(30, n))
+    df = pd.DataFrame({
+        'app_id': rng.integers(1, 200, n),
+        'date': pd.to_datetime('2019-01-01') + pd.to_timedelta(np.sort(rng.integers(0, 1500, n)), 'D'),
+        'is_recommended': rng.random(n) < 0.7,
+        'hours': hours
+    })
+    csv_path = tmp_path / 'recommendations.csv'
+    df.to_csv(csv_path, index=False)
+    return str(csv_path), df
+
+class TestSampling:
+    def test_fixed_seed_is_reproducible(self, reviews_csv):
+        csv_path, _ = reviews_csv
+
+        first = sample_csv(csv_path, 500, seed=11, chunksize=3000)
+        second = sample_csv(csv_path, 500, seed=11, chunksize=3000)
+
+        assert len(first) == 500
+        assert first.equals(second)
+        assert first[SAMPLE_WEIGHT_COLUMN].iloc[0] == pytest.approx(20000 / 500)
+
+    def test_interval_covers_population_value(self, reviews_csv):
+        csv_path, df = reviews_csv
+        sample = sample_csv(csv_path, 2000, seed=5, chunksize=3000)
+
+        hours = estimate(sample, 'hours')
+        positive = estimate(sample, 'is_recommended', scale=100)
+
+        assert hours['ci_low'] <= df['hours'].mean() <= hours['ci_high']
+        assert positive['ci_low'] <= df['is_recommended'].mean() * 100 <= positive['ci_high']
+        assert hours['population'] == len(df)
+
+    def test_stratified_sample_keeps_every_month(self, reviews_csv):
+        csv_path, df = reviews_csv
+
+        sample = sample_csv(csv_path, 300, seed=5, strata='month', min_per_stratum=2, chunksize=3000)
+
+        months = df['date'].dt.to_period('M').nunique()
+        assert pd.to_datetime(sample['date']).dt.to_period('M').nunique() == months
+        total = estimate(sample, 'hours', statistic='total')
+        assert total['ci_low'] <= df['hours'].sum() <= total['ci_high']
+
+    def test_unweighted_frame_has_no_interval(self, reviews_csv):
+        _, df = reviews_csv
+        assert estimate(df, 'hours') is None
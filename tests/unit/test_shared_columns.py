@@ -0,0 +1,47 @@
+import os
+import pytest
+import numpy as np
+import pandas as pd
+from app.services.dataset_snapshot import PARQUET_AVAILABLE
+from app.services.shared_columns import SharedColumnStore
+
+pytestmark = pytest.mark.skipif(not PARQUET_AVAILABLE, reason="pyarrow not installed")
+
+class TestSharedColumnStore:
+    def setup_method(self):
+        self.frame = pd.DataFrame({
+            'app_id': np.array([10, 20, 30], dtype='uint32'),
+            'title': ['Game A', 'Game B', 'Game C'],
+            'date': pd.to_datetime(['2021-01-01', '2021-06-01', '2022-01-01']),
+            'hours': np.array([1.5, 20.0, 300.0], dtype='float32')
+        })
+
+    def test_publish_maps_numeric_columns(self, tmp_path):
+        store = SharedColumnStore(str(tmp_path))
+
+        df = store.publish('games-v1', self.frame)
+
+        assert list(df.columns) == list(self.frame.columns)
+        assert df['title'].tolist() == self.frame['title'].tolist()
+        assert df['hours'].dtype == 'float32'
+        assert store.mapped_bytes(df) == 3 * 4 + 3 * 8 + 3 * 4
+        with pytest.raises(ValueError):
+            df['hours'].to_numpy()[0] = 0
+
+    def test_second_worker_attaches_existing_version(self, tmp_path):
+        store = SharedColumnStore(str(tmp_path))
+        store.publish('games-v1', self.frame)
+
+        attached = SharedColumnStore(str(tmp_path)).attach('games-v1')
+
+        assert attached['app_id'].tolist() == [10, 20, 30]
+        assert store.attach('games-v2') is None
+
+    def test_prune_keeps_current_version(self, tmp_path):
+        store = SharedColumnStore(str(tmp_path))
+        store.publish('games-opts-v1', self.frame)
+        store.publish('games-opts-v2', self.frame)
+
+        store.prune('games-opts-', keep='games-opts-v2')
+
+        assert os.listdir(tmp_path) == ['games-opts-v2']
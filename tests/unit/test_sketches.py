@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+from app.services.sketches import CountMinSketch, HyperLogLog, KLLSketch, ReviewSketches
+
+class TestSketches:
+    def setup_method(self):
+        rng = np.random.default_rng(11)
+        n = 60000
+        # A few very active reviewers on top of a uniform crowd
+        users = np.concatenate([rng.integers(0, 20000, n - 3000), np.repeat([7, 42, 99], 1000)])
+        rng.shuffle(users)
+        self.reviews = pd.DataFrame({
+            'user_id': users,
+            'app_id': rng.integers(1, 3000, n),
+            'hours': np.round(rng.exponential(40, n), 1)
+        })
+
+    def _chunked(self, size=7000):
+        merged = ReviewSketches()
+        for start in range(0, len(self.reviews), size):
+            merged.merge(ReviewSketches().update(self.reviews.iloc[start:start + size]))
+        return merged
+
+    def test_estimates_are_close_to_exact(self):
+        summary = ReviewSketches().update(self.reviews).summary(top=3)
+
+        assert summary['distinct_users'] == pytest.approx(self.reviews['user_id'].nunique(), rel=0.03)
+        assert summary['distinct_games'] == pytest.approx(self.reviews['app_id'].nunique(), rel=0.03)
+        hours = np.sort(self.reviews['hours'].to_numpy())
+        for name, q in (('p50', 0.5), ('p90', 0.9), ('p99', 0.99)):
+            rank = np.searchsorted(hours, summary['hours_quantiles'][name]) / len(hours)
+            assert rank == pytest.approx(q, abs=0.01)
+        assert sorted(hit['user_id'] for hit in summary['top_reviewers']) == [7, 42, 99]
+
+    def test_chunked_merge_equals_single_pass(self):
+        whole = ReviewSketches().update(self.reviews)
+        merged = self._chunked()
+
+        assert np.array_equal(merged.users.registers, whole.users.registers)
+        assert np.array_equal(merged.reviewers.table, whole.reviewers.table)
+        assert merged.hours.count == len(self.reviews)
+        assert merged.hours.quantile(0.5) == pytest.approx(whole.hours.quantile(0.5), rel=0.05)
+
+    def test_round_trips_through_dict(self):
+        sketches = self._chunked()
+        restored = ReviewSketches.from_dict(sketches.to_dict())
+
+        assert restored.summary() == sketches.summary()
+
+    def test_float_ids_hash_like_ints(self):
+        as_ints = HyperLogLog().update(np.arange(1000))
+        as_floats = ReviewSketches().update(pd.DataFrame({'user_id': np.arange(1000, dtype='float64')})).users
+
+        assert np.array_equal(as_ints.registers, as_floats.registers)
+
+    def test_empty_sketches(self):
+        assert HyperLogLog().estimate() == 0
+        assert KLLSketch().quantile(0.5) is None
+        assert CountMinSketch().heavy_hitters() == []
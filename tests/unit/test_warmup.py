@@ -0,0 +1,40 @@
+import time
+from app.services.warmup import LazyService
+
+def wait_until_settled(service):
+    for _ in range(100):
+        if service.status not in ('cold', 'warming'):
+            break
+        time.sleep(0.01)
+
+class TestLazyService:
+    def test_nothing_is_built_until_started(self):
+        calls = []
+        service = LazyService('analytics', lambda: calls.append(1) or 'built')
+
+        assert service.status == 'cold'
+        assert calls == []
+
+        service.start()
+        wait_until_settled(service)
+
+        assert service.ready
+        assert service.get() == 'built'
+        assert calls == [1]
+
+    def test_get_builds_synchronously_when_cold(self):
+        service = LazyService('agent', lambda: 'agent')
+
+        assert service.get() == 'agent'
+        assert service.describe()['status'] == 'ready'
+
+    def test_failed_build_is_reported(self):
+        def fail():
+            raise ValueError("no games.csv")
+
+        service = LazyService('real_data_analyzer', fail)
+        service.start()
+        wait_until_settled(service)
+
+        assert service.status == 'failed'
+        assert service.describe()['error'] == 'no games.csv'